@@ -14,21 +14,21 @@ This is much faster and more reliable than trying to execute JavaScript.
 
 import asyncio
 import json
-import re
 import time
 from pathlib import Path
 from urllib.parse import quote, unquote
-from bs4 import BeautifulSoup
-import pandas as pd
-from crawl4ai import AsyncWebCrawler
 import logging
 
+from src.core.extractor import UNKNOWN_NAME, extract_venue
+from src.core.html_backends import DEFAULT_BACKEND, parse_html
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class HappyCowAjaxScraper:
-    def __init__(self):
+    def __init__(self, parser_backend=DEFAULT_BACKEND):
+        self.parser_backend = parser_backend
         self.base_url = "https://www.happycow.net"
         self.session_headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -45,6 +45,11 @@ class HappyCowAjaxScraper:
         
     async def get_city_path_from_url(self, city_url):
         """Extract the city path from a HappyCow city URL."""
+        # The browser stack is only loaded when a page is actually fetched
+        from crawl4ai import AsyncWebCrawler
+        # bs4 loads lxml to register its tree builder; keep both off the start-up path
+        from bs4 import BeautifulSoup
+        
         try:
             async with AsyncWebCrawler(verbose=True) as crawler:
                 result = await crawler.arun(
@@ -81,6 +86,8 @@ class HappyCowAjaxScraper:
     
     async def get_ajax_data(self, city_path, page=1, filters=None):
         """Get restaurant data from the AJAX endpoint."""
+        from crawl4ai import AsyncWebCrawler
+        
         try:
             # Convert path format: replace / with | and encode
             ajax_path = city_path.replace('/', '|')
@@ -134,7 +141,7 @@ class HappyCowAjaxScraper:
     
     def parse_restaurant_html(self, html_content):
         """Parse restaurant data from the HTML content returned by AJAX."""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = parse_html(html_content, self.parser_backend)
         restaurants = []
         
         # Find all venue list items
@@ -143,67 +150,30 @@ class HappyCowAjaxScraper:
         
         for item in venue_items:
             try:
-                restaurant = {}
-                
-                # Basic data from attributes
-                restaurant['id'] = item.get('data-id')
-                restaurant['type'] = item.get('data-type')
-                restaurant['is_top'] = item.get('data-top') == '1'
-                restaurant['is_new'] = item.get('data-new') == '1'
-                restaurant['is_partner'] = item.get('data-partner') == '1'
-                
-                # Name
-                name_el = item.select_one('[data-analytics="listing-card-title"]')
-                restaurant['name'] = name_el.get_text(strip=True) if name_el else None
-                
-                # URL
-                link_el = item.select_one('a[href*="/reviews/"]')
-                restaurant['url'] = link_el.get('href') if link_el else None
+                venue = extract_venue(item)
                 
-                # Address
-                address_el = item.select_one('.venue-address')
-                restaurant['address'] = address_el.get_text(strip=True) if address_el else None
-                
-                # Rating
-                rating_el = item.select_one('.venue-rating')
-                if rating_el:
-                    rating_text = rating_el.get_text(strip=True)
-                    rating_match = re.search(r'(\d+\.?\d*)', rating_text)
-                    restaurant['rating'] = float(rating_match.group(1)) if rating_match else None
+                restaurant = {
+                    'id': venue['venue_id'] or None,
+                    'type': item.get('data-type'),
+                    'is_top': venue['is_top'],
+                    'is_new': venue['is_new'],
+                    'is_partner': venue['is_partner'],
+                    'name': venue['name'] if venue['name'] != UNKNOWN_NAME else None,
+                    'url': venue['url'],
+                    'address': venue['address'] or None,
+                    'rating': venue['rating'] or None,
+                }
                 
                 # Coordinates from Google Maps link
-                maps_link = item.select_one('a[href*="google.com/maps"]')
-                if maps_link:
-                    href = maps_link.get('href')
-                    # Extract coordinates from URL like: https://www.google.com/maps?q=32.7767,-96.7970
-                    if href and isinstance(href, str):
-                        coord_match = re.search(r'q=([+-]?\d+\.?\d*),([+-]?\d+\.?\d*)', href)
-                        if coord_match:
-                            restaurant['latitude'] = float(coord_match.group(1))
-                            restaurant['longitude'] = float(coord_match.group(2))
-                
-                # Cuisine type
-                cuisine_el = item.select_one('.venue-cuisine')
-                restaurant['cuisine'] = cuisine_el.get_text(strip=True) if cuisine_el else None
-                
-                # Price range
-                price_el = item.select_one('.venue-price')
-                restaurant['price_range'] = price_el.get_text(strip=True) if price_el else None
+                if venue['latitude'] is not None:
+                    restaurant['latitude'] = venue['latitude']
+                    restaurant['longitude'] = venue['longitude']
                 
-                # Hours status
-                hours_el = item.select_one('.venue-hours-text')
-                restaurant['hours_status'] = hours_el.get_text(strip=True) if hours_el else None
-                
-                # Distance (if available)
-                distance_el = item.select_one('.venue-distance')
-                restaurant['distance'] = distance_el.get_text(strip=True) if distance_el else None
-                
-                # Features/tags
-                features = []
-                feature_els = item.select('.venue-features .feature-tag')
-                for feature_el in feature_els:
-                    features.append(feature_el.get_text(strip=True))
-                restaurant['features'] = features
+                restaurant['cuisine'] = venue['cuisine']
+                restaurant['price_range'] = venue['price_range'] or None
+                restaurant['hours_status'] = venue['hours_status']
+                restaurant['distance'] = venue['distance']
+                restaurant['features'] = venue['features']
                 
                 # Only add if we have essential data
                 if restaurant.get('name') and restaurant.get('id'):
@@ -273,6 +243,8 @@ class HappyCowAjaxScraper:
             logger.warning("No restaurants to save")
             return
         
+        import pandas as pd
+        
         df = pd.DataFrame(restaurants)
         
         # Ensure data directory exists
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+HappyCow Cloud Scraper Service (async)
+ASGI variant of cloud_scraper_service with the same /health, /scrape and
+/test routes and the same response bodies.
+
+Every upstream request goes through one pooled, keep-alive httpx client,
+so a single worker holds dozens of city scrapes waiting on the network
+instead of one per gunicorn worker thread. Parsing, the page cache and the
+response archive come from src.core.service, which the Flask service uses
+too, and run in worker threads so they never block the event loop.
+
+Run: uvicorn async_scraper_service:app --host 0.0.0.0 --port $PORT --workers 2
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from src.core import pagination
+from src.core.service import (
+    FETCH_SECONDS, HOST_CONCURRENCY, PAGES, SERIALIZE_SECONDS, TEST_SCRAPE_REQUEST, UPSTREAM_BYTES,
+    UPSTREAM_RESPONSES, CityResult, InvalidScrapeRequest, add_scrape_context, build_scraper,
+    check_scrape_request, city_ajax_path, failed_scrape, log_scrape_start,
+)
+from src.utils.archive import normalize_city_path
+from src.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from src.utils.singleflight import AsyncSingleFlight
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pooled upstream connections per worker, kept alive between scrapes
+MAX_CONNECTIONS = int(os.environ.get('SCRAPER_MAX_CONNECTIONS', 100))
+
+class AsyncHappyCowScraper:
+    """
+    Network half of the scraper on asyncio. Parsing, caching and archiving
+    are delegated to src.core.service's HappyCowScraper, which also
+    supplies the shared rate limiter, rate controller and settings.
+    """
+
+    def __init__(self, parser, host_concurrency=HOST_CONCURRENCY, max_connections=MAX_CONNECTIONS):
+        self.parser = parser
+        self.rate_limiter = parser.rate_limiter
+        self.rate_control = parser.rate_control
+        self.host_concurrency = max(1, host_concurrency)
+        self.max_connections = max_connections
+        self.client = None
+        self.flights = AsyncSingleFlight()
+        self._host_slots = {}
+
+    async def start(self):
+        self.client = httpx.AsyncClient(
+            headers=dict(self.parser.session.headers),
+            timeout=15,
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_connections),
+        )
+
+    async def close(self):
+        await self.client.aclose()
+
+    def _host_slot(self, url):
+        """Semaphore bounding in-flight requests to the URL's host across all scrapes"""
+        host = urlparse(url).netloc
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.host_concurrency)
+        return slot
+
+    async def extract_city_path(self, city_url):
+        """Extract city path from HappyCow URL"""
+        try:
+            await self.rate_limiter.acquire_async(urlparse(city_url).netloc)
+            response = await self.client.get(city_url, timeout=10)
+            response.raise_for_status()
+
+            return await asyncio.to_thread(self.parser.city_path_from_page, response.text, city_url)
+
+        except Exception as e:
+            logger.error(f"Error extracting city path: {e}")
+            return None
+
+    async def fetch_page(self, ajax_path, page, timing=None):
+        """
+        Raw AJAX body for one listing page
+        Network phase timings are added to `timing` when given
+        """
+        ajax_url = self.parser.build_ajax_url(ajax_path, page)
+        logger.info(f"Calling AJAX endpoint: {ajax_url}")
+
+        # httpcore reports connection setup (DNS, TCP, TLS) through trace events
+        connect = {}
+
+        async def trace(event_name, info):
+            if event_name.startswith('connection.'):
+                if event_name.endswith('.started'):
+                    connect.setdefault('start', time.perf_counter())
+                elif event_name.endswith('.complete'):
+                    connect['end'] = time.perf_counter()
+
+        host = urlparse(ajax_url).netloc
+        start = time.perf_counter()
+        async with self._host_slot(ajax_url):
+            await self.rate_limiter.acquire_async(host)
+            sent_at = time.monotonic()
+            fetch_start = time.perf_counter()
+            try:
+                async with self.client.stream('GET', ajax_url, extensions={'trace': trace}) as response:
+                    headers_at = time.perf_counter()
+                    body = await response.aread()
+            except httpx.HTTPError:
+                UPSTREAM_RESPONSES.inc(status='error')
+                await asyncio.to_thread(self.rate_control.record, host, None,
+                                        time.perf_counter() - fetch_start, sent_at)
+                raise
+            finished_at = time.perf_counter()
+            FETCH_SECONDS.observe(finished_at - fetch_start)
+
+        # A rate change or Retry-After pause may write the shared limiter's SQLite
+        # row (BEGIN IMMEDIATE, up to 30s busy timeout); keep that off the event loop
+        await asyncio.to_thread(self.rate_control.record, host, response.status_code,
+                                finished_at - fetch_start, sent_at, response.headers.get('Retry-After'))
+        UPSTREAM_RESPONSES.inc(status=response.status_code)
+        response.raise_for_status()
+        UPSTREAM_BYTES.inc(len(body))
+        PAGES.inc(source='upstream')
+
+        if timing is not None:
+            connect_seconds = connect['end'] - connect['start'] if 'end' in connect else 0.0
+            timing.update({
+                'wait_seconds': round(fetch_start - start, 4),
+                'dns_connect_seconds': round(connect_seconds, 4),
+                'ttfb_seconds': round(max(headers_at - fetch_start - connect_seconds, 0.0), 4),
+                'download_seconds': round(finished_at - headers_at, 4),
+                'bytes': len(body),
+            })
+
+        if self.parser.archive is not None:
+            await asyncio.to_thread(self.parser.archive.put, ajax_path, page, body)
+
+        return body
+
+    async def scrape_page(self, ajax_path, page, city_url, replay=False, refresh=False):
+        """
+        Fetch and parse one listing page, or take it from the page cache
+        Returns: (restaurants, paginated, timing)
+        """
+        if replay:
+            # Archive reads are local file I/O
+            return await asyncio.to_thread(self.parser.scrape_page, ajax_path, page, city_url, True)
+
+        if not refresh:
+            cached = await asyncio.to_thread(self.parser.cached_page, ajax_path, page)
+            if cached is not None:
+                return cached
+
+        timing = {'page': page}
+        start = time.perf_counter()
+        body = await self.fetch_page(ajax_path, page, timing)
+        timing['fetch_seconds'] = round(time.perf_counter() - start, 4)
+
+        return await asyncio.to_thread(self.parser.parse_page_body, ajax_path, page, city_url, body, timing)
+
+    async def scrape_city_ajax(self, city_url, replay=False, refresh=False):
+        """
+        Scrape a city. Concurrent calls for the same city path attach to the
+        scrape already in flight and all receive its result. A refresh only
+        joins another refresh, never a scrape that may be serving cached pages.
+        """
+        key = (normalize_city_path(city_url), bool(replay), bool(refresh))
+        result, shared = await self.flights.do(
+            key, lambda: self._scrape_city_ajax(city_url, replay, refresh))
+
+        if shared:
+            logger.info(f"Coalesced scrape of {key[0]} with the one in flight")
+
+        # Callers add their own context to the result, so each gets a copy
+        return dict(result, coalesced=shared)
+
+    async def _scrape_city_ajax(self, city_url, replay=False, refresh=False):
+        """
+        Scrape every page of a city. Page 1 reports how many pages exist; the
+        rest are fetched concurrently within the per-host budget and merged in
+        page order, dropping venues already seen on an earlier page.
+        """
+        try:
+            ajax_path = city_ajax_path(city_url)
+            city = CityResult(self.parser.build_ajax_url(ajax_path))
+
+            page_restaurants, paginated, timing = await self.scrape_page(ajax_path, 1, city_url, replay, refresh)
+            city.add_page(1, page_restaurants, timing)
+
+            final_page = pagination.last_page(paginated)
+            if final_page:
+                final_page = min(final_page, self.parser.max_pages)
+                pages = range(2, final_page + 1)
+                outcomes = await asyncio.gather(
+                    *(self.scrape_page(ajax_path, page, city_url, replay, refresh) for page in pages),
+                    return_exceptions=True)
+                for page, outcome in zip(pages, outcomes):
+                    if isinstance(outcome, Exception):
+                        city.fail_page(page, outcome)
+                    else:
+                        city.add_page(page, outcome[0], outcome[2])
+            else:
+                # No page count: follow 'next' links one page at a time
+                page = 1
+                while pagination.has_next(paginated) and page < self.parser.max_pages and page_restaurants:
+                    page += 1
+                    try:
+                        page_restaurants, paginated, timing = await self.scrape_page(ajax_path, page, city_url,
+                                                                                     replay, refresh)
+                        city.add_page(page, page_restaurants, timing)
+                    except Exception as e:
+                        city.fail_page(page, e)
+                        break
+
+            return city.to_dict(final_page)
+
+        except Exception as e:
+            logger.error(f"Error scraping city via AJAX: {e}")
+            return failed_scrape(e)
+
+# Initialize scraper
+scraper = AsyncHappyCowScraper(build_scraper())
+
+async def validate_scrape_request(data):
+    """Check scrape parameters, filling in full_path from the URL when missing"""
+    check_scrape_request(data)
+
+    if not data.get('full_path'):
+        full_path = await scraper.extract_city_path(data['url'])
+        if not full_path:
+            raise InvalidScrapeRequest('Could not extract city path from URL')
+        data = dict(data, full_path=full_path)
+
+    return data
+
+async def run_scrape(data):
+    """Scrape one validated city request and add timing and context"""
+    log_scrape_start(data)
+    start_time = time.time()
+
+    result = await scraper.scrape_city_ajax(data['url'], replay=bool(data.get('replay')),
+                                            refresh=bool(data.get('refresh')))
+
+    return add_scrape_context(result, data, start_time)
+
+async def health_check(request):
+    """Health check endpoint"""
+    return JSONResponse({
+        'status': 'healthy',
+        'timestamp': datetime.utcnow().isoformat(),
+        'service': 'HappyCow Cloud Scraper (async)',
+        'cache': scraper.parser.cache.stats() if scraper.parser.cache is not None else None,
+        'single_flight': scraper.flights.stats(),
+        'rate_control': scraper.rate_control.stats()
+    })
+
+async def metrics(request):
+    """Prometheus metrics for this worker"""
+    return Response(REGISTRY.render(), headers={'Content-Type': METRICS_CONTENT_TYPE})
+
+async def scrape_city(request):
+    """Main scraping endpoint for n8n"""
+    try:
+        data = await validate_scrape_request(await request.json())
+        result = await run_scrape(data)
+
+        with SERIALIZE_SECONDS.time(endpoint='scrape'):
+            return JSONResponse(result)
+
+    except InvalidScrapeRequest as e:
+        return JSONResponse({
+            'success': False,
+            'error': str(e)
+        }, status_code=400)
+
+    except Exception as e:
+        logger.error(f"Error in scrape endpoint: {e}")
+        return JSONResponse({
+            'success': False,
+            'error': str(e),
+            'restaurants': [],
+            'total_restaurants': 0,
+            'timestamp': datetime.utcnow().isoformat()
+        }, status_code=500)
+
+async def test_scraper(request):
+    """Test endpoint with Dallas data"""
+    try:
+        return JSONResponse(await run_scrape(dict(TEST_SCRAPE_REQUEST)))
+    except Exception as e:
+        logger.error(f"Error in test endpoint: {e}")
+        return JSONResponse({'success': False, 'error': str(e)}, status_code=500)
+
+@asynccontextmanager
+async def lifespan(app):
+    await scraper.start()
+    yield
+    await scraper.close()
+
+app = Starlette(
+    routes=[
+        Route('/health', health_check, methods=['GET']),
+        Route('/metrics', metrics, methods=['GET']),
+        Route('/scrape', scrape_city, methods=['POST']),
+        Route('/test', test_scraper, methods=['GET']),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 5000))
+    logger.info(f"Starting HappyCow Cloud Scraper (async) on port {port}")
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -5,15 +5,22 @@ Flask HTTP API that n8n cloud can call to scrape cities
 Deploy this to Render, Railway, or similar service
 """
 
-from flask import Flask, request, jsonify
-import requests
-from bs4 import BeautifulSoup
+from flask import Flask, request, jsonify, Response, stream_with_context
 import json
-import re
 from datetime import datetime
 import time
 import os
 import logging
+import tempfile
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.jobs import JobQueue, QueueFullError
+from src.core.service import (
+    BATCH_CONCURRENCY, SERIALIZE_SECONDS, TEST_SCRAPE_REQUEST, InvalidScrapeRequest, add_scrape_context,
+    batch_concurrency, build_scraper, check_scrape_request, log_scrape_start,
+)
+from src.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,239 +28,21 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-class HappyCowScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-    
-    def extract_city_path(self, city_url):
-        """Extract city path from HappyCow URL"""
-        try:
-            response = self.session.get(city_url, timeout=10)
-            response.raise_for_status()
-            
-            # Look for the path in the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Method 1: Look for data attributes or JavaScript variables
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string and 'path' in script.string.lower():
-                    content = script.string
-                    # Look for path patterns
-                    path_match = re.search(r'["\']([^"\']*north_america[^"\']*)["\']', content)
-                    if path_match:
-                        path = path_match.group(1)
-                        if '/' in path:
-                            return path.replace('/', '|')
-            
-            # Method 2: Extract from URL structure
-            url_parts = city_url.replace('https://www.happycow.net/', '').strip('/')
-            if url_parts:
-                return url_parts.replace('/', '|')
-            
-            logger.warning(f"Could not extract path from {city_url}")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error extracting city path: {e}")
-            return None
-    
-    def scrape_city_ajax(self, city_url):
-        """Scrape city using AJAX endpoint"""
-        try:
-            # Extract path from actual HappyCow URL
-            # https://www.happycow.net/north_america/usa/california/los_angeles/ -> north_america/usa/california/los_angeles
-            if city_url.startswith('https://www.happycow.net/'):
-                path_part = city_url.replace('https://www.happycow.net/', '').strip('/')
-                ajax_path = path_part.replace('/', '%7C')
-            else:
-                # Fallback: assume it's already a path
-                ajax_path = city_url.replace('|', '%7C').replace('/', '%7C')
-            
-            ajax_url = f"https://www.happycow.net/ajax/views/city/venues/{ajax_path}"
-            
-            logger.info(f"Calling AJAX endpoint: {ajax_url}")
-            
-            response = self.session.get(ajax_url, timeout=15)
-            response.raise_for_status()
-            
-            # Parse JSON response
-            data = response.json()
-            
-            if not data.get('success', False):
-                raise Exception("AJAX response indicates failure")
-            
-            html_content = data.get('data', {}).get('data', '')
-            if not html_content:
-                raise Exception("No HTML content in AJAX response")
-            
-            # Parse restaurants from HTML
-            restaurants = self.parse_restaurants_from_html(html_content, city_url)
-            
-            return {
-                'success': True,
-                'restaurants': restaurants,
-                'total_restaurants': len(restaurants),
-                'pages_scraped': 1,
-                'ajax_url': ajax_url
-            }
-            
-        except Exception as e:
-            logger.error(f"Error scraping city via AJAX: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'restaurants': [],
-                'total_restaurants': 0,
-                'pages_scraped': 0
-            }
-    
-    def parse_restaurants_from_html(self, html_content, city_path):
-        """Parse restaurant data from HTML content"""
-        restaurants = []
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Find all venue items
-        venue_items = soup.find_all('div', class_='venue-list-item')
-        logger.info(f"Found {len(venue_items)} venue items")
-        
-        for item in venue_items:
-            try:
-                restaurant = self.extract_restaurant_data(item, city_path)
-                if restaurant:
-                    restaurants.append(restaurant)
-            except Exception as e:
-                logger.warning(f"Error parsing restaurant: {e}")
-                continue
-        
-        return restaurants
-    
-    def extract_restaurant_data(self, item, city_path):
-        """Extract data from a single restaurant item"""
-        try:
-            # Basic info
-            venue_id = item.get('data-id', '')
-            venue_type = item.get('data-type', 'unknown')
-            
-            # Name
-            name_elem = item.find('a', class_='venue-list-item-name-link')
-            name = name_elem.get_text(strip=True) if name_elem else 'Unknown'
-            
-            # Rating
-            rating = 0.0
-            rating_elem = item.find('div', class_='venue-list-item-rating')
-            if rating_elem:
-                rating_text = rating_elem.get_text(strip=True)
-                rating_match = re.search(r'(\d+\.?\d*)', rating_text)
-                if rating_match:
-                    rating = float(rating_match.group(1))
-            
-            # Review count
-            review_count = 0
-            review_elem = item.find('span', class_='venue-list-item-review-count')
-            if review_elem:
-                review_text = review_elem.get_text(strip=True)
-                review_match = re.search(r'(\d+)', review_text)
-                if review_match:
-                    review_count = int(review_match.group(1))
-            
-            # Address
-            address = ''
-            address_elem = item.find('div', class_='venue-list-item-address')
-            if address_elem:
-                address = address_elem.get_text(strip=True)
-            
-            # Coordinates from Google Maps link
-            latitude, longitude = self.extract_coordinates(item)
-            
-            # Phone
-            phone = ''
-            phone_elem = item.find('a', href=re.compile(r'^tel:'))
-            if phone_elem:
-                phone = phone_elem.get('href', '').replace('tel:', '')
-            
-            # Website
-            website = ''
-            website_elem = item.find('a', class_='venue-list-item-website')
-            if website_elem:
-                website = website_elem.get('href', '')
-            
-            # Cuisine tags
-            cuisine_tags = []
-            cuisine_elems = item.find_all('span', class_='venue-list-item-cuisine')
-            for elem in cuisine_elems:
-                cuisine_tags.append(elem.get_text(strip=True))
-            
-            # Price range
-            price_range = ''
-            price_elem = item.find('span', class_='venue-list-item-price')
-            if price_elem:
-                price_range = price_elem.get_text(strip=True)
-            
-            # Features
-            features = []
-            feature_elems = item.find_all('span', class_='venue-list-item-feature')
-            for elem in feature_elems:
-                features.append(elem.get_text(strip=True))
-            
-            # Extract city and state from path
-            path_parts = city_path.replace('|', '/').split('/')
-            city_name = path_parts[-1].replace('_', ' ').title() if path_parts else 'Unknown'
-            state_name = path_parts[-2].replace('_', ' ').title() if len(path_parts) > 1 else 'Unknown'
-            
-            restaurant = {
-                'venue_id': venue_id,
-                'name': name,
-                'type': venue_type,
-                'rating': rating,
-                'review_count': review_count,
-                'address': address,
-                'latitude': latitude,
-                'longitude': longitude,
-                'phone': phone,
-                'website': website,
-                'cuisine_tags': cuisine_tags,
-                'price_range': price_range,
-                'features': features,
-                'city_path': city_path.replace('|', '/'),
-                'city_name': city_name,
-                'state_name': state_name,
-                'country_code': 'US',
-                'scraped_at': datetime.utcnow().isoformat(),
-                'page_number': 1
-            }
-            
-            return restaurant
-            
-        except Exception as e:
-            logger.error(f"Error extracting restaurant data: {e}")
-            return None
-    
-    def extract_coordinates(self, item):
-        """Extract latitude and longitude from Google Maps links"""
-        try:
-            # Look for Google Maps link
-            maps_link = item.find('a', href=re.compile(r'google\.com/maps'))
-            if maps_link:
-                href = maps_link.get('href', '')
-                # Extract coordinates from URL like: https://www.google.com/maps?q=32.74339,-96.826994
-                coord_match = re.search(r'q=(-?\d+\.?\d*),(-?\d+\.?\d*)', href)
-                if coord_match:
-                    latitude = float(coord_match.group(1))
-                    longitude = float(coord_match.group(2))
-                    return latitude, longitude
-            
-            return None, None
-            
-        except Exception as e:
-            logger.warning(f"Error extracting coordinates: {e}")
-            return None, None
+# Background jobs: state is shared by every worker on the box through this SQLite file
+JOB_DB = os.environ.get('SCRAPER_JOB_DB', os.path.join(tempfile.gettempdir(), 'happycow_jobs.sqlite3'))
+JOB_WORKERS = int(os.environ.get('SCRAPER_JOB_WORKERS', 4))
+MAX_PENDING_JOBS = int(os.environ.get('SCRAPER_MAX_PENDING_JOBS', 100))
+
+# A synchronous /scrape returns what it has after this many seconds (0 disables),
+# with the pages it did not reach in failed_pages and 'truncated' set; keep it
+# below the client's and any proxy's request timeout. /jobs and batches run on.
+SCRAPE_DEADLINE = float(os.environ.get('SCRAPER_SCRAPE_DEADLINE', 100))
+
+# Most cities accepted by one /scrape/batch
+MAX_BATCH_SIZE = int(os.environ.get('SCRAPER_MAX_BATCH_SIZE', 200))
 
 # Initialize scraper
-scraper = HappyCowScraper()
+scraper = build_scraper(max(JOB_WORKERS, BATCH_CONCURRENCY))
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -261,64 +50,71 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.utcnow().isoformat(),
-        'service': 'HappyCow Cloud Scraper'
+        'service': 'HappyCow Cloud Scraper',
+        'cache': scraper.cache.stats() if scraper.cache is not None else None,
+        'single_flight': scraper.flights.stats(),
+        'rate_control': scraper.rate_control.stats()
     })
 
+def validate_scrape_request(data):
+    """Check scrape parameters, filling in full_path from the URL when missing"""
+    check_scrape_request(data)
+    
+    if not data.get('full_path'):
+        full_path = scraper.extract_city_path(data['url'])
+        if not full_path:
+            raise InvalidScrapeRequest('Could not extract city path from URL')
+        data = dict(data, full_path=full_path)
+    
+    return data
+
+def run_scrape(data, on_page=None, timeout=None):
+    """Scrape one validated city request and add timing and context"""
+    log_scrape_start(data)
+    start_time = time.time()
+    
+    # Scrape the city using the actual URL
+    result = scraper.scrape_city_ajax(data['url'], replay=bool(data.get('replay')), on_page=on_page,
+                                      refresh=bool(data.get('refresh')), timeout=timeout)
+    
+    return add_scrape_context(result, data, start_time)
+
+def run_scrape_job(data, report_progress):
+    """Job runner: scrape a city, publishing page progress as it goes"""
+    progress = {'pages_scraped': 0, 'restaurants_found': 0}
+    
+    def on_page(page_number, restaurants):
+        progress['pages_scraped'] += 1
+        progress['restaurants_found'] += len(restaurants)
+        progress['last_page'] = page_number
+        report_progress(dict(progress))
+    
+    return run_scrape(data, on_page)
+
+job_queue = JobQueue(run_scrape_job, JOB_DB, max_workers=JOB_WORKERS, max_pending=MAX_PENDING_JOBS)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics for this worker"""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/scrape', methods=['POST'])
 def scrape_city():
     """Main scraping endpoint for n8n"""
     try:
         # Get request data
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'success': False,
-                'error': 'No JSON data provided'
-            }), 400
-        
-        # Extract parameters
-        city_url = data.get('url')
-        full_path = data.get('full_path')
-        city_name = data.get('city', 'Unknown')
-        state_name = data.get('state', 'Unknown')
+        data = validate_scrape_request(request.get_json())
+        result = run_scrape(data, timeout=SCRAPE_DEADLINE or None)
         
-        if not city_url:
-            return jsonify({
-                'success': False,
-                'error': 'Missing required parameter: url'
-            }), 400
-        
-        logger.info(f"Starting scrape for {city_name}, {state_name}")
-        logger.info(f"URL: {city_url}")
-        logger.info(f"Path: {full_path}")
-        
-        start_time = time.time()
-        
-        # If we don't have the path, extract it from the URL
-        if not full_path:
-            full_path = scraper.extract_city_path(city_url)
-            if not full_path:
-                return jsonify({
-                    'success': False,
-                    'error': 'Could not extract city path from URL'
-                }), 400
-        
-        # Scrape the city using the actual URL
-        result = scraper.scrape_city_ajax(city_url)
-        
-        # Add timing and context
-        duration = int(time.time() - start_time)
-        result['duration_seconds'] = duration
-        result['city_name'] = city_name
-        result['state_name'] = state_name
-        result['city_path'] = full_path
-        result['timestamp'] = datetime.utcnow().isoformat()
-        
-        logger.info(f"Scraping completed: {result['total_restaurants']} restaurants found in {duration}s")
-        
-        return jsonify(result)
+        with SERIALIZE_SECONDS.time(endpoint='scrape'):
+            return jsonify(result)
         
+    except InvalidScrapeRequest as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
     except Exception as e:
         logger.error(f"Error in scrape endpoint: {e}")
         return jsonify({
@@ -329,18 +125,144 @@ def scrape_city():
             'timestamp': datetime.utcnow().isoformat()
         }), 500
 
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue a city scrape in the background and return its job id immediately"""
+    try:
+        data = validate_scrape_request(request.get_json())
+        job = job_queue.submit(data)
+        
+        logger.info(f"Queued job {job['job_id']} for {data['url']}")
+        
+        return jsonify({
+            'success': True,
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'status_url': f"/jobs/{job['job_id']}",
+            'created_at': job['created_at']
+        }), 202
+        
+    except InvalidScrapeRequest as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    except QueueFullError as e:
+        return jsonify({
+            'success': False,
+            'error': f"Job queue is full: {e}"
+        }), 503
+    
+    except Exception as e:
+        logger.error(f"Error in jobs endpoint: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status, progress and (once finished) results of a queued scrape"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f"Unknown job: {job_id}"
+        }), 404
+    
+    return jsonify(job)
+
+def _scrape_batch_item(index, item, lines):
+    """Scrape one batch city, pushing NDJSON records onto `lines` as pages are parsed"""
+    def on_page(page_number, restaurants):
+        for restaurant in restaurants:
+            lines.put({'record': 'restaurant', 'batch_index': index, **restaurant})
+    
+    try:
+        result = run_scrape(validate_scrape_request(item), on_page)
+    except Exception as e:
+        result = {
+            'success': False,
+            'error': str(e),
+            'total_restaurants': 0,
+            'url': item.get('url') if isinstance(item, dict) else None
+        }
+    
+    summary = {key: value for key, value in result.items() if key != 'restaurants'}
+    lines.put({'record': 'city', 'batch_index': index, **summary})
+    return summary
+
+@app.route('/scrape/batch', methods=['POST'])
+def scrape_batch():
+    """
+    Scrape many cities in one call, streaming NDJSON as results arrive
+    Each line's 'record' is 'restaurant' (one per venue), 'city' (the /scrape
+    response minus restaurants, once per city) or 'batch' (final totals)
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('cities') if isinstance(data, dict) else data
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            'success': False,
+            'error': 'Expected a non-empty list of cities'
+        }), 400
+    
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({
+            'success': False,
+            'error': f"Batch too large: {len(items)} cities (max {MAX_BATCH_SIZE})"
+        }), 400
+    
+    try:
+        concurrency = batch_concurrency(data)
+    except InvalidScrapeRequest as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    logger.info(f"Starting batch of {len(items)} cities with concurrency {concurrency}")
+    
+    def generate():
+        start_time = time.time()
+        lines = queue.Queue()
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='scrape-batch')
+        try:
+            futures = [executor.submit(_scrape_batch_item, index, item, lines)
+                       for index, item in enumerate(items)]
+            
+            # Every city ends with exactly one 'city' line
+            remaining = len(futures)
+            while remaining:
+                line = lines.get()
+                if line['record'] == 'city':
+                    remaining -= 1
+                with SERIALIZE_SECONDS.time(endpoint='batch'):
+                    encoded = json.dumps(line, default=str) + '\n'
+                yield encoded
+            
+            summaries = [future.result() for future in futures]
+            yield json.dumps({
+                'record': 'batch',
+                'cities': len(summaries),
+                'succeeded': sum(1 for summary in summaries if summary.get('success')),
+                'failed': sum(1 for summary in summaries if not summary.get('success')),
+                'total_restaurants': sum(summary.get('total_restaurants', 0) for summary in summaries),
+                'duration_seconds': int(time.time() - start_time),
+                'timestamp': datetime.utcnow().isoformat()
+            }) + '\n'
+        finally:
+            # Client went away (or we finished): drop cities not yet started
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/test', methods=['GET'])
 def test_scraper():
     """Test endpoint with Dallas data"""
-    test_data = {
-        'url': 'https://www.happycow.net/north_america/usa/texas/dallas/',
-        'full_path': 'north_america/usa/texas/dallas',
-        'city': 'Dallas',
-        'state': 'Texas'
-    }
-    
     # Use the main scrape function
-    with app.test_request_context('/scrape', json=test_data, method='POST'):
+    with app.test_request_context('/scrape', json=TEST_SCRAPE_REQUEST, method='POST'):
         return scrape_city()
 
 if __name__ == '__main__':
@@ -8,7 +8,6 @@ import json
 import re
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, asdict
-from crawl4ai import AsyncWebCrawler
 import time
 from pathlib import Path
 
@@ -39,6 +38,9 @@ class HappyCowScraper:
         
     async def scrape_city(self, city_url: str, city_name: str) -> List[Restaurant]:
         """Scrape all restaurants from a city page"""
+        # Loaded here so parsing and saving results don't pull in the browser stack
+        from crawl4ai import AsyncWebCrawler
+        
         print(f"🏙️ Scraping {city_name}: {city_url}")
         
         async with AsyncWebCrawler(
@@ -13,16 +13,27 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import re
-import time
 from pathlib import Path
+from urllib.parse import urlparse
+
+from src.utils.rate_limiter import DEFAULT_RATE_DB, make_rate_limiter
+
+# One request every 2 seconds, shared with any other scraper running on the box
+DEFAULT_REQUESTS_PER_SECOND = 0.5
 
 class HappyCowHierarchyScraper:
-    def __init__(self):
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND, rate_db=DEFAULT_RATE_DB):
         self.base_url = "https://www.happycow.net"
+        self.rate_limiter = make_rate_limiter(requests_per_second, rate_db)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+    
+    def get(self, url):
+        """GET url once the host's request budget allows it"""
+        self.rate_limiter.acquire(urlparse(url).netloc)
+        return self.session.get(url)
         
     def scrape_state_data(self):
         """Scrape state-level data from USA page"""
@@ -30,7 +41,7 @@ class HappyCowHierarchyScraper:
         url = f'{self.base_url}/north_america/usa/'
         
         try:
-            response = self.session.get(url)
+            response = self.get(url)
             response.raise_for_status()
             soup = BeautifulSoup(response.text, 'html.parser')
             
@@ -71,7 +82,7 @@ class HappyCowHierarchyScraper:
         print(f"Scraping cities for {state_info['state']} ({state_info['total_entries']} total entries)...")
         
         try:
-            response = self.session.get(state_info['url'])
+            response = self.get(state_info['url'])
             response.raise_for_status()
             soup = BeautifulSoup(response.text, 'html.parser')
             
@@ -128,9 +139,6 @@ class HappyCowHierarchyScraper:
             
             cities = self.scrape_city_data(state_info)
             all_cities.extend(cities)
-            
-            # Rate limiting
-            time.sleep(2)
         
         return all_cities
     
@@ -1 +1,221 @@
- 
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+HappyCow Offline Bulk Re-Parser
+Re-parses saved listing pages without touching the network
+
+Accepts any mix of:
+  - saved listing HTML files (*.html, *.htm)
+  - saved AJAX responses (*.json, *.json.gz)
+  - response archives written by production_city_scraper.py --archive-dir
+
+Parsing fans out across a process pool sized to the machine's cores and
+venue records are streamed to CSV, JSONL or Parquet as documents finish,
+or added to a Hive-partitioned Parquet dataset (--format dataset, with
+--output naming the dataset directory).
+
+Usage: python parse_existing_html.py <input> [<input> ...] --output venues.jsonl
+Example: python parse_existing_html.py data/archive --output venues.parquet --workers 8
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from production_city_scraper import HappyCowScraper
+from src.core.html_backends import BACKENDS, DEFAULT_BACKEND
+from src.models.venue import COLUMN_TYPES, DATASET_COLUMN_TYPES
+from src.utils.archive import ResponseArchive
+from src.utils.dataset import ParquetDataset
+from src.utils.sinks import open_sink
+
+logger = logging.getLogger(__name__)
+
+# Per-page INFO logging from the scraper would swamp a bulk run
+logging.getLogger('production_city_scraper').setLevel(logging.WARNING)
+
+DOCUMENT_SUFFIXES = ('.html', '.htm', '.json', '.json.gz')
+
+# (kind, location, city_path, page_number)
+Document = Tuple[str, str, str, int]
+
+# Per-process caches so each worker builds its helpers once
+_scrapers: Dict[Optional[str], HappyCowScraper] = {}
+_archives: Dict[str, ResponseArchive] = {}
+_parser_options = {'parser_backend': DEFAULT_BACKEND, 'stream_parse': False}
+
+
+def configure_parser(parser_backend: str = DEFAULT_BACKEND, stream_parse: bool = False):
+    """Select how documents are parsed in this process (also the pool initializer)"""
+    _parser_options['parser_backend'] = parser_backend
+    _parser_options['stream_parse'] = stream_parse
+    _scrapers.clear()
+
+
+def discover_documents(inputs: List[str], city_path: str = '') -> Iterator[Document]:
+    """Expand input paths into parseable documents"""
+    for raw_path in inputs:
+        path = Path(raw_path)
+
+        if path.is_dir() and (path / 'index.jsonl').exists():
+            # Response archive: parse the most recent fetch of every page
+            archive = ResponseArchive(str(path))
+            for (entry_city, page), entry in sorted(archive.latest_entries().items()):
+                yield 'archive', f"{path}::{entry['sha256']}", entry_city, page
+        elif path.is_dir():
+            for file_path in sorted(path.rglob('*')):
+                if file_path.is_file() and file_path.name.lower().endswith(DOCUMENT_SUFFIXES):
+                    yield 'file', str(file_path), city_path, 1
+        elif path.is_file():
+            yield 'file', str(path), city_path, 1
+        else:
+            logger.warning(f"Skipping missing input: {path}")
+
+
+def _get_scraper(city_path: str) -> HappyCowScraper:
+    scraper = _scrapers.get(city_path)
+    if scraper is None:
+        base = _scrapers.get(None)
+        if base is None:
+            # Parsing never touches the network: no rate limit (and so no shared
+            # limiter database) and no checkpoints; every city shares one session
+            base = HappyCowScraper('', 'https://www.happycow.net/', requests_per_second=0, rate_db='',
+                                   checkpoint=None, **_parser_options)
+            _scrapers[None] = base
+        scraper = base.for_city(city_path, f"https://www.happycow.net/{city_path}/")
+        _scrapers[city_path] = scraper
+    return scraper
+
+
+def _read_document(kind: str, location: str) -> bytes:
+    if kind == 'archive':
+        root, digest = location.split('::', 1)
+        archive = _archives.get(root)
+        if archive is None:
+            archive = _archives[root] = ResponseArchive(root)
+        return archive.get(digest)
+
+    if location.lower().endswith('.gz'):
+        with gzip.open(location, 'rb') as f:
+            return f.read()
+    with open(location, 'rb') as f:
+        return f.read()
+
+
+def load_payload(document: Document) -> Tuple[Dict, int]:
+    """
+    Load a document as an AJAX-style payload
+    Returns: (payload, bytes_read)
+    """
+    kind, location = document[0], document[1]
+    body = _read_document(kind, location)
+
+    if kind == 'archive' or location.lower().endswith(('.json', '.json.gz')):
+        return json.loads(body), len(body)
+
+    # Saved listing pages hold the venue cards directly
+    return {'data': body.decode('utf-8', errors='replace')}, len(body)
+
+
+def parse_document(document: Document) -> Tuple[List[Dict], int, Optional[str]]:
+    """
+    Parse one document in a worker process
+    Returns: (restaurants, bytes_read, error)
+    """
+    kind, location, city_path, page = document
+    try:
+        data, n_bytes = load_payload(document)
+        restaurants, _ = _get_scraper(city_path).parse_page(data, page)
+        return restaurants, n_bytes, None
+
+    except Exception as e:
+        return [], 0, f"{location}: {e}"
+
+
+def main():
+    """Main function for command line usage"""
+    parser = argparse.ArgumentParser(description='Bulk re-parse saved HappyCow listings')
+    parser.add_argument('inputs', nargs='+', help='Files, directories or response archives to parse')
+    parser.add_argument('--output', required=True,
+                        help='Output file (.csv, .json, .jsonl or .parquet) or dataset directory')
+    parser.add_argument('--format', choices=['csv', 'json', 'jsonl', 'parquet', 'dataset'],
+                        help='Output format (default: from the output extension)')
+    parser.add_argument('--scrape-date',
+                        help='scrape_date partition for --format dataset (default: today)')
+    parser.add_argument('--city-path', default='',
+                        help='City path to record for loose HTML/JSON files')
+    parser.add_argument('--parser', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help='HTML parser backend (default: bs4)')
+    parser.add_argument('--stream-parse', action='store_true',
+                        help='Build only venue card subtrees instead of full page trees')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Parser processes (default: number of CPU cores)')
+
+    args = parser.parse_args()
+
+    if args.scrape_date and args.format != 'dataset':
+        parser.error('--scrape-date requires --format dataset')
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    documents = list(discover_documents(args.inputs, args.city_path))
+    if not documents:
+        logger.error("No documents found to parse")
+        return 1
+
+    workers = max(1, args.workers)
+    logger.info(f"Parsing {len(documents)} documents with {workers} worker processes")
+
+    total_venues = 0
+    total_bytes = 0
+    errors = 0
+    start_time = time.perf_counter()
+
+    if args.format == 'dataset':
+        sink = ParquetDataset(args.output, DATASET_COLUMN_TYPES, args.scrape_date)
+    else:
+        sink = open_sink(args.output, args.format, COLUMN_TYPES)
+
+    with sink:
+        with ProcessPoolExecutor(max_workers=workers, initializer=configure_parser,
+                                 initargs=(args.parser, args.stream_parse)) as executor:
+            chunksize = max(1, len(documents) // (workers * 8))
+
+            # map() yields in input order, so output is deterministic
+            for restaurants, n_bytes, error in executor.map(parse_document, documents,
+                                                            chunksize=chunksize):
+                if error:
+                    errors += 1
+                    logger.warning(f"Failed to parse {error}")
+                    continue
+                sink.write(restaurants)
+                total_venues += len(restaurants)
+                total_bytes += n_bytes
+
+    elapsed = time.perf_counter() - start_time
+    stats = {
+        'documents': len(documents),
+        'errors': errors,
+        'venues': total_venues,
+        'bytes': total_bytes,
+        'workers': workers,
+        'elapsed_seconds': round(elapsed, 3),
+        'docs_per_second': round(len(documents) / elapsed, 1) if elapsed else 0,
+        'venues_per_second': round(total_venues / elapsed, 1) if elapsed else 0,
+        'output': args.output,
+    }
+
+    logger.info(f"Parsed {len(documents)} documents ({total_venues} venues) in {elapsed:.2f}s: "
+                f"{stats['docs_per_second']} docs/sec, {stats['venues_per_second']} venues/sec")
+    print(json.dumps(stats))
+
+    return 0 if errors < len(documents) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,40 +5,87 @@ Designed for n8n workflow integration
 
 Usage: python production_city_scraper.py <full_path> <url>
 Example: python production_city_scraper.py "north_america/usa/texas/dallas" "https://www.happycow.net/north_america/usa/texas/dallas/"
+
+Archive raw responses with --archive-dir DIR, then re-run the parse/export
+pipeline offline with --archive-dir DIR --replay.
 """
 
 import argparse
+import copy
 import requests
 import json
 import time
-import pandas as pd
-import re
 import sys
 import os
+import socketserver
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 from urllib.parse import urlparse, parse_qs
-from bs4 import BeautifulSoup
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from src.core import pagination
+from src.core.extractor import extract_venue, find_venue_items, iter_venue_items
+from src.core.html_backends import BACKENDS, DEFAULT_BACKEND, parse_html
+from src.models.venue import COLUMN_TYPES, DATASET_COLUMN_TYPES, VenueRecord
+from src.utils.adaptive import AdaptiveRateController
+from src.utils.archive import ResponseArchive
+from src.utils.checkpoint import DEFAULT_CHECKPOINT_DB, CheckpointStore
+from src.utils.dataset import ParquetDataset
+from src.utils.rate_limiter import DEFAULT_RATE_DB, make_rate_limiter
+from src.utils.retry import RetryPolicy
+from src.utils.sinks import CsvSink, JsonlSink, JsonSink, ParquetSink
+from src.utils.summary import VenueStats
+from src.utils.timing import TimedHTTPAdapter, summarize_timings, timed_get
+
+if TYPE_CHECKING:
+    # pandas costs more to import than a JSON-only scrape takes to start; it is
+    # imported where CSV and DataFrame output need it
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Default politeness budget: one request every 3 seconds
+DEFAULT_REQUESTS_PER_SECOND = 1 / 3
+
+# Socket daemon jobs expected to run at once; their scrapers share one session
+SOCKET_POOL_JOBS = 8
+
+# Failed pages in a row after which a city with no page count is abandoned for this run
+MAX_CONSECUTIVE_FAILURES = 3
+
 class HappyCowScraper:
-    def __init__(self, full_path: str, base_url: str, max_pages: int = 20):
+    def __init__(self, full_path: str, base_url: str, max_pages: int = 20,
+                 concurrency: int = 1, requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 archive: Optional[ResponseArchive] = None, replay: bool = False,
+                 parser_backend: str = DEFAULT_BACKEND, stream_parse: bool = False,
+                 rate_db: Optional[str] = DEFAULT_RATE_DB, rate_burst: int = 1,
+                 max_rate: Optional[float] = None, min_rate: Optional[float] = None,
+                 retry_policy: Optional[RetryPolicy] = None, checkpoint: Optional[CheckpointStore] = None):
+        if replay and archive is None:
+            raise ValueError("Replay mode requires a response archive")
+        
         self.full_path = full_path
         self.base_url = base_url.rstrip('/')
         self.max_pages = max_pages
+        self.concurrency = max(1, concurrency)
+        # Per-host budget shared with other scraper processes through rate_db
+        self.rate_limiter = make_rate_limiter(requests_per_second, rate_db, rate_burst)
+        # Backs the rate off on 429/5xx and raises it toward max_rate while HappyCow responds quickly
+        self.rate_control = AdaptiveRateController(self.rate_limiter, max_rate, min_rate)
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Every consumed page is saved here so an interrupted run can be resumed
+        self.checkpoint = checkpoint
+        self.archive = archive
+        self.replay = replay
+        self.parser_backend = parser_backend
+        self.stream_parse = stream_parse
         self.session = requests.Session()
         
+        # Keep enough pooled connections for every in-flight page request
+        self.size_pool(self.concurrency)
+        
         # Set headers to mimic browser
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -49,221 +96,352 @@ class HappyCowScraper:
             'Upgrade-Insecure-Requests': '1',
         })
         
+        self._reset_city()
+    
+    def _reset_city(self):
+        """Clear everything collected for the current city"""
         self.restaurants = []
+        self.stats = VenueStats()
+        
+        # Where each page's venues go as it is consumed (see scrape_all_pages)
+        self._sinks: Sequence = ()
+        self._keep_restaurants = True
+        self.last_page = None
         
-    def scrape_page(self, page_num: int) -> Tuple[List[Dict], bool]:
+        # Pages that failed past the retry budget (page -> error), and the first page
+        # never attempted when a run gave up early; together they are the resume cursor
+        self.failed_pages: Dict[int, str] = {}
+        self.resume_from: Optional[int] = None
+        self._consecutive_failures = 0
+        
+        # page -> phase timings (see src.utils.timing.PHASES)
+        self.page_timings: Dict[int, Dict] = {}
+    
+    def size_pool(self, connections: int):
+        """Pool up to `connections` keep-alive connections per host in the session"""
+        adapter = TimedHTTPAdapter(pool_maxsize=max(1, connections))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def for_city(self, full_path: str, base_url: str, max_pages: Optional[int] = None) -> 'HappyCowScraper':
         """
-        Scrape a single page of restaurants
-        Returns: (restaurants_list, has_more_pages)
+        A scraper for another city that shares this one's session (and its
+        warm connection pool), rate limiter, archive and checkpoint store
         """
-        try:
-            # Build AJAX URL for the page
-            if page_num == 1:
-                ajax_url = f"https://www.happycow.net/ajax/views/city/venues/{self.full_path}"
-            else:
-                ajax_url = f"https://www.happycow.net/ajax/views/city/venues/{self.full_path}?page={page_num}"
-            
+        scraper = copy.copy(self)
+        scraper.full_path = full_path
+        scraper.base_url = base_url.rstrip('/')
+        if max_pages is not None:
+            scraper.max_pages = max_pages
+        scraper._reset_city()
+        return scraper
+        
+    def build_ajax_url(self, page_num: int) -> str:
+        """Build the AJAX listing URL for a page"""
+        if page_num == 1:
+            return f"https://www.happycow.net/ajax/views/city/venues/{self.full_path}"
+        return f"https://www.happycow.net/ajax/views/city/venues/{self.full_path}?page={page_num}"
+    
+    def fetch_page(self, page_num: int) -> Dict:
+        """Fetch the raw AJAX JSON for a page (from the archive in replay mode)"""
+        if self.replay:
+            body = self.archive.latest(self.full_path, page_num)
+            if body is None:
+                raise LookupError(f"Page {page_num} of {self.full_path} is not in the archive")
+            logger.info(f"Replaying page {page_num} from archive")
+            timing = {'page': page_num, 'bytes': len(body)}
+        else:
+            ajax_url = self.build_ajax_url(page_num)
             logger.info(f"Scraping page {page_num}: {ajax_url}")
             
-            # Make request
-            response = self.session.get(ajax_url, timeout=30)
-            response.raise_for_status()
+            # Wait for our turn under the politeness budget
+            host = urlparse(ajax_url).netloc
+            start = time.perf_counter()
+            self.rate_limiter.acquire(host)
+            wait_seconds = time.perf_counter() - start
             
-            # Parse JSON response
+            sent_at = time.monotonic()
             try:
-                data = response.json()
-                html_content = data.get('data', '')
-            except json.JSONDecodeError:
-                logger.error(f"Failed to parse JSON response for page {page_num}")
-                return [], False
-            
-            if not html_content:
-                logger.info(f"No content found for page {page_num}")
-                return [], False
-            
-            # Parse HTML content
-            soup = BeautifulSoup(html_content, 'html.parser')
-            venue_items = soup.find_all('div', class_='venue-list-item')
-            
-            if not venue_items:
-                logger.info(f"No venue items found on page {page_num}")
-                return [], False
-            
-            page_restaurants = []
-            for item in venue_items:
-                restaurant_data = self.extract_restaurant_data(item, page_num)
-                if restaurant_data:
-                    page_restaurants.append(restaurant_data)
-            
-            logger.info(f"Found {len(page_restaurants)} restaurants on page {page_num}")
-            
-            # Check if there are more pages (if we got restaurants, assume there might be more)
-            has_more = len(page_restaurants) > 0 and len(page_restaurants) >= 10  # Typical page size
-            
-            return page_restaurants, has_more
+                response, timing = timed_get(self.session, ajax_url, timeout=30)
+            except requests.RequestException:
+                self.rate_control.record(host, None, time.monotonic() - sent_at, sent_at)
+                raise
+            self.rate_control.record(host, response.status_code, time.monotonic() - sent_at, sent_at,
+                                     response.headers.get('Retry-After'))
+            response.raise_for_status()
+            body = response.content
+            timing.update(page=page_num, wait_seconds=round(wait_seconds, 4))
             
-        except requests.RequestException as e:
-            logger.error(f"Request failed for page {page_num}: {e}")
+            # Keep the raw body so parser fixes can be replayed without re-crawling
+            if self.archive is not None:
+                self.archive.put(self.full_path, page_num, body)
+        
+        start = time.perf_counter()
+        data = json.loads(body)
+        timing['decode_seconds'] = round(time.perf_counter() - start, 4)
+        self.page_timings[page_num] = timing
+        return data
+    
+    def parse_page(self, data: Dict, page_num: int) -> Tuple[List[VenueRecord], bool]:
+        """
+        Parse restaurants out of an AJAX response
+        Returns: (restaurants_list, has_more_pages)
+        """
+        html_content, paginated = pagination.split_payload(data)
+        
+        if self.last_page is None:
+            self.last_page = pagination.last_page(paginated)
+            if self.last_page:
+                logger.info(f"Pagination reports {self.last_page} pages")
+        
+        if not html_content:
+            logger.info(f"No content found for page {page_num}")
             return [], False
-        except Exception as e:
-            logger.error(f"Unexpected error scraping page {page_num}: {e}")
+        
+        # Parse HTML content, optionally building only the venue card subtrees
+        start = time.perf_counter()
+        if self.stream_parse:
+            venue_items = iter_venue_items(html_content, self.parser_backend)
+        else:
+            venue_items = find_venue_items(parse_html(html_content, self.parser_backend))
+        
+        page_restaurants = []
+        venue_count = 0
+        extract_seconds = 0.0
+        # Every venue on a page shares one timestamp string
+        scraped_at = datetime.now().isoformat()
+        for item in venue_items:
+            venue_count += 1
+            item_start = time.perf_counter()
+            restaurant_data = self.extract_restaurant_data(item, page_num, scraped_at)
+            extract_seconds += time.perf_counter() - item_start
+            if restaurant_data:
+                page_restaurants.append(restaurant_data)
+        
+        # Streaming parses interleave with extraction, so parse time is what's left over
+        timing = self.page_timings.setdefault(page_num, {'page': page_num})
+        timing['html_parse_seconds'] = round(time.perf_counter() - start - extract_seconds, 4)
+        timing['extract_seconds'] = round(extract_seconds, 4)
+        timing['venues'] = len(page_restaurants)
+        
+        if not venue_count:
+            logger.info(f"No venue items found on page {page_num}")
             return [], False
+        
+        logger.info(f"Found {len(page_restaurants)} restaurants on page {page_num}")
+        
+        has_more = pagination.has_next(paginated)
+        if has_more is None:
+            # No pagination block: assume a full page means more may follow
+            has_more = len(page_restaurants) >= 10  # Typical page size
+        
+        return page_restaurants, has_more
     
-    def extract_restaurant_data(self, item, page_num: int) -> Optional[Dict]:
+    def scrape_page(self, page_num: int) -> Tuple[List[VenueRecord], bool]:
+        """
+        Scrape a single page of restaurants, retrying transient failures
+        Returns: (restaurants_list, has_more_pages)
+        Raises the last error once the retry budget is spent
+        """
+        data = self.retry_policy.call(lambda: self.fetch_page(page_num), f"Page {page_num}")
+        return self.parse_page(data, page_num)
+    
+    def extract_restaurant_data(self, item, page_num: int,
+                                scraped_at: Optional[str] = None) -> Optional[VenueRecord]:
         """Extract restaurant data from a venue item"""
         try:
-            # Basic information
-            venue_id = item.get('data-id', '')
-            if not venue_id:
+            venue = extract_venue(item)
+            if not venue['venue_id']:
                 return None
             
-            # Name
-            name_elem = item.find('h3', class_='venue-name')
-            name = name_elem.get_text(strip=True) if name_elem else 'Unknown'
-            
-            # Type (vegan, vegetarian, veg-options)
-            venue_type = item.get('data-type', 'unknown')
-            
-            # Rating
-            rating = 0.0
-            rating_elem = item.find('div', class_='venue-rating')
-            if rating_elem:
-                rating_text = rating_elem.get_text(strip=True)
-                rating_match = re.search(r'(\d+\.?\d*)', rating_text)
-                if rating_match:
-                    rating = float(rating_match.group(1))
-            
-            # Review count
-            review_count = 0
-            review_elem = item.find('span', class_='review-count')
-            if review_elem:
-                review_text = review_elem.get_text(strip=True)
-                review_match = re.search(r'(\d+)', review_text)
-                if review_match:
-                    review_count = int(review_match.group(1))
-            
-            # Address
-            address_elem = item.find('div', class_='venue-address')
-            address = address_elem.get_text(strip=True) if address_elem else ''
-            
-            # Coordinates from Google Maps link
-            latitude, longitude = self.extract_coordinates(item)
-            
-            # Phone number
-            phone = ''
-            phone_elem = item.find('span', class_='venue-phone')
-            if phone_elem:
-                phone = phone_elem.get_text(strip=True)
-            
-            # Website
-            website = ''
-            website_elem = item.find('a', class_='venue-website')
-            if website_elem:
-                website = website_elem.get('href', '')
-            
-            # Cuisine tags
-            cuisine_tags = []
-            cuisine_elems = item.find_all('span', class_='cuisine-tag')
-            for elem in cuisine_elems:
-                cuisine_tags.append(elem.get_text(strip=True))
-            
-            # Price range
-            price_range = ''
-            price_elem = item.find('span', class_='price-range')
-            if price_elem:
-                price_range = price_elem.get_text(strip=True)
-            
-            # Features (delivery, takeout, etc.)
-            features = []
-            feature_elems = item.find_all('span', class_='venue-feature')
-            for elem in feature_elems:
-                features.append(elem.get_text(strip=True))
-            
-            return {
-                'venue_id': venue_id,
-                'name': name,
-                'type': venue_type,
-                'rating': rating,
-                'review_count': review_count,
-                'address': address,
-                'latitude': latitude,
-                'longitude': longitude,
-                'phone': phone,
-                'website': website,
-                'cuisine_tags': cuisine_tags,
-                'price_range': price_range,
-                'features': features,
-                'city_path': self.full_path,
-                'scraped_at': datetime.now().isoformat(),
-                'page_number': page_num
-            }
+            return VenueRecord(venue, self.full_path, scraped_at or datetime.now().isoformat(), page_num)
             
         except Exception as e:
             logger.error(f"Error extracting restaurant data: {e}")
             return None
     
-    def extract_coordinates(self, item) -> Tuple[Optional[float], Optional[float]]:
-        """Extract latitude and longitude from Google Maps link"""
-        try:
-            # Look for Google Maps link
-            maps_link = item.find('a', href=re.compile(r'google\.com/maps'))
-            if not maps_link:
-                return None, None
-            
-            href = maps_link.get('href', '')
-            
-            # Pattern 1: ?q=lat,lng
-            coord_match = re.search(r'[?&]q=(-?\d+\.?\d*),(-?\d+\.?\d*)', href)
-            if coord_match:
-                lat = float(coord_match.group(1))
-                lng = float(coord_match.group(2))
-                return lat, lng
-            
-            # Pattern 2: @lat,lng
-            coord_match = re.search(r'@(-?\d+\.?\d*),(-?\d+\.?\d*)', href)
-            if coord_match:
-                lat = float(coord_match.group(1))
-                lng = float(coord_match.group(2))
-                return lat, lng
-            
-            return None, None
-            
-        except Exception as e:
-            logger.error(f"Error extracting coordinates: {e}")
-            return None, None
-    
-    def scrape_all_pages(self) -> List[Dict]:
-        """Scrape all pages for the city"""
+    def scrape_all_pages(self, pages: Optional[List[int]] = None, from_page: Optional[int] = 1,
+                         resume: bool = False, sinks: Sequence = (),
+                         keep_restaurants: bool = True) -> List[VenueRecord]:
+        """
+        Scrape all pages for the city, or only `pages` plus every page from
+        `from_page` on (the resume_pages cursor of a partial run). With
+        `resume`, pages saved in the checkpoint are reused and only the rest
+        of the city is fetched.
+        Each page's venues are written to every sink in `sinks` (see
+        src.utils.sinks) as soon as the page is consumed. Without
+        `keep_restaurants` they are not also held in self.restaurants, so
+        memory stays bounded by the pages in flight; get_summary() still
+        covers the whole city.
+        The first page of the range is fetched alone; if its pagination block
+        reports the last page, exactly the remaining pages are scheduled.
+        Otherwise pages are fetched until one reports no successor. A page
+        that still fails after retries is recorded in failed_pages and the
+        scrape moves on to the next one.
+        """
         logger.info(f"Starting scrape for city: {self.full_path}")
+        self._sinks = sinks
+        self._keep_restaurants = keep_restaurants
         
-        page = 1
-        total_restaurants = 0
+        restored = False
+        if self.checkpoint is not None:
+            if resume:
+                restored, pages, from_page = self._restore_checkpoint()
+            elif pages is None and from_page == 1:
+                self.checkpoint.start(self.full_path)
         
-        while page <= self.max_pages:
-            restaurants, has_more = self.scrape_page(page)
-            
-            if not restaurants:
-                logger.info(f"No restaurants found on page {page}, stopping")
-                break
-            
-            self.restaurants.extend(restaurants)
-            total_restaurants += len(restaurants)
-            
-            logger.info(f"Page {page}: {len(restaurants)} restaurants (Total: {total_restaurants})")
-            
-            if not has_more:
-                logger.info(f"No more pages detected after page {page}")
-                break
-            
-            page += 1
-            
-            # Rate limiting - wait between requests
-            if page <= self.max_pages:
-                time.sleep(3)
+        if pages:
+            logger.info(f"Fetching pages {pagination.format_page_spec(pages)}")
+            self._scrape_pages(pages, follow=False)
         
-        logger.info(f"Scraping completed. Total restaurants found: {len(self.restaurants)}")
+        if from_page is not None and from_page <= self.max_pages:
+            if self._scrape_pages([from_page], follow=True):
+                if self.last_page:
+                    final_page = min(self.last_page, self.max_pages)
+                    logger.info(f"Scheduling pages {from_page + 1}-{final_page} of {self.last_page}")
+                else:
+                    final_page = self.max_pages
+                self._scrape_pages(list(range(from_page + 1, final_page + 1)), follow=True)
+        
+        if restored and keep_restaurants:
+            # Checkpointed pages came first; put venues back in page order
+            # (sinks get them in the order they were consumed)
+            self.restaurants.sort(key=lambda restaurant: restaurant['page_number'])
+        
+        if self.checkpoint is not None:
+            self.checkpoint.finish(self.full_path, self.get_resume_pages())
+        
+        if self.failed_pages or self.resume_from:
+            logger.warning(f"Incomplete scrape; resume with --pages {self.get_resume_pages()}")
+        logger.info(f"Scraping completed. Total restaurants found: {self.stats.total}")
         return self.restaurants
     
+    def _restore_checkpoint(self) -> Tuple[bool, Optional[List[int]], Optional[int]]:
+        """
+        Load the city's checkpoint into this scraper
+        Returns: (restored, pages, from_page) naming what is still to be fetched
+        """
+        state = self.checkpoint.load(self.full_path)
+        if state is None or not state['pages']:
+            logger.info("No checkpoint to resume from, starting at page 1")
+            self.checkpoint.start(self.full_path)
+            return False, None, 1
+        
+        # An empty page may have been a blank response rather than the end of
+        # the city; unless pagination named it the last page, fetch it again
+        done = {page for page, saved in state['pages'].items()
+                if saved['restaurants'] or page == state['last_page']}
+        for saved in state['pages'].values():
+            self._add_restaurants([VenueRecord.from_dict(restaurant) for restaurant in saved['restaurants']])
+        self.last_page = state['last_page']
+        logger.info(f"Resuming from checkpoint: {len(done)} pages, {self.stats.total} restaurants")
+        
+        if state['finished']:
+            # The run ended; fetch only what it reported missing
+            if state['resume_pages'] is None:
+                return True, [], None
+            pages, from_page = pagination.parse_page_spec(state['resume_pages'])
+            return True, pages, from_page
+        
+        # The run was interrupted
+        if self.last_page:
+            final_page = min(self.last_page, self.max_pages)
+            return True, [page for page in range(1, final_page + 1) if page not in done], None
+        last_done = max(done, default=0)
+        return True, [page for page in range(1, last_done) if page not in done], last_done + 1
+    
+    def _scrape_pages(self, pages: List[int], follow: bool) -> bool:
+        """
+        Scrape `pages` with up to `concurrency` requests in flight. Pages may
+        be fetched ahead but are consumed strictly in page order, so the
+        result matches the sequential path. With `follow`, stop at the end of
+        the city, or after MAX_CONSECUTIVE_FAILURES failed pages in a row.
+        Returns True if the page after the last one should be scraped.
+        """
+        if not pages:
+            return True
+        
+        if self.concurrency > 1 and len(pages) > 1:
+            logger.info(f"Fetching up to {self.concurrency} pages concurrently")
+        
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        pending = {}
+        next_index = 0
+        
+        try:
+            for index, page in enumerate(pages):
+                # Keep the window of in-flight pages full
+                while next_index < len(pages) and next_index < index + self.concurrency:
+                    pending[pages[next_index]] = executor.submit(self.scrape_page, pages[next_index])
+                    next_index += 1
+                
+                try:
+                    restaurants, has_more = pending.pop(page).result()
+                except Exception as e:
+                    self._fail_page(page, e)
+                    if follow and self._consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                        logger.error(f"{self._consecutive_failures} pages failed in a row, stopping at page {page}")
+                        self.resume_from = page + 1
+                        return False
+                    continue
+                
+                self._consecutive_failures = 0
+                if self.checkpoint is not None:
+                    self.checkpoint.save_page(self.full_path, page,
+                                              [restaurant.to_dict() for restaurant in restaurants],
+                                              self.page_timings.get(page), self.last_page)
+                
+                if not follow:
+                    self._add_restaurants(restaurants)
+                    logger.info(f"Page {page}: {len(restaurants)} restaurants (Total: {self.stats.total})")
+                elif not self._record_page(page, restaurants, has_more):
+                    return False
+            
+            return True
+        finally:
+            # Pages fetched past the end of the city are discarded
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _fail_page(self, page: int, error: Exception):
+        """Record a page that failed past the retry budget"""
+        logger.error(f"Giving up on page {page}: {error}")
+        self.failed_pages[page] = str(error)
+        self._consecutive_failures += 1
+    
+    def _record_page(self, page: int, restaurants: List[VenueRecord], has_more: bool) -> bool:
+        """Store a page of results. Returns True if the next page should be scraped."""
+        if not restaurants:
+            logger.info(f"No restaurants found on page {page}, stopping")
+            return False
+        
+        self._add_restaurants(restaurants)
+        
+        logger.info(f"Page {page}: {len(restaurants)} restaurants (Total: {self.stats.total})")
+        
+        if not has_more:
+            logger.info(f"No more pages detected after page {page}")
+            return False
+        
+        return True
+    
+    def _add_restaurants(self, restaurants: List[VenueRecord]):
+        """Hand a page of venues to the running summary, the sinks and (unless streaming only) the result"""
+        self.stats.add(restaurants)
+        for sink in self._sinks:
+            sink.write(restaurants)
+        if self._keep_restaurants:
+            self.restaurants.extend(restaurants)
+    
+    def get_resume_pages(self) -> Optional[str]:
+        """Page spec for --pages that fetches only what this run missed, or None if complete"""
+        if not self.failed_pages and self.resume_from is None:
+            return None
+        return pagination.format_page_spec(list(self.failed_pages), self.resume_from)
+    
+    def get_timings(self) -> Dict:
+        """Phase timings for every page fetched or parsed, with totals"""
+        return summarize_timings([self.page_timings[page] for page in sorted(self.page_timings)])
+    
     def save_to_csv(self, filename: Optional[str] = None) -> str:
         """Save results to CSV file"""
         if not filename:
@@ -274,74 +452,337 @@ class HappyCowScraper:
             logger.warning("No restaurants to save")
             return filename
         
-        df = pd.DataFrame(self.restaurants)
-        df.to_csv(filename, index=False)
+        with CsvSink(filename) as sink:
+            sink.write(self.restaurants)
         logger.info(f"Saved {len(self.restaurants)} restaurants to {filename}")
         return filename
     
-    def get_dataframe(self) -> pd.DataFrame:
+    def get_dataframe(self) -> 'pd.DataFrame':
         """Return results as pandas DataFrame"""
-        return pd.DataFrame(self.restaurants)
+        import pandas as pd
+        
+        return pd.DataFrame([restaurant.to_dict() for restaurant in self.restaurants])
     
     def get_summary(self) -> Dict:
-        """Get summary statistics"""
-        if not self.restaurants:
-            return {
-                'total_restaurants': 0,
-                'pages_scraped': 0,
-                'city_path': self.full_path
-            }
-        
-        df = pd.DataFrame(self.restaurants)
-        
-        return {
-            'total_restaurants': len(self.restaurants),
-            'pages_scraped': df['page_number'].max() if 'page_number' in df.columns else 0,
-            'city_path': self.full_path,
-            'types': df['type'].value_counts().to_dict() if 'type' in df.columns else {},
-            'avg_rating': df['rating'].mean() if 'rating' in df.columns else 0,
-            'restaurants_with_coordinates': len(df[(df['latitude'].notna()) & (df['longitude'].notna())]) if 'latitude' in df.columns else 0
+        """Get summary statistics (kept up to date as pages are stored)"""
+        stats = self.stats.to_dict()
+        summary = {
+            'total_restaurants': stats.pop('total_restaurants'),
+            'pages_scraped': stats.pop('pages_scraped'),
+            'failed_pages': sorted(self.failed_pages),
+            'city_path': self.full_path
         }
+        if summary['total_restaurants']:
+            summary.update(stats)
+        return summary
+
+def build_scraper(args, full_path: str, url: str) -> HappyCowScraper:
+    """HappyCowScraper configured from the command line options"""
+    archive = ResponseArchive(args.archive_dir) if args.archive_dir else None
+    return HappyCowScraper(full_path, url, args.max_pages,
+                           concurrency=args.concurrency, requests_per_second=args.rate,
+                           archive=archive, replay=args.replay,
+                           parser_backend=args.parser, stream_parse=args.stream_parse,
+                           rate_db=args.rate_db, rate_burst=args.burst,
+                           max_rate=args.max_rate, min_rate=args.min_rate,
+                           retry_policy=RetryPolicy(max_retries=args.retries),
+                           checkpoint=CheckpointStore(args.checkpoint_db) if args.checkpoint_db else None)
+
+def scrape_city(scraper: HappyCowScraper, pages: Optional[List[int]] = None, from_page: Optional[int] = 1,
+                resume: bool = False, timings: bool = False, sinks: Sequence = (),
+                keep_restaurants: bool = True) -> Dict:
+    """
+    Scrape the scraper's city and build the JSON output for n8n
+    Without keep_restaurants the venues only go to `sinks` and the output
+    has no 'restaurants' list
+    """
+    # Scrape all pages
+    restaurants = scraper.scrape_all_pages(pages, from_page, resume=resume, sinks=sinks,
+                                           keep_restaurants=keep_restaurants)
+    
+    # Get summary
+    summary = scraper.get_summary()
+    
+    output = {
+        'success': True,
+        'summary': summary
+    }
+    if keep_restaurants:
+        output['restaurants'] = [restaurant.to_dict() for restaurant in restaurants]
+    # Pages to pass to --pages on the next run, or None when nothing was missed
+    output['resume_pages'] = scraper.get_resume_pages()
+    if timings:
+        output['timings'] = scraper.get_timings()
+    return output
+
+def finish_dataset(dataset: ParquetDataset, output: Dict):
+    """
+    Commit the city to the dataset only if the scrape was complete; a partial
+    city would replace the complete partition an earlier run wrote
+    """
+    if output['resume_pages'] is not None:
+        logger.warning(f"Incomplete scrape; keeping the dataset's previous partition for this city "
+                       f"(resume with pages {output['resume_pages']})")
+        dataset.abort()
+    else:
+        dataset.close()
+
+def run_job(base: HappyCowScraper, job: Dict, timings: bool = False, dataset_dir: Optional[str] = None) -> Dict:
+    """
+    Run one daemon job: {"full_path", "url"} plus optional "max_pages",
+    "pages", "resume", "timings" and an "id" echoed back in the output.
+    With dataset_dir the city is also added to that Parquet dataset.
+    """
+    full_path = job.get('full_path')
+    dataset = None
+    try:
+        if not full_path or not job.get('url'):
+            raise ValueError('Job needs full_path and url')
+        if job.get('resume') and base.checkpoint is None:
+            raise ValueError('resume needs the daemon to run with --checkpoint-db')
+        if job.get('pages') and dataset_dir:
+            raise ValueError('pages would replace the city in the dataset with only those pages; use resume')
+        max_pages = job.get('max_pages')
+        if max_pages is not None and (isinstance(max_pages, bool) or not isinstance(max_pages, int) or max_pages < 1):
+            raise ValueError(f"max_pages must be a positive integer, got {max_pages!r}")
+        
+        pages, from_page = pagination.parse_page_spec(job['pages']) if job.get('pages') else (None, 1)
+        scraper = base.for_city(full_path, job['url'], max_pages)
+        if dataset_dir:
+            dataset = ParquetDataset(dataset_dir, DATASET_COLUMN_TYPES)
+        output = scrape_city(scraper, pages, from_page, resume=bool(job.get('resume')),
+                             timings=bool(job.get('timings', timings)),
+                             sinks=[dataset] if dataset is not None else ())
+        if dataset is not None:
+            finish_dataset(dataset, output)
+    except Exception as e:
+        if dataset is not None:
+            dataset.abort()
+        logger.error(f"Scraping failed: {e}")
+        output = {
+            'success': False,
+            'error': str(e),
+            'city_path': full_path
+        }
+    
+    if 'id' in job:
+        output['id'] = job['id']
+    return output
+
+def serve_jobs(base: HappyCowScraper, lines: Iterable[str], write: Callable[[str], None], timings: bool = False,
+               dataset_dir: Optional[str] = None):
+    """Run NDJSON jobs from `lines`, writing one NDJSON result per job"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError('expected a JSON object')
+        except ValueError as e:
+            output = {'success': False, 'error': f"Invalid job: {e}"}
+        else:
+            output = run_job(base, job, timings, dataset_dir)
+        write(json.dumps(output, default=str) + '\n')
+
+def serve_stdin(base: HappyCowScraper, timings: bool = False, dataset_dir: Optional[str] = None):
+    """Daemon loop reading jobs from stdin until EOF"""
+    def write(text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    
+    logger.info("Waiting for NDJSON jobs on stdin")
+    serve_jobs(base, sys.stdin, write, timings, dataset_dir)
+
+def serve_socket(base: HappyCowScraper, path: str, timings: bool = False, dataset_dir: Optional[str] = None):
+    """Daemon serving NDJSON jobs on a Unix socket; each connection may send many jobs"""
+    class JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def write(text):
+                self.wfile.write(text.encode())
+                self.wfile.flush()
+            
+            serve_jobs(base, (line.decode() for line in self.rfile), write, timings, dataset_dir)
+    
+    # Every connection's jobs fetch through base's session; without a larger pool,
+    # parallel jobs would open and discard a connection per request past its size
+    base.size_pool(base.concurrency * SOCKET_POOL_JOBS)
+    
+    # A socket left behind by a daemon that was killed
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        os.unlink(path)
+    
+    with socketserver.ThreadingUnixStreamServer(path, JobHandler) as server:
+        server.daemon_threads = True
+        logger.info(f"Waiting for NDJSON jobs on {path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(path)
+
+def configure_logging():
+    """Log to scraper.log and the console; called by main() so importers keep their own logging"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('scraper.log'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+def log_to_stderr():
+    """Move console logging off stdout when stdout carries machine-readable output"""
+    for handler in logging.getLogger().handlers:
+        if type(handler) is logging.StreamHandler and handler.stream is sys.stdout:
+            handler.setStream(sys.stderr)
 
 def main():
     """Main function for command line usage"""
+    configure_logging()
+    
     parser = argparse.ArgumentParser(description='HappyCow City Scraper for n8n Integration')
-    parser.add_argument('full_path', help='City path (e.g., north_america/usa/texas/dallas)')
-    parser.add_argument('url', help='Full HappyCow URL')
+    parser.add_argument('full_path', nargs='?', help='City path (e.g., north_america/usa/texas/dallas)')
+    parser.add_argument('url', nargs='?', help='Full HappyCow URL')
     parser.add_argument('--max-pages', type=int, default=20, help='Maximum pages to scrape (default: 20)')
-    parser.add_argument('--output-csv', help='Output CSV filename')
-    parser.add_argument('--output-json', help='Output JSON filename for n8n')
+    parser.add_argument('--concurrency', type=int, default=1, help='Page requests to keep in flight (default: 1)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help='Maximum requests per second to HappyCow (default: 0.33, one request every 3s)')
+    parser.add_argument('--max-rate', type=float,
+                        help='Ceiling the rate may climb to while HappyCow responds quickly (default: --rate)')
+    parser.add_argument('--min-rate', type=float,
+                        help='Floor the rate is cut to on 429/5xx responses (default: --rate / 10)')
+    parser.add_argument('--burst', type=int, default=1,
+                        help='Requests that may be sent back to back before --rate applies (default: 1)')
+    parser.add_argument('--rate-db', default=DEFAULT_RATE_DB,
+                        help='SQLite file holding the request budget shared by concurrent runs and services '
+                             f'(default: {DEFAULT_RATE_DB}; empty string limits this run on its own)')
+    parser.add_argument('--output-csv', help='Output CSV filename (written page by page)')
+    parser.add_argument('--output-json',
+                        help='Output JSON filename for n8n (restaurants written page by page, summary last)')
+    parser.add_argument('--output-jsonl', help='Output NDJSON filename, one restaurant per line')
+    parser.add_argument('--output-parquet',
+                        help='Output Parquet filename, one row group per page (requires pyarrow)')
+    parser.add_argument('--output-dataset',
+                        help='Directory of a Hive-partitioned Parquet dataset (state=/city=/scrape_date=) to add '
+                             'the city to, replacing its partition for today; also works with --daemon '
+                             '(requires pyarrow)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write restaurants to stdout as NDJSON ({"record": "restaurant", ...}) as pages '
+                             'are parsed and a {"record": "summary", ...} line last, instead of one JSON '
+                             'object at the end; restaurants are not held in memory and logs go to stderr')
+    parser.add_argument('--parser', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help='HTML parser backend (default: bs4)')
+    parser.add_argument('--stream-parse', action='store_true',
+                        help='Build only venue card subtrees instead of the full page tree')
+    parser.add_argument('--archive-dir', help='Directory to archive raw AJAX responses in')
+    parser.add_argument('--replay', action='store_true',
+                        help='Parse responses from --archive-dir instead of the network')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries per page for timeouts, dropped connections, 429s and 5xx (default: 3)')
+    parser.add_argument('--pages',
+                        help="Scrape only these pages, e.g. a partial run's resume_pages ('3,7,12-')")
+    parser.add_argument('--checkpoint-db', default=DEFAULT_CHECKPOINT_DB,
+                        help='SQLite file each page is checkpointed to '
+                             f'(default: {DEFAULT_CHECKPOINT_DB}; empty string disables checkpoints)')
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the city's last run from its checkpoint instead of starting over")
+    parser.add_argument('--timings', action='store_true',
+                        help='Add per-page phase timings (connect, TTFB, download, decode, parse) to the output')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Stay running and scrape NDJSON jobs ({"full_path", "url", ...}) read from stdin, '
+                             'writing one JSON result per line')
+    parser.add_argument('--socket', help='With --daemon, take jobs on this Unix socket instead of stdin')
     
     args = parser.parse_args()
     
+    if args.socket and not args.daemon:
+        parser.error('--socket requires --daemon')
+    if args.daemon:
+        for option in ('full_path', 'url', 'pages', 'output_csv', 'output_json'):
+            if getattr(args, option):
+                parser.error(f"{option} is set per job in --daemon mode")
+        if args.resume:
+            parser.error('resume is set per job in --daemon mode')
+        if args.output_jsonl or args.output_parquet or args.stream:
+            parser.error('--output-jsonl, --output-parquet and --stream are not available in --daemon mode')
+    elif not (args.full_path and args.url):
+        parser.error('full_path and url are required unless running with --daemon')
+    
+    if args.replay and not args.archive_dir:
+        parser.error('--replay requires --archive-dir')
+    
+    if args.resume and not args.checkpoint_db:
+        parser.error('--resume requires --checkpoint-db')
+    if args.resume and args.pages:
+        parser.error('--resume and --pages cannot be combined')
+    if args.output_dataset and args.pages:
+        parser.error('--pages would replace the city in --output-dataset with only those pages; use --resume')
+    
+    pages, from_page = None, 1
+    if args.pages:
+        try:
+            pages, from_page = pagination.parse_page_spec(args.pages)
+        except ValueError as e:
+            parser.error(f'--pages: {e}')
+    
+    if args.daemon:
+        # stdout carries the job results; keep log lines off it
+        log_to_stderr()
+        
+        base = build_scraper(args, '', 'https://www.happycow.net/')
+        if args.socket:
+            serve_socket(base, args.socket, args.timings, args.output_dataset)
+        else:
+            serve_stdin(base, args.timings, args.output_dataset)
+        return 0
+    
+    if args.stream:
+        # stdout carries the NDJSON records; keep log lines off it
+        log_to_stderr()
+    
+    sinks = []
+    json_output = None
+    dataset = None
     try:
         # Initialize scraper
-        scraper = HappyCowScraper(args.full_path, args.url, args.max_pages)
-        
-        # Scrape all pages
-        restaurants = scraper.scrape_all_pages()
+        scraper = build_scraper(args, args.full_path, args.url)
         
-        # Get summary
-        summary = scraper.get_summary()
+        # Output files are written page by page as the scrape goes
+        if args.output_csv:
+            sinks.append(CsvSink(args.output_csv))
+        if args.output_jsonl:
+            sinks.append(JsonlSink(args.output_jsonl))
+        if args.output_parquet:
+            sinks.append(ParquetSink(args.output_parquet, COLUMN_TYPES))
+        if args.output_json:
+            json_output = JsonSink(args.output_json)
+            sinks.append(json_output)
+        if args.output_dataset:
+            dataset = ParquetDataset(args.output_dataset, DATASET_COLUMN_TYPES)
+            sinks.append(dataset)
+        if args.stream:
+            sinks.append(JsonlSink(sys.stdout, tag={'record': 'restaurant'}))
         
         # Output for n8n (JSON to stdout)
-        output = {
-            'success': True,
-            'summary': summary,
-            'restaurants': restaurants
-        }
+        output = scrape_city(scraper, pages, from_page, resume=args.resume, timings=args.timings,
+                             sinks=sinks, keep_restaurants=not args.stream)
         
-        # Save to CSV if requested
-        if args.output_csv:
-            scraper.save_to_csv(args.output_csv)
+        if dataset is not None:
+            finish_dataset(dataset, output)
         
-        # Save to JSON if requested
-        if args.output_json:
-            with open(args.output_json, 'w') as f:
-                json.dump(output, f, indent=2, default=str)
+        # The JSON file already holds the restaurants; the summary goes after them
+        if json_output is not None:
+            json_output.finish({key: value for key, value in output.items() if key != 'restaurants'})
         
         # Output JSON to stdout for n8n
-        print(json.dumps(output, default=str))
+        if args.stream:
+            print(json.dumps({'record': 'summary', **output}, default=str))
+        else:
+            print(json.dumps(output, default=str))
         
         return 0
         
@@ -353,8 +794,17 @@ def main():
         }
         
         logger.error(f"Scraping failed: {e}")
-        print(json.dumps(error_output))
+        if dataset is not None:
+            # Leave the city's previous partition in place
+            dataset.abort()
+        if json_output is not None:
+            json_output.finish(error_output)
+        print(json.dumps({'record': 'summary', **error_output} if args.stream else error_output))
         return 1
+    
+    finally:
+        for sink in sinks:
+            sink.close()
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
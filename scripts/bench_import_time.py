@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Measure CLI cold-start import time
+Usage: python scripts/bench_import_time.py [--repeat 5] [--budget-ms 400] [--top 10]
+
+Each CLI module is imported in a fresh interpreter under `python -X importtime`,
+the way n8n pays for it on every city. Reports the best cumulative import time
+of the module and the wall time of the whole process, lists the slowest
+imports, and fails if a module pulls in a heavy dependency (pandas, the
+crawl4ai browser stack, lxml) that its JSON-only path does not use, or if
+--budget-ms is given and exceeded.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+HEAVY = ('pandas', 'numpy', 'pyarrow', 'crawl4ai', 'playwright', 'lxml')
+
+# CLI module -> heavy packages it must not import at start-up
+MODULES = {
+    'production_city_scraper': HEAVY,
+    'ajax_scraper': HEAVY,
+    'happycow_scraper_v1': HEAVY,
+}
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+def import_once(module, workdir):
+    """Import module in a fresh interpreter; returns (wall_seconds, {name: (self_us, cumulative_us)})"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    start = time.perf_counter()
+    # Run outside the repo so start-up side effects (log files) land in a scratch dir
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               cwd=workdir, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    imports = {}
+    for line in completed.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            imports[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return wall, imports
+
+
+def measure(module, forbidden, repeat, top, workdir):
+    best_import = best_wall = None
+    imports = {}
+    for _ in range(repeat):
+        wall, imports = import_once(module, workdir)
+        cumulative = imports.get(module, (0, 0))[1] / 1e6
+        best_import = cumulative if best_import is None else min(best_import, cumulative)
+        best_wall = wall if best_wall is None else min(best_wall, wall)
+
+    loaded = sorted({name.split('.')[0] for name in imports} & set(forbidden))
+    slowest = sorted(imports.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        'import_ms': round(best_import * 1000, 1),
+        'process_ms': round(best_wall * 1000, 1),
+        'modules_imported': len(imports),
+        'heavy_imports': loaded,
+        'slowest_self_ms': {name: round(self_us / 1000, 1) for name, (self_us, _) in slowest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure CLI cold-start import time')
+    parser.add_argument('modules', nargs='*', default=list(MODULES), help='Modules to measure (default: the CLIs)')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per module; the best run counts')
+    parser.add_argument('--budget-ms', type=float, help='Fail if a module takes longer than this to import')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to list per module')
+    args = parser.parse_args()
+
+    report = {}
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for module in args.modules:
+            result = report[module] = measure(module, MODULES.get(module, HEAVY), args.repeat, args.top, workdir)
+            print(f"{module:<26}import {result['import_ms']:>7.1f} ms   process {result['process_ms']:>7.1f} ms   "
+                  f"{result['modules_imported']} modules")
+
+            if result['heavy_imports']:
+                failures.append(f"{module} imports {', '.join(result['heavy_imports'])} at start-up")
+            if args.budget_ms is not None and result['import_ms'] > args.budget_ms:
+                failures.append(f"{module} takes {result['import_ms']} ms to import (budget {args.budget_ms} ms)")
+
+    print(json.dumps(report, indent=2))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ No heavy imports at start-up")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
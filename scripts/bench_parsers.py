@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Compare HTML parser backends over saved responses
+Usage: python scripts/bench_parsers.py <input> [<input> ...] [--repeat 3]
+
+Inputs are anything parse_existing_html.py accepts (response archives,
+saved AJAX JSON, saved listing HTML). Every backend, in both full-tree and
+streaming (card-only) mode, is checked against the BeautifulSoup full-tree
+reference and timed on parse+extract. Peak memory per page comes from a
+separate tracemalloc pass; it covers Python allocations only, so the C-side
+trees of lxml and selectolax are not included.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add repository root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from parse_existing_html import configure_parser, discover_documents, load_payload, _get_scraper
+from src.core.html_backends import available_backends
+
+# Fetch time differs per run, so it is left out of the comparison
+VOLATILE_FIELDS = ('scraped_at',)
+
+
+def _comparable(restaurants):
+    return [{k: v for k, v in r.to_dict().items() if k not in VOLATILE_FIELDS} for r in restaurants]
+
+
+def run_backend(backend, stream_parse, payloads, repeat):
+    """Parse every payload `repeat` times; returns (best_seconds, results)"""
+    configure_parser(backend, stream_parse)
+    best = None
+    results = []
+    for _ in range(repeat):
+        results = []
+        start = time.perf_counter()
+        for city_path, page, data in payloads:
+            restaurants, _ = _get_scraper(city_path).parse_page(data, page)
+            results.append(restaurants)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def peak_memory(backend, stream_parse, payloads):
+    """Largest traced allocation peak while parsing any single payload"""
+    configure_parser(backend, stream_parse)
+    peak = 0
+    for city_path, page, data in payloads:
+        tracemalloc.start()
+        _get_scraper(city_path).parse_page(data, page)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parser backends')
+    parser.add_argument('inputs', nargs='+', help='Files, directories or response archives')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per backend; best is reported')
+    args = parser.parse_args()
+
+    payloads = []
+    total_bytes = 0
+    for document in discover_documents(args.inputs):
+        data, n_bytes = load_payload(document)
+        payloads.append((document[2], document[3], data))
+        total_bytes += n_bytes
+
+    if not payloads:
+        print("❌ No documents found")
+        return 1
+
+    backends = available_backends()
+    print(f"📊 {len(payloads)} documents, {total_bytes / 1e6:.1f} MB, backends: {', '.join(backends)}")
+
+    reference_time, reference = run_backend('bs4', False, payloads, args.repeat)
+    reference = [_comparable(page) for page in reference]
+    venues = sum(len(page) for page in reference)
+
+    report = []
+    for backend in backends:
+        for stream_parse in (False, True):
+            if backend == 'bs4' and not stream_parse:
+                elapsed, mismatches = reference_time, 0
+            else:
+                elapsed, results = run_backend(backend, stream_parse, payloads, args.repeat)
+                mismatches = sum(1 for ref, got in zip(reference, results) if ref != _comparable(got))
+
+            report.append({
+                'backend': backend,
+                'mode': 'stream' if stream_parse else 'full',
+                'seconds': round(elapsed, 4),
+                'docs_per_second': round(len(payloads) / elapsed, 1),
+                'venues_per_second': round(venues / elapsed, 1),
+                'speedup_vs_bs4': round(reference_time / elapsed, 2),
+                'peak_kb_per_page': round(peak_memory(backend, stream_parse, payloads) / 1024, 1),
+                'mismatched_documents': mismatches,
+            })
+
+    print(f"\n{'backend':<12}{'mode':<8}{'seconds':>10}{'docs/s':>10}{'venues/s':>12}"
+          f"{'speedup':>9}{'peak KB':>10}{'mismatch':>10}")
+    for row in report:
+        print(f"{row['backend']:<12}{row['mode']:<8}{row['seconds']:>10}{row['docs_per_second']:>10}"
+              f"{row['venues_per_second']:>12}{row['speedup_vs_bs4']:>9}{row['peak_kb_per_page']:>10}"
+              f"{row['mismatched_documents']:>10}")
+    print(json.dumps(report))
+
+    return 0 if all(row['mismatched_documents'] == 0 for row in report) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
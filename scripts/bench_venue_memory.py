@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Compare memory held by venue dicts and VenueRecord
+Usage: python scripts/bench_venue_memory.py [--venues 100000] [--per-page 20] [--repeat 3]
+
+Builds the same synthetic city twice: once as the 16-key dicts the scraper
+used to keep (fresh tag lists, a scraped_at string per venue) and once as
+VenueRecord (slots, interned type/price/tags, one scraped_at per page).
+Reports the Python memory each form keeps alive (tracemalloc), build time,
+and the cost of converting records back to dicts for the JSON output.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Add repository root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.extractor import core_record
+from src.models.venue import VenueRecord
+
+CITY_PATH = 'north_america/usa/texas/dallas'
+TYPES = ('vegan', 'vegetarian', 'veg-options')
+PRICES = ('$', '$$', '$$$', '')
+CUISINES = ('Mexican', 'Thai', 'Cafe', 'Pizza', 'Indian', 'Bakery', 'Juice Bar', 'Asian')
+FEATURES = ('Delivery', 'Takeout', 'Outdoor Seating', 'Wheelchair Accessible')
+
+
+def _fresh(text):
+    """A new string object, as the HTML parser returns for every venue"""
+    return ''.join(list(text))
+
+
+def extracted_venue(i, rng):
+    """A venue shaped like src.core.extractor.extract_venue() output"""
+    return {
+        'venue_id': str(100000 + i),
+        'name': f"Venue {i}",
+        'type': _fresh(rng.choice(TYPES)),
+        'rating': round(rng.uniform(0, 5), 1),
+        'review_count': rng.randint(0, 500),
+        'address': f"{i} Main Street, Dallas, Texas",
+        'latitude': 32.7 + rng.random() / 10,
+        'longitude': -96.8 + rng.random() / 10,
+        'phone': f"(214) {i % 1000:03d}-{i % 10000:04d}",
+        'website': f"https://venue{i}.example.com",
+        'cuisine_tags': [_fresh(tag) for tag in rng.sample(CUISINES, rng.randint(0, 3))],
+        'price_range': _fresh(rng.choice(PRICES)),
+        'features': [_fresh(tag) for tag in rng.sample(FEATURES, rng.randint(0, 2))],
+        'url': f"/reviews/venue-{i}",
+        'hours_status': None,
+        'distance': None,
+        'is_top': False,
+        'is_new': False,
+        'is_partner': False,
+    }
+
+
+def as_dict(venue, page):
+    """The record the scraper built before VenueRecord"""
+    restaurant = core_record(venue)
+    restaurant['city_path'] = CITY_PATH
+    restaurant['scraped_at'] = datetime.now().isoformat()
+    restaurant['page_number'] = page
+    return restaurant
+
+
+def as_record(venue, page, scraped_at):
+    return VenueRecord(venue, CITY_PATH, scraped_at, page)
+
+
+def build(form, venues, per_page):
+    """Build a city of `venues` venues in the given form ('dict' or 'record')"""
+    rng = random.Random(42)
+    records = []
+    for first in range(0, venues, per_page):
+        page = first // per_page + 1
+        scraped_at = datetime.now().isoformat()
+        for i in range(first, min(first + per_page, venues)):
+            venue = extracted_venue(i, rng)
+            records.append(as_dict(venue, page) if form == 'dict' else as_record(venue, page, scraped_at))
+    return records
+
+
+def retained_bytes(form, venues, per_page):
+    """Python memory kept alive by a city built in the given form"""
+    tracemalloc.start()
+    records = build(form, venues, per_page)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return retained
+
+
+def _comparable(restaurant):
+    return {key: value for key, value in restaurant.items() if key != 'scraped_at'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark venue record memory')
+    parser.add_argument('--venues', type=int, default=100000, help='Venues to build (default: 100000)')
+    parser.add_argument('--per-page', type=int, default=20, help='Venues per listing page')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs per form; best is reported')
+    args = parser.parse_args()
+
+    report = {}
+    results = {}
+    for form in ('dict', 'record'):
+        # tracemalloc slows allocation down, so time untraced builds separately
+        best = None
+        for _ in range(args.repeat):
+            results[form] = None
+            start = time.perf_counter()
+            results[form] = build(form, args.venues, args.per_page)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        retained = retained_bytes(form, args.venues, args.per_page)
+        report[form] = {
+            'retained_mb': round(retained / 1e6, 2),
+            'bytes_per_venue': round(retained / args.venues, 1),
+            'build_seconds': round(best, 3),
+        }
+
+    start = time.perf_counter()
+    converted = [record.to_dict() for record in results['record']]
+    report['record']['to_dict_seconds'] = round(time.perf_counter() - start, 3)
+
+    mismatches = sum(1 for old, new in zip(results['dict'], converted) if _comparable(old) != _comparable(new))
+    report['memory_saved_percent'] = round(
+        100 * (1 - report['record']['retained_mb'] / report['dict']['retained_mb']), 1)
+    report['mismatched_venues'] = mismatches
+
+    print(f"📊 {args.venues} venues, {args.per_page} per page")
+    for form in ('dict', 'record'):
+        row = report[form]
+        print(f"{form:<8}{row['retained_mb']:>9.2f} MB  {row['bytes_per_venue']:>7.1f} B/venue  "
+              f"build {row['build_seconds']:.3f}s")
+    print(f"VenueRecord saves {report['memory_saved_percent']}%; "
+          f"to_dict() for output takes {report['record']['to_dict_seconds']:.3f}s")
+    print(json.dumps(report))
+
+    return 0 if mismatches == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
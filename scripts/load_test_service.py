@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Load-test the Flask and async scraper services side by side
+Usage: python scripts/load_test_service.py [--requests 200] [--clients 50] [--latency-ms 300]
+
+Nothing is sent to HappyCow. A local fake upstream serves synthetic AJAX
+listings with a fixed response latency, and each service is started the
+way it is deployed, pointed at the fake upstream:
+  flask: gunicorn cloud_scraper_service:app --workers 2 --worker-class gthread --threads 8 --timeout 120
+         (as in the Procfile)
+  async: uvicorn async_scraper_service:app --workers 2
+Every request scrapes a different city with caching and rate limiting
+off, so each one costs real (fake) upstream round trips. Reports
+throughput, latency percentiles and errors per service.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+ROOT = Path(__file__).parent.parent
+
+SERVICES = {
+    'flask': ['gunicorn', 'cloud_scraper_service:app', '--workers', '2', '--worker-class', 'gthread',
+              '--threads', '8', '--timeout', '120', '--bind', '127.0.0.1:{port}'],
+    'async': [sys.executable, '-m', 'uvicorn', 'async_scraper_service:app', '--workers', '2',
+              '--host', '127.0.0.1', '--port', '{port}', '--log-level', 'warning'],
+}
+
+VENUE_CARD = (
+    '<div class="venue-list-item card-listing" data-id="{id}" data-type="vegan">'
+    '<a class="venue-list-item-name-link" data-analytics="listing-card-title" href="/reviews/v-{id}">Venue {id}</a>'
+    '<span class="venue-rating">4.5</span><span class="review-count">({id} reviews)</span>'
+    '<div class="venue-address">{id} Main St</div><span class="cuisine-tag">Thai</span>'
+    '<a href="https://www.google.com/maps?q=32.7,-96.8">Map</a></div>'
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_fake_upstream(latency, pages, venues_per_page):
+    """Serve synthetic AJAX listings on a local port; returns the server"""
+    bodies = {}
+    for page in range(1, pages + 1):
+        html = ''.join(VENUE_CARD.format(id=page * 1000 + i) for i in range(venues_per_page))
+        bodies[page] = json.dumps({
+            'success': True,
+            'data': {'data': html, 'paginated': {'current_page': page, 'last_page': pages}},
+        }).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            # Headers and body go out as separate writes; don't let Nagle hold the body back
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            page = int(parse_qs(urlparse(self.path).query).get('page', ['1'])[0])
+            body = bodies.get(page, bodies[1])
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_service(name, upstream_url, host_concurrency):
+    port = free_port()
+    env = dict(os.environ,
+               SCRAPER_UPSTREAM_URL=upstream_url,
+               SCRAPER_RATE='0',
+               SCRAPER_CACHE_TTL='0',
+               SCRAPER_HOST_CONCURRENCY=str(host_concurrency))
+    command = [part.format(port=port) for part in SERVICES[name]]
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{base_url}/health", timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError(f"{name} service did not start: {' '.join(command)}")
+
+
+def run_load(base_url, n_requests, clients):
+    """Fire n_requests distinct city scrapes from `clients` concurrent clients"""
+    def one(i):
+        body = {
+            'url': f"https://www.happycow.net/north_america/usa/loadtest/city_{i}/",
+            'full_path': f"north_america/usa/loadtest/city_{i}",
+            'city': f"City {i}",
+            'state': 'Loadtest',
+        }
+        start = time.perf_counter()
+        try:
+            response = requests.post(f"{base_url}/scrape", json=body, timeout=300)
+            ok = response.status_code == 200 and response.json().get('success')
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        outcomes = list(executor.map(one, range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in outcomes)
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 3)
+
+    return {
+        'requests': n_requests,
+        'errors': sum(1 for _, ok in outcomes if not ok),
+        'seconds': round(elapsed, 2),
+        'requests_per_second': round(n_requests / elapsed, 2),
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'p99': percentile(99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Flask and async scraper services under load')
+    parser.add_argument('--requests', type=int, default=200, help='City scrapes per service')
+    parser.add_argument('--clients', type=int, default=50, help='Concurrent clients')
+    parser.add_argument('--latency-ms', type=int, default=300, help='Fake upstream latency per page')
+    parser.add_argument('--pages', type=int, default=3, help='Pages per city')
+    parser.add_argument('--venues-per-page', type=int, default=20)
+    parser.add_argument('--host-concurrency', type=int, default=16,
+                        help='SCRAPER_HOST_CONCURRENCY for both services')
+    parser.add_argument('--services', default='flask,async', help='Comma-separated services to test')
+    args = parser.parse_args()
+
+    upstream = start_fake_upstream(args.latency_ms / 1000, args.pages, args.venues_per_page)
+    upstream_url = f"http://127.0.0.1:{upstream.server_address[1]}"
+    print(f"🧪 Fake upstream at {upstream_url}: {args.pages} pages/city, {args.latency_ms} ms/page")
+
+    report = {}
+    for name in args.services.split(','):
+        process, base_url = start_service(name, upstream_url, args.host_concurrency)
+        try:
+            run_load(base_url, min(args.clients, args.requests), args.clients)  # warm up
+            report[name] = run_load(base_url, args.requests, args.clients)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        print(f"{name:<8}{json.dumps(report[name])}")
+
+    upstream.shutdown()
+
+    if 'flask' in report and 'async' in report:
+        speedup = report['async']['requests_per_second'] / report['flask']['requests_per_second']
+        print(f"\n⚡ async throughput: {speedup:.1f}x flask")
+    print(json.dumps(report))
+
+    return 0 if all(row['errors'] == 0 for row in report.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
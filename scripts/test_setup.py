@@ -93,6 +93,23 @@ def test_config():
         print(f"❌ Configuration test failed: {e}")
         return False
 
+def test_import_time():
+    """Test that the CLIs start without loading heavy optional dependencies"""
+    print("\n⏱️ Testing CLI import time...")
+    
+    import subprocess
+    
+    script = Path(__file__).parent / "bench_import_time.py"
+    result = subprocess.run([sys.executable, str(script), "--repeat", "3", "--top", "0"],
+                            capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        # Per-module summary lines and the verdict; skip the JSON report
+        if not line.startswith((" ", "{", "}")):
+            print(line)
+    if result.returncode != 0 and result.stderr:
+        print(f"❌ Import time check failed: {result.stderr.strip()[-500:]}")
+    return result.returncode == 0
+
 def main():
     print("🚀 HappyCow Scraper Setup Test")
     print("=" * 50)
@@ -101,7 +118,8 @@ def main():
         test_imports,
         test_stealth_functionality,
         test_models,
-        test_config
+        test_config,
+        test_import_time
     ]
     
     passed = 0
@@ -10,15 +10,18 @@ Based on JavaScript analysis showing restaurant data loads via:
 
 import requests
 import json
-import re
 from pathlib import Path
 from urllib.parse import quote
 from bs4 import BeautifulSoup
 import pandas as pd
 import time
 
+from src.core.extractor import UNKNOWN_NAME, extract_venue
+from src.core.html_backends import DEFAULT_BACKEND, parse_html
+
 class SimpleHappyCowScraper:
-    def __init__(self):
+    def __init__(self, parser_backend=DEFAULT_BACKEND):
+        self.parser_backend = parser_backend
         self.base_url = "https://www.happycow.net"
         self.session = requests.Session()
         self.session.headers.update({
@@ -124,7 +127,7 @@ class SimpleHappyCowScraper:
     
     def parse_restaurant_html(self, html_content):
         """Parse restaurant data from the HTML content returned by AJAX."""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = parse_html(html_content, self.parser_backend)
         restaurants = []
         
         # Find all venue list items
@@ -146,40 +149,36 @@ class SimpleHappyCowScraper:
         
         for item in venue_items:
             try:
-                restaurant = {}
+                venue = extract_venue(item)
                 
-                # Basic data from attributes
-                restaurant['id'] = item.get('data-id')
-                restaurant['type'] = item.get('data-type')
-                restaurant['is_top'] = item.get('data-top') == '1'
-                restaurant['is_new'] = item.get('data-new') == '1'
-                restaurant['is_partner'] = item.get('data-partner') == '1'
+                restaurant = {
+                    'id': venue['venue_id'] or None,
+                    'type': item.get('data-type'),
+                    'is_top': venue['is_top'],
+                    'is_new': venue['is_new'],
+                    'is_partner': venue['is_partner'],
+                }
                 
-                # Name
-                name_el = item.select_one('[data-analytics="listing-card-title"]')
-                if not name_el:
+                # Name, falling back to any heading on unfamiliar markup
+                name = venue['name'] if venue['name'] != UNKNOWN_NAME else None
+                if not name:
                     name_el = item.select_one('.venue-title, .listing-title, h3, h2')
-                restaurant['name'] = name_el.get_text(strip=True) if name_el else None
+                    name = name_el.get_text(strip=True) if name_el else None
+                restaurant['name'] = name
                 
-                # URL
-                link_el = item.select_one('a[href*="/reviews/"]')
-                if not link_el:
+                # URL, falling back to the first link
+                url = venue['url']
+                if not url:
                     link_el = item.select_one('a[href]')
-                restaurant['url'] = link_el.get('href') if link_el else None
+                    url = link_el.get('href') if link_el else None
+                restaurant['url'] = url
                 
-                # Address
-                address_el = item.select_one('.venue-address')
-                restaurant['address'] = address_el.get_text(strip=True) if address_el else None
+                restaurant['address'] = venue['address'] or None
                 
                 # Coordinates from Google Maps link
-                maps_link = item.select_one('a[href*="google.com/maps"]')
-                if maps_link:
-                    href = maps_link.get('href')
-                    if href and isinstance(href, str):
-                        coord_match = re.search(r'q=([+-]?\d+\.?\d*),([+-]?\d+\.?\d*)', href)
-                        if coord_match:
-                            restaurant['latitude'] = float(coord_match.group(1))
-                            restaurant['longitude'] = float(coord_match.group(2))
+                if venue['latitude'] is not None:
+                    restaurant['latitude'] = venue['latitude']
+                    restaurant['longitude'] = venue['longitude']
                 
                 # Only add if we have essential data
                 if restaurant.get('name') and restaurant.get('id'):
@@ -0,0 +1,184 @@
+"""
+Single-pass venue extractor shared by every scraper.
+
+Each venue card (div.venue-list-item) is walked once. Every element is
+dispatched by class name through a precompiled field table, so adding a
+selector means adding a table entry rather than another tree search. The
+table covers every class naming scheme HappyCow listings have used.
+
+Works on any document returned by src.core.html_backends.parse_html().
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .html_backends import DEFAULT_BACKEND, stream_elements
+
+# Field kinds
+TEXT = 'text'   # first matching element's text
+LIST = 'list'   # text of every matching element
+HREF = 'href'   # first matching element's href
+
+# class name -> (field, kind)
+FIELD_TABLE = {
+    # Listing card markup
+    'venue-name': ('name', TEXT),
+    'venue-rating': ('rating', TEXT),
+    'review-count': ('review_count', TEXT),
+    'venue-address': ('address', TEXT),
+    'venue-phone': ('phone', TEXT),
+    'venue-website': ('website', HREF),
+    'cuisine-tag': ('cuisine_tags', LIST),
+    'price-range': ('price_range', TEXT),
+    'venue-feature': ('features', LIST),
+    'feature-tag': ('features', LIST),
+    'venue-cuisine': ('cuisine_tags', LIST),
+    'venue-price': ('price_range', TEXT),
+    'venue-hours-text': ('hours_status', TEXT),
+    'venue-distance': ('distance', TEXT),
+
+    # venue-list-item-* markup
+    'venue-list-item-name-link': ('name', TEXT),
+    'venue-list-item-rating': ('rating', TEXT),
+    'venue-list-item-review-count': ('review_count', TEXT),
+    'venue-list-item-address': ('address', TEXT),
+    'venue-list-item-website': ('website', HREF),
+    'venue-list-item-cuisine': ('cuisine_tags', LIST),
+    'venue-list-item-price': ('price_range', TEXT),
+    'venue-list-item-feature': ('features', LIST),
+}
+
+# Classes that fill a second field as well: the AJAX scrapers' 'cuisine' is
+# the first .venue-cuisine text, apart from the merged cuisine_tags
+EXTRA_FIELDS = {
+    'venue-cuisine': ('cuisine', TEXT),
+}
+
+# class name -> every (field, kind) it fills, built once at import
+_DISPATCH = {
+    class_name: (entry,) + ((EXTRA_FIELDS[class_name],) if class_name in EXTRA_FIELDS else ())
+    for class_name, entry in FIELD_TABLE.items()
+}
+
+# Attribute-marked fields: (attribute, value) -> field
+ATTRIBUTE_TABLE = {
+    ('data-analytics', 'listing-card-title'): 'name',
+}
+
+# Name reported for cards without a title element
+UNKNOWN_NAME = 'Unknown'
+
+# Fields every scraper's venue records share, in output order
+CORE_FIELDS = (
+    'venue_id', 'name', 'type', 'rating', 'review_count', 'address',
+    'latitude', 'longitude', 'phone', 'website', 'cuisine_tags',
+    'price_range', 'features',
+)
+
+NUMBER_RE = re.compile(r'(\d+\.?\d*)')
+INTEGER_RE = re.compile(r'(\d+)')
+MAPS_RE = re.compile(r'google\.com/maps')
+MAPS_QUERY_RE = re.compile(r'[?&]q=([+-]?\d+\.?\d*),([+-]?\d+\.?\d*)')
+MAPS_AT_RE = re.compile(r'@([+-]?\d+\.?\d*),([+-]?\d+\.?\d*)')
+
+
+VENUE_CARD_TAG = 'div'
+VENUE_CARD_CLASS = 'venue-list-item'
+
+
+def find_venue_items(document) -> List:
+    """All venue cards in a parsed listing document"""
+    return document.find_all(VENUE_CARD_TAG, class_=VENUE_CARD_CLASS)
+
+
+def iter_venue_items(html: str, backend: str = DEFAULT_BACKEND) -> Iterator:
+    """Stream venue cards straight from HTML without a full document tree"""
+    return stream_elements(html, VENUE_CARD_TAG, VENUE_CARD_CLASS, backend)
+
+
+def parse_coordinates(href: str) -> Tuple[Optional[float], Optional[float]]:
+    """Latitude and longitude from a Google Maps link"""
+    match = MAPS_QUERY_RE.search(href) or MAPS_AT_RE.search(href)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    return None, None
+
+
+def extract_venue(item) -> Dict:
+    """
+    Extract every known field from a venue card in one walk.
+    Missing fields get the production defaults ('' / 0 / [] / None).
+    """
+    texts = {}
+    lists = {'cuisine_tags': [], 'features': []}
+    website = ''
+    url = None
+    tel = ''
+    latitude = longitude = None
+
+    for element in item.find_all():
+        classes = element.get('class')
+        if classes:
+            for class_name in classes:
+                entries = _DISPATCH.get(class_name)
+                if entries is None:
+                    continue
+                for field, kind in entries:
+                    if kind == LIST:
+                        lists[field].append(element.get_text(strip=True))
+                    elif kind == HREF:
+                        if not website:
+                            website = element.get('href', '')
+                    elif field not in texts:
+                        texts[field] = element.get_text(strip=True)
+
+        for (attribute, value), field in ATTRIBUTE_TABLE.items():
+            if field not in texts and element.get(attribute) == value:
+                texts[field] = element.get_text(strip=True)
+
+        href = element.get('href')
+        if href:
+            if latitude is None and MAPS_RE.search(href):
+                latitude, longitude = parse_coordinates(href)
+            elif not tel and href.startswith('tel:'):
+                tel = href.replace('tel:', '')
+            elif url is None and '/reviews/' in href:
+                url = href
+
+    rating = 0.0
+    match = NUMBER_RE.search(texts.get('rating', ''))
+    if match:
+        rating = float(match.group(1))
+
+    review_count = 0
+    match = INTEGER_RE.search(texts.get('review_count', ''))
+    if match:
+        review_count = int(match.group(1))
+
+    return {
+        'venue_id': item.get('data-id', ''),
+        'name': texts.get('name', UNKNOWN_NAME),
+        'type': item.get('data-type', 'unknown'),
+        'rating': rating,
+        'review_count': review_count,
+        'address': texts.get('address', ''),
+        'latitude': latitude,
+        'longitude': longitude,
+        'phone': texts.get('phone') or tel,
+        'website': website,
+        'cuisine_tags': lists['cuisine_tags'],
+        'price_range': texts.get('price_range', ''),
+        'features': lists['features'],
+        'url': url,
+        'hours_status': texts.get('hours_status'),
+        'distance': texts.get('distance'),
+        'cuisine': texts.get('cuisine'),
+        'is_top': item.get('data-top') == '1',
+        'is_new': item.get('data-new') == '1',
+        'is_partner': item.get('data-partner') == '1',
+    }
+
+
+def core_record(venue: Dict) -> Dict:
+    """The CORE_FIELDS of an extracted venue, in output order"""
+    return {field: venue[field] for field in CORE_FIELDS}
@@ -0,0 +1,379 @@
+"""
+Pluggable HTML parser backends for venue extraction.
+
+parse_html() returns a document whose nodes support the subset of the
+BeautifulSoup Tag API the scrapers use: get(), find(), find_all(),
+get_text(), select() and select_one(). The extraction code therefore runs
+unchanged on every backend and produces the same venue dicts.
+
+Backends:
+    bs4         BeautifulSoup with html.parser (default, always available)
+    lxml        lxml.html, CSS selectors via cssselect (pip install lxml cssselect)
+    selectolax  selectolax's lexbor engine (pip install selectolax)
+
+stream_elements() is the streaming counterpart: it materializes only the
+matching element subtrees (e.g. venue cards) and skips everything else.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+
+BACKENDS = ('bs4', 'lxml', 'selectolax')
+DEFAULT_BACKEND = 'bs4'
+
+# BeautifulSoup's get_text() leaves out the contents of these elements
+NON_TEXT_TAGS = frozenset(('script', 'style', 'template'))
+_NON_TEXT_SELECTOR = ', '.join(sorted(NON_TEXT_TAGS))
+
+_CSS_IDENTIFIER = re.compile(r'^-?[A-Za-z_][\w-]*$')
+
+
+def _class_matches(class_value: Optional[str], wanted: str) -> bool:
+    """Mirror BeautifulSoup's class_ matching: any single class or the whole attribute"""
+    if class_value is None:
+        return False
+    return wanted in class_value.split() or class_value == wanted
+
+
+def _attr_matches(value: Optional[str], wanted) -> bool:
+    if wanted is True:
+        return value is not None
+    if value is None:
+        return False
+    if hasattr(wanted, 'search'):
+        return wanted.search(value) is not None
+    return value == wanted
+
+
+def _collect_strings(strings, separator: str, strip: bool) -> str:
+    if strip:
+        return separator.join(s.strip() for s in strings if s.strip())
+    return separator.join(strings)
+
+
+class _Node:
+    """BeautifulSoup-compatible wrapper shared by the fast backends"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    def _tag(self) -> str:
+        raise NotImplementedError
+
+    def _attr(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _descendants(self):
+        raise NotImplementedError
+
+    def _strings(self):
+        raise NotImplementedError
+
+    def _css(self, selector: str) -> List['_Node']:
+        raise NotImplementedError
+
+    @property
+    def name(self) -> str:
+        return self._tag()
+
+    def get(self, key: str, default=None):
+        value = self._attr(key)
+        if value is None:
+            return default
+        if key == 'class':
+            return value.split()
+        return value
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def find_all(self, name=None, attrs: Optional[Dict] = None, limit: Optional[int] = None,
+                 class_=None, **kwargs) -> List['_Node']:
+        wanted = dict(attrs or {})
+        wanted.update(kwargs)
+        if class_ is not None:
+            wanted['class'] = class_
+
+        results = []
+        for node in self._descendants():
+            if name is not None and node._tag() != name:
+                continue
+            matched = True
+            for key, value in wanted.items():
+                actual = node._attr(key)
+                if key == 'class' and isinstance(value, str):
+                    matched = _class_matches(actual, value)
+                else:
+                    matched = _attr_matches(actual, value)
+                if not matched:
+                    break
+            if matched:
+                results.append(node)
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+    def find(self, name=None, attrs: Optional[Dict] = None, class_=None, **kwargs) -> Optional['_Node']:
+        results = self.find_all(name, attrs, limit=1, class_=class_, **kwargs)
+        return results[0] if results else None
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        return _collect_strings(list(self._strings()), separator, strip)
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    def select(self, selector: str) -> List['_Node']:
+        return self._css(selector)
+
+    def select_one(self, selector: str) -> Optional['_Node']:
+        results = self._css(selector)
+        return results[0] if results else None
+
+
+class _LxmlNode(_Node):
+    __slots__ = ()
+
+    def _tag(self) -> str:
+        return self._node.tag
+
+    def _attr(self, key: str) -> Optional[str]:
+        return self._node.get(key)
+
+    def _descendants(self):
+        for element in self._node.iterdescendants():
+            # Skip comments and processing instructions
+            if isinstance(element.tag, str):
+                yield _LxmlNode(element)
+
+    def _strings(self):
+        stack = [(self._node, False)]
+        while stack:
+            element, tail_only = stack.pop()
+            if tail_only:
+                if element.tail:
+                    yield element.tail
+                continue
+            if element.tag in NON_TEXT_TAGS:
+                continue
+            if element.text:
+                yield element.text
+            # Push children in reverse so they pop in document order,
+            # each followed by its tail text
+            for child in reversed(list(element)):
+                stack.append((child, True))
+                if isinstance(child.tag, str):
+                    stack.append((child, False))
+
+    def _css(self, selector: str) -> List['_Node']:
+        # cssselect matches descendant-or-self; BeautifulSoup only descendants
+        return [_LxmlNode(element) for element in _lxml_selector(selector)(self._node)
+                if element is not self._node]
+
+
+class _SelectolaxNode(_Node):
+    __slots__ = ()
+
+    def _tag(self) -> str:
+        return self._node.tag
+
+    def _attr(self, key: str) -> Optional[str]:
+        return self._node.attributes.get(key)
+
+    def _descendants(self):
+        root = self._node
+        for node in root.traverse():
+            # traverse() starts at the node itself and includes comments
+            if not node.tag.startswith('-') and node != root:
+                yield _SelectolaxNode(node)
+
+    def _strings(self):
+        stack = [self._node]
+        while stack:
+            node = stack.pop()
+            tag = node.tag
+            if tag == '-text':
+                yield node.text_content
+                continue
+            if tag in NON_TEXT_TAGS or tag.startswith('-'):
+                continue
+            stack.extend(reversed(list(node.iter(include_text=True))))
+
+    def _css(self, selector: str) -> List['_Node']:
+        # lexbor matches the node itself as well; BeautifulSoup only descendants
+        root = self._node
+        return [_SelectolaxNode(node) for node in root.css(selector) if node != root]
+
+    def find_all(self, name=None, attrs: Optional[Dict] = None, limit: Optional[int] = None,
+                 class_=None, **kwargs) -> List['_Node']:
+        # Let lexbor narrow candidates by tag, class and attribute presence;
+        # anything CSS cannot express exactly is checked in Python
+        if not (isinstance(class_, str) and _CSS_IDENTIFIER.match(class_)) and class_ is not None:
+            return super().find_all(name, attrs, limit, class_, **kwargs)
+
+        wanted = dict(attrs or {})
+        wanted.update(kwargs)
+        if any(not _CSS_IDENTIFIER.match(key) for key in wanted):
+            return super().find_all(name, attrs, limit, class_, **kwargs)
+
+        selector = name or '*'
+        if class_ is not None:
+            selector += f'.{class_}'
+        selector += ''.join(f'[{key}]' for key in wanted)
+
+        results = []
+        for node in self._css(selector):
+            if all(_attr_matches(node._attr(key), value) for key, value in wanted.items()):
+                results.append(node)
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        if separator == '' and strip and self._node.css_first(_NON_TEXT_SELECTOR) is None:
+            return self._node.text(deep=True, separator='', strip=True)
+        return super().get_text(separator, strip)
+
+
+@lru_cache(maxsize=128)
+def _lxml_selector(selector: str):
+    try:
+        from lxml.cssselect import CSSSelector
+    except ImportError:
+        raise ImportError("CSS selectors on the lxml backend require cssselect: pip install cssselect")
+    return CSSSelector(selector)
+
+
+def _parse_lxml(html: str) -> _Node:
+    try:
+        import lxml.html
+    except ImportError:
+        raise ImportError("The lxml backend requires lxml: pip install lxml")
+
+    if not html.strip():
+        return _LxmlNode(lxml.html.Element('html'))
+
+    parser = lxml.html.HTMLParser(encoding='utf-8')
+    return _LxmlNode(lxml.html.document_fromstring(html.encode('utf-8'), parser=parser))
+
+
+def _parse_selectolax(html: str) -> _Node:
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        raise ImportError("The selectolax backend requires selectolax: pip install selectolax")
+
+    return _SelectolaxNode(LexborHTMLParser(html).root)
+
+
+def parse_html(html: str, backend: str = DEFAULT_BACKEND):
+    """Parse an HTML document or fragment with the chosen backend"""
+    if backend == 'bs4':
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, 'html.parser')
+    if backend == 'lxml':
+        return _parse_lxml(html)
+    if backend == 'selectolax':
+        return _parse_selectolax(html)
+    raise ValueError(f"Unknown parser backend '{backend}' (choose from {', '.join(BACKENDS)})")
+
+
+# Bytes fed to the lxml pull parser between event drains
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def _stream_bs4(html: str, tag: str, class_name: str) -> Iterator:
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    def has_class(value):
+        # The strainer sees the raw attribute string, before class is split
+        if not value:
+            return False
+        if isinstance(value, str):
+            return _class_matches(value, class_name)
+        return class_name in value
+
+    # Only matching subtrees are built; other markup is discarded while parsing
+    strainer = SoupStrainer(tag, attrs={'class': has_class})
+    soup = BeautifulSoup(html, 'html.parser', parse_only=strainer)
+    yield from soup.find_all(tag, class_=class_name)
+
+
+def _stream_lxml(html: str, tag: str, class_name: str) -> Iterator:
+    try:
+        from lxml import etree
+    except ImportError:
+        raise ImportError("The lxml backend requires lxml: pip install lxml")
+
+    parser = etree.HTMLPullParser(events=('start', 'end'), encoding='utf-8')
+    data = html.encode('utf-8')
+    depth = 0
+
+    def drain():
+        nonlocal depth
+        for event, element in parser.read_events():
+            matched = element.tag == tag and _class_matches(element.get('class'), class_name)
+            if event == 'start':
+                if matched:
+                    depth += 1
+                continue
+
+            if matched:
+                depth -= 1
+                if depth == 0:
+                    # The card, then any cards nested in it, in find_all() order.
+                    # The caller must finish with them before resuming.
+                    for card in element.iter(tag):
+                        if _class_matches(card.get('class'), class_name):
+                            yield _LxmlNode(card)
+            if depth == 0:
+                # Free every finished subtree outside the cards
+                element.clear()
+                parent = element.getparent()
+                if parent is not None:
+                    parent.remove(element)
+
+    for offset in range(0, len(data), STREAM_CHUNK_SIZE):
+        parser.feed(data[offset:offset + STREAM_CHUNK_SIZE])
+        yield from drain()
+
+    # Elements still open at EOF are only closed by close()
+    parser.close()
+    yield from drain()
+
+
+def stream_elements(html: str, tag: str, class_name: str,
+                    backend: str = DEFAULT_BACKEND) -> Iterator:
+    """
+    Yield tag.class_name elements without building a tree for the rest of the
+    document. With lxml the HTML is tokenized incrementally and each element
+    is discarded once the caller moves on, so memory is bounded by one card.
+    Yielded nodes are only valid until the next one is requested.
+    """
+    if backend == 'bs4':
+        return _stream_bs4(html, tag, class_name)
+    if backend == 'lxml':
+        return _stream_lxml(html, tag, class_name)
+    if backend == 'selectolax':
+        # lexbor has no incremental mode; its full parse is already cheap
+        return iter(parse_html(html, backend).find_all(tag, class_=class_name))
+    raise ValueError(f"Unknown parser backend '{backend}' (choose from {', '.join(BACKENDS)})")
+
+
+def available_backends() -> List[str]:
+    """Backends whose libraries are installed"""
+    available = []
+    for backend in BACKENDS:
+        try:
+            parse_html('<p></p>', backend)
+        except ImportError:
+            continue
+        available.append(backend)
+    return available
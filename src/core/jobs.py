@@ -0,0 +1,167 @@
+"""
+Background scrape jobs for the cloud service.
+
+Jobs run on an in-process thread pool with bounded concurrency. Their
+state lives in a small SQLite file, so any gunicorn worker on the same box
+can answer GET /jobs/<id> no matter which worker accepted the job. Each
+job records the host and pid of the worker running it; a queue starting up
+marks jobs left queued or running by dead workers on its host as failed.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, Optional
+
+# runner(params, report_progress) -> result
+JobRunner = Callable[[Dict, Callable[[Dict], None]], Dict]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    worker TEXT
+)
+"""
+
+JSON_COLUMNS = ('params', 'progress', 'result')
+
+
+def _process_alive(pid: str) -> bool:
+    """Whether a process with this pid runs on this host (not counting ourselves)"""
+    if not pid.isdigit() or int(pid) == os.getpid():
+        # Our own pid on an old job means the pid was reused after a restart
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class QueueFullError(Exception):
+    """Raised when too many jobs are already waiting in this worker"""
+
+
+class JobQueue:
+    """Bounded thread pool running jobs whose state is kept in SQLite"""
+
+    def __init__(self, runner: JobRunner, db_path: str, max_workers: int = 4,
+                 max_pending: int = 100, retention_hours: int = 24):
+        self.runner = runner
+        self.db_path = db_path
+        self.max_pending = max_pending
+        self.retention = timedelta(hours=retention_hours)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape-job')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(SCHEMA)
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            if 'worker' not in columns:
+                # Job files created before jobs recorded their worker
+                conn.execute('ALTER TABLE jobs ADD COLUMN worker TEXT')
+        self._fail_orphaned_jobs()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _fail_orphaned_jobs(self):
+        """Fail queued or running jobs whose worker on this host has exited"""
+        host = socket.gethostname()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT job_id, worker FROM jobs "
+                                "WHERE status IN ('queued', 'running')").fetchall()
+        orphaned = []
+        for row in rows:
+            # No worker recorded: the job predates this column, so its worker is long gone
+            worker_host, _, pid = (row['worker'] or f"{host}:").rpartition(':')
+            if worker_host == host and not _process_alive(pid):
+                orphaned.append(row['job_id'])
+
+        for job_id in orphaned:
+            self._update(job_id, status='failed', error='Worker exited before the job finished',
+                         finished_at=datetime.utcnow().isoformat())
+
+    def _update(self, job_id: str, **fields):
+        for column in JSON_COLUMNS:
+            if column in fields:
+                fields[column] = json.dumps(fields[column], default=str)
+        assignments = ', '.join(f"{column} = ?" for column in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+                         (*fields.values(), job_id))
+
+    def submit(self, params: Dict) -> Dict:
+        """Queue a job and return its initial record"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"{self._pending} jobs already queued")
+            self._pending += 1
+
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow()
+        with self._connect() as conn:
+            # Drop finished jobs past the retention window
+            conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                         ((now - self.retention).isoformat(),))
+            conn.execute("INSERT INTO jobs (job_id, status, params, progress, created_at, worker) "
+                         "VALUES (?, 'queued', ?, '{}', ?, ?)",
+                         (job_id, json.dumps(params, default=str), now.isoformat(),
+                          f"{socket.gethostname()}:{os.getpid()}"))
+
+        self._executor.submit(self._run, job_id, params)
+        return self.get(job_id)
+
+    def _run(self, job_id: str, params: Dict):
+        with self._lock:
+            self._pending -= 1
+        self._update(job_id, status='running', started_at=datetime.utcnow().isoformat())
+
+        def report_progress(progress: Dict):
+            self._update(job_id, progress=progress)
+
+        try:
+            result = self.runner(params, report_progress)
+            status = 'completed' if result.get('success', True) else 'failed'
+            self._update(job_id, status=status, result=result, error=result.get('error'),
+                         finished_at=datetime.utcnow().isoformat())
+        except Exception as e:
+            self._update(job_id, status='failed', error=str(e),
+                         finished_at=datetime.utcnow().isoformat())
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Current record for a job, or None if unknown"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        for column in JSON_COLUMNS:
+            job[column] = json.loads(job[column]) if job[column] else None
+        return job
@@ -0,0 +1,98 @@
+"""
+Helpers for the HappyCow AJAX venue listing payload.
+
+The endpoint /ajax/views/city/venues/{path}?page=N returns JSON shaped like
+{"success": true, "data": {"data": "<html>", "paginated": {...}}}.
+Older responses carried the HTML directly in "data", so both are accepted.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+# Keys the pagination block has been seen to use for the final page
+LAST_PAGE_KEYS = ('last_page', 'lastPage', 'total_pages', 'totalPages', 'pages')
+TOTAL_KEYS = ('total', 'total_count', 'count')
+PER_PAGE_KEYS = ('per_page', 'perPage', 'limit')
+NEXT_KEYS = ('next', 'next_page', 'next_page_url')
+
+
+def split_payload(data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Return (html, paginated) from an AJAX response body"""
+    body = data.get('data', '')
+    if isinstance(body, dict):
+        return body.get('data', '') or '', body.get('paginated') or {}
+    return body or '', data.get('paginated') or {}
+
+
+def _first_int(paginated: Dict[str, Any], keys) -> Optional[int]:
+    for key in keys:
+        value = paginated.get(key)
+        try:
+            if value is not None and value != '':
+                return int(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def last_page(paginated: Dict[str, Any]) -> Optional[int]:
+    """Number of the final page, or None if the block does not say"""
+    if not paginated:
+        return None
+
+    page = _first_int(paginated, LAST_PAGE_KEYS)
+    if page is not None:
+        return max(page, 1)
+
+    total = _first_int(paginated, TOTAL_KEYS)
+    per_page = _first_int(paginated, PER_PAGE_KEYS)
+    if total is not None and per_page:
+        return max(math.ceil(total / per_page), 1)
+
+    return None
+
+
+def has_next(paginated: Dict[str, Any]) -> Optional[bool]:
+    """Whether another page follows, or None if the block does not say"""
+    if not paginated:
+        return None
+
+    for key in NEXT_KEYS:
+        if key in paginated:
+            return paginated[key] not in (None, '', False)
+
+    current = _first_int(paginated, ('current_page', 'currentPage', 'page'))
+    final = last_page(paginated)
+    if current is not None and final is not None:
+        return current < final
+
+    return None
+
+
+def parse_page_spec(spec: str) -> Tuple[List[int], Optional[int]]:
+    """
+    Pages named by a spec like "3,7,12-"
+    Returns: (listed pages, first page of an open-ended range or None)
+    """
+    pages, open_from = set(), None
+    for part in filter(None, (part.strip() for part in spec.split(','))):
+        first, dash, last = part.partition('-')
+        if not dash:
+            pages.add(int(first))
+        elif not last:
+            open_from = int(first) if open_from is None else min(open_from, int(first))
+        else:
+            pages.update(range(int(first), int(last) + 1))
+    if any(page < 1 for page in pages) or (open_from is not None and open_from < 1):
+        raise ValueError(f"Page numbers start at 1: {spec!r}")
+    if open_from is not None:
+        pages = {page for page in pages if page < open_from}
+    return sorted(pages), open_from
+
+
+def format_page_spec(pages: List[int], open_from: Optional[int] = None) -> str:
+    """Inverse of parse_page_spec"""
+    parts = [str(page) for page in sorted(pages) if open_from is None or page < open_from]
+    if open_from is not None:
+        parts.append(f"{open_from}-")
+    return ','.join(parts)
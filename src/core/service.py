@@ -0,0 +1,583 @@
+"""
+Scraping pieces shared by the Flask (cloud_scraper_service) and async
+(async_scraper_service) services: settings, metrics, request validation,
+result merging and the requests-based HappyCowScraper that parses, caches
+and archives pages for both.
+
+Importing this module has no side effects beyond registering metrics;
+each service builds its own scraper with build_scraper().
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from . import pagination
+from .extractor import core_record, extract_venue, find_venue_items, iter_venue_items
+from .html_backends import DEFAULT_BACKEND, parse_html
+from ..utils.adaptive import AdaptiveRateController
+from ..utils.archive import ResponseArchive, normalize_city_path
+from ..utils.cache import PageCache, SqlitePageCache, page_key
+from ..utils.metrics import REGISTRY
+from ..utils.rate_limiter import DEFAULT_RATE_DB, make_rate_limiter
+from ..utils.singleflight import SingleFlight
+from ..utils.timing import TimedHTTPAdapter, summarize_timings, timed_get
+
+logger = logging.getLogger(__name__)
+
+# Set SCRAPER_ARCHIVE_DIR to keep every raw AJAX response for offline replay
+ARCHIVE_DIR = os.environ.get('SCRAPER_ARCHIVE_DIR')
+
+# HTML parser backend for venue extraction: bs4, lxml or selectolax
+PARSER_BACKEND = os.environ.get('SCRAPER_PARSER', DEFAULT_BACKEND)
+
+# Set SCRAPER_STREAM_PARSE=1 to build only venue card subtrees
+STREAM_PARSE = os.environ.get('SCRAPER_STREAM_PARSE', '').lower() in ('1', 'true', 'yes')
+
+# Where AJAX listings are fetched from (override only to point at a test server)
+UPSTREAM_URL = os.environ.get('SCRAPER_UPSTREAM_URL', 'https://www.happycow.net').rstrip('/')
+
+# Requests per second to each upstream host (0 disables). The budget is shared by
+# every worker and CLI run on the box through the SCRAPER_RATE_DB SQLite file;
+# set it to an empty string to limit each worker on its own.
+REQUESTS_PER_SECOND = float(os.environ.get('SCRAPER_RATE', 1 / 3))
+RATE_BURST = int(os.environ.get('SCRAPER_RATE_BURST', 1))
+RATE_DB = os.environ.get('SCRAPER_RATE_DB', DEFAULT_RATE_DB)
+
+# The rate adapts to HappyCow's responses: it is cut on 429/5xx and climbs back while
+# responses stay fast, up to SCRAPER_RATE_MAX (default SCRAPER_RATE) and down to
+# SCRAPER_RATE_MIN (default a tenth of SCRAPER_RATE)
+RATE_MAX = float(os.environ.get('SCRAPER_RATE_MAX', 0)) or None
+RATE_MIN = float(os.environ['SCRAPER_RATE_MIN']) if os.environ.get('SCRAPER_RATE_MIN') else None
+
+# Most pages fetched per city, and most requests in flight to one host
+MAX_PAGES = int(os.environ.get('SCRAPER_MAX_PAGES', 20))
+HOST_CONCURRENCY = int(os.environ.get('SCRAPER_HOST_CONCURRENCY', 4))
+
+# Parsed pages are reused for SCRAPER_CACHE_TTL seconds (0 disables). Set
+# SCRAPER_CACHE_DB to share the cache between workers through SQLite.
+CACHE_TTL = float(os.environ.get('SCRAPER_CACHE_TTL', 600))
+CACHE_SIZE = int(os.environ.get('SCRAPER_CACHE_SIZE', 2000))
+CACHE_DB = os.environ.get('SCRAPER_CACHE_DB')
+
+# Most cities a /scrape/batch scrapes at once
+BATCH_CONCURRENCY = int(os.environ.get('SCRAPER_BATCH_CONCURRENCY', 4))
+
+# Metrics served on /metrics (each worker process reports its own)
+FETCH_SECONDS = REGISTRY.histogram('happycow_upstream_fetch_seconds',
+                                   'Upstream AJAX request latency, excluding rate limit waits')
+PARSE_SECONDS = REGISTRY.histogram('happycow_parse_seconds',
+                                   'HTML parse time per page, excluding venue extraction')
+EXTRACT_SECONDS = REGISTRY.histogram('happycow_extract_seconds', 'Extraction time per venue',
+                                     buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1))
+SERIALIZE_SECONDS = REGISTRY.histogram('happycow_serialize_seconds', 'Response JSON serialization time',
+                                       ['endpoint'])
+UPSTREAM_BYTES = REGISTRY.counter('happycow_upstream_bytes_total', 'Bytes of AJAX responses downloaded')
+UPSTREAM_RESPONSES = REGISTRY.counter('happycow_upstream_responses_total',
+                                      'Upstream responses by HTTP status (error: no response)', ['status'])
+PAGES = REGISTRY.counter('happycow_pages_total', 'Listing pages scraped by source (upstream, cache, archive)',
+                         ['source'])
+VENUES = REGISTRY.counter('happycow_venues_total', 'Venues extracted from parsed pages')
+CACHE_LOOKUPS = REGISTRY.counter('happycow_cache_lookups_total', 'Page cache lookups by result (hit, miss)',
+                                 ['result'])
+
+# Body sent to /scrape by the /test endpoint
+TEST_SCRAPE_REQUEST = {
+    'url': 'https://www.happycow.net/north_america/usa/texas/dallas/',
+    'full_path': 'north_america/usa/texas/dallas',
+    'city': 'Dallas',
+    'state': 'Texas'
+}
+
+class InvalidScrapeRequest(Exception):
+    """Scrape parameters that should be rejected with a 400"""
+
+class DeadlineExceeded(Exception):
+    """A page was not fetched because the scrape ran out of time"""
+
+def city_ajax_path(city_url):
+    """AJAX path segment for a city URL or path"""
+    # https://www.happycow.net/north_america/usa/california/los_angeles/ -> north_america%7Cusa%7Ccalifornia%7Clos_angeles
+    if city_url.startswith('https://www.happycow.net/'):
+        path_part = city_url.replace('https://www.happycow.net/', '').strip('/')
+        return path_part.replace('/', '%7C')
+    
+    # Fallback: assume it's already a path
+    return city_url.replace('|', '%7C').replace('/', '%7C')
+
+def failed_scrape(error):
+    """Result returned when a city could not be scraped"""
+    return {
+        'success': False,
+        'error': str(error),
+        'restaurants': [],
+        'total_restaurants': 0,
+        'pages_scraped': 0
+    }
+
+def replay_pages(result, on_page):
+    """Hand a finished scrape's restaurants to on_page page by page"""
+    # Restaurants are merged in page order
+    pages = {}
+    for restaurant in result['restaurants']:
+        pages.setdefault(restaurant['page_number'], []).append(restaurant)
+    for page, restaurants in pages.items():
+        on_page(page, restaurants)
+
+# Per-page summary always included in results; 'timings' adds every phase
+PAGE_TIMING_KEYS = ('page', 'cache_hit', 'fetch_seconds', 'parse_seconds', 'bytes', 'venues')
+
+class CityResult:
+    """
+    Pages of one city merged in page order, dropping venues already seen
+    on an earlier page. on_page(page_number, restaurants) is called with
+    each page's new venues as it is added.
+    """
+    
+    def __init__(self, ajax_url, on_page=None):
+        self.ajax_url = ajax_url
+        self.on_page = on_page
+        self.restaurants = []
+        self.seen_ids = set()
+        self.page_timings = []
+        self.failed_pages = []
+        self.truncated = False
+    
+    def add_page(self, page, restaurants, timing):
+        new = []
+        for restaurant in restaurants:
+            venue_id = restaurant.get('venue_id')
+            if venue_id:
+                if venue_id in self.seen_ids:
+                    continue
+                self.seen_ids.add(venue_id)
+            new.append(restaurant)
+        self.restaurants.extend(new)
+        self.page_timings.append(timing)
+        if self.on_page:
+            self.on_page(page, new)
+    
+    def fail_page(self, page, error):
+        logger.warning(f"Failed to scrape page {page} of {self.ajax_url}: {error}")
+        self.failed_pages.append({'page': page, 'error': str(error)})
+        if isinstance(error, DeadlineExceeded):
+            self.truncated = True
+    
+    def to_dict(self, final_page=None):
+        """Scrape result; the detailed 'timings' block is dropped later unless requested"""
+        duplicates = sum(timing['venues'] for timing in self.page_timings) - len(self.restaurants)
+        logger.info(f"Scraped {len(self.page_timings)} pages of {self.ajax_url}: "
+                    f"{len(self.restaurants)} restaurants ({duplicates} duplicates dropped)")
+        
+        return {
+            'success': True,
+            'restaurants': self.restaurants,
+            'total_restaurants': len(self.restaurants),
+            'pages_scraped': len(self.page_timings),
+            'total_pages': final_page or len(self.page_timings),
+            'failed_pages': self.failed_pages,
+            'truncated': self.truncated,
+            'duplicates_removed': duplicates,
+            'cache_hits': sum(1 for timing in self.page_timings if timing.get('cache_hit')),
+            'page_timings': [{key: timing[key] for key in PAGE_TIMING_KEYS if key in timing}
+                             for timing in self.page_timings],
+            'timings': summarize_timings(self.page_timings),
+            'ajax_url': self.ajax_url
+        }
+
+class HappyCowScraper:
+    def __init__(self, archive=None, parser_backend=DEFAULT_BACKEND, stream_parse=False,
+                 requests_per_second=REQUESTS_PER_SECOND, pool_size=BATCH_CONCURRENCY,
+                 max_pages=MAX_PAGES, host_concurrency=HOST_CONCURRENCY, cache=None,
+                 rate_db=RATE_DB, rate_burst=RATE_BURST, max_rate=RATE_MAX, min_rate=RATE_MIN):
+        self.archive = archive
+        self.cache = cache
+        self.parser_backend = parser_backend
+        self.stream_parse = stream_parse
+        self.max_pages = max_pages
+        self.host_concurrency = max(1, host_concurrency)
+        self.rate_limiter = make_rate_limiter(requests_per_second, rate_db, rate_burst)
+        self.rate_control = AdaptiveRateController(self.rate_limiter, max_rate, min_rate)
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+        self.flights = SingleFlight()
+        self.session = requests.Session()
+        # One connection per concurrent scrape (batches, jobs)
+        adapter = TimedHTTPAdapter(pool_maxsize=max(10, pool_size, self.host_concurrency))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+    
+    def extract_city_path(self, city_url):
+        """Extract city path from HappyCow URL"""
+        try:
+            self.rate_limiter.acquire(urlparse(city_url).netloc)
+            response = self.session.get(city_url, timeout=10)
+            response.raise_for_status()
+            
+            return self.city_path_from_page(response.text, city_url)
+            
+        except Exception as e:
+            logger.error(f"Error extracting city path: {e}")
+            return None
+    
+    def city_path_from_page(self, html, city_url):
+        """City path from a city page's scripts, falling back to the URL itself"""
+        # Look for the path in the HTML
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Method 1: Look for data attributes or JavaScript variables
+        scripts = soup.find_all('script')
+        for script in scripts:
+            if script.string and 'path' in script.string.lower():
+                content = script.string
+                # Look for path patterns
+                path_match = re.search(r'["\']([^"\']*north_america[^"\']*)["\']', content)
+                if path_match:
+                    path = path_match.group(1)
+                    if '/' in path:
+                        return path.replace('/', '|')
+        
+        # Method 2: Extract from URL structure
+        url_parts = city_url.replace('https://www.happycow.net/', '').strip('/')
+        if url_parts:
+            return url_parts.replace('/', '|')
+        
+        logger.warning(f"Could not extract path from {city_url}")
+        return None
+    
+    def build_ajax_url(self, ajax_path, page=1):
+        """AJAX listing URL for a page of a city"""
+        ajax_url = f"{UPSTREAM_URL}/ajax/views/city/venues/{ajax_path}"
+        return ajax_url if page == 1 else f"{ajax_url}?page={page}"
+    
+    def _host_slot(self, url):
+        """Semaphore bounding in-flight requests to the URL's host across all scrapes"""
+        host = urlparse(url).netloc
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.host_concurrency)
+        return slot
+    
+    def fetch_page(self, ajax_path, page, replay=False, timing=None, deadline=None):
+        """
+        Raw AJAX body for one listing page (from the response archive when replaying)
+        Network phase timings are added to `timing` when given. Raises
+        DeadlineExceeded instead of sending the request once time.monotonic()
+        has passed `deadline`.
+        """
+        ajax_url = self.build_ajax_url(ajax_path, page)
+        
+        if replay:
+            if self.archive is None:
+                raise Exception("Replay requested but SCRAPER_ARCHIVE_DIR is not configured")
+            body = self.archive.latest(ajax_path, page)
+            if body is None:
+                raise Exception(f"No archived response for {ajax_url}")
+            logger.info(f"Replaying archived response for {ajax_url}")
+            PAGES.inc(source='archive')
+            return body
+        
+        logger.info(f"Calling AJAX endpoint: {ajax_url}")
+        
+        host = urlparse(ajax_url).netloc
+        start = time.perf_counter()
+        with self._host_slot(ajax_url):
+            self.rate_limiter.acquire(host)
+            sent_at = time.monotonic()
+            if deadline is not None and sent_at > deadline:
+                raise DeadlineExceeded(f"Scrape deadline passed before page {page} was requested")
+            fetch_start = time.perf_counter()
+            try:
+                response, http_timing = timed_get(self.session, ajax_url, timeout=15)
+            except requests.RequestException:
+                UPSTREAM_RESPONSES.inc(status='error')
+                self.rate_control.record(host, None, time.perf_counter() - fetch_start, sent_at)
+                raise
+            fetch_seconds = time.perf_counter() - fetch_start
+            FETCH_SECONDS.observe(fetch_seconds)
+        
+        self.rate_control.record(host, response.status_code, fetch_seconds, sent_at,
+                                 response.headers.get('Retry-After'))
+        
+        if timing is not None:
+            timing['wait_seconds'] = round(fetch_start - start, 4)
+            timing.update(http_timing)
+        
+        UPSTREAM_RESPONSES.inc(status=response.status_code)
+        response.raise_for_status()
+        body = response.content
+        UPSTREAM_BYTES.inc(len(body))
+        PAGES.inc(source='upstream')
+        
+        if self.archive is not None:
+            self.archive.put(ajax_path, page, body)
+        
+        return body
+    
+    def scrape_page(self, ajax_path, page, city_url, replay=False, refresh=False, deadline=None):
+        """
+        Fetch and parse one listing page, or take it from the page cache
+        Returns: (restaurants, paginated, timing)
+        """
+        if not replay and not refresh:
+            cached = self.cached_page(ajax_path, page)
+            if cached is not None:
+                return cached
+        
+        timing = {'page': page}
+        start = time.perf_counter()
+        body = self.fetch_page(ajax_path, page, replay, timing, deadline)
+        timing['fetch_seconds'] = round(time.perf_counter() - start, 4)
+        
+        return self.parse_page_body(ajax_path, page, city_url, body, timing, cache=not replay)
+    
+    def cached_page(self, ajax_path, page):
+        """(restaurants, paginated, timing) for a page still in the cache, else None"""
+        if self.cache is None:
+            return None
+        
+        cached = self.cache.get(page_key(ajax_path, page))
+        CACHE_LOOKUPS.inc(result='miss' if cached is None else 'hit')
+        if cached is None:
+            return None
+        
+        PAGES.inc(source='cache')
+        timing = {'page': page, 'cache_hit': True, 'venues': len(cached['restaurants'])}
+        return cached['restaurants'], cached['paginated'], timing
+    
+    def parse_page_body(self, ajax_path, page, city_url, body, timing, cache=True):
+        """
+        Decode and parse a fetched AJAX body, adding it to the page cache
+        Returns: (restaurants, paginated, timing)
+        """
+        timing['bytes'] = len(body)
+        
+        start = time.perf_counter()
+        data = json.loads(body)
+        
+        if not data.get('success', False):
+            raise Exception("AJAX response indicates failure")
+        
+        html_content, paginated = pagination.split_payload(data)
+        timing['decode_seconds'] = round(time.perf_counter() - start, 4)
+        if not html_content and page == 1:
+            raise Exception("No HTML content in AJAX response")
+        
+        restaurants = self.parse_restaurants_from_html(html_content, city_url, page, timing) if html_content else []
+        timing['parse_seconds'] = round(time.perf_counter() - start, 4)
+        timing['venues'] = len(restaurants)
+        VENUES.inc(len(restaurants))
+        
+        if cache and self.cache is not None:
+            self.cache.put(page_key(ajax_path, page), {'restaurants': restaurants, 'paginated': paginated})
+        
+        return restaurants, paginated, timing
+    
+    def scrape_city_ajax(self, city_url, replay=False, on_page=None, refresh=False, timeout=None):
+        """
+        Scrape a city. Concurrent calls for the same city path attach to the
+        scrape already in flight and all receive its result ('coalesced' is
+        True for the callers that did not run it). A refresh only joins
+        another refresh, never a scrape that may be serving cached pages, and
+        a scrape with a timeout only joins another with one.
+        """
+        key = (normalize_city_path(city_url), bool(replay), bool(refresh), timeout is not None)
+        result, shared = self.flights.do(
+            key, lambda: self._scrape_city_ajax(city_url, replay, on_page, refresh, timeout))
+        
+        if shared:
+            logger.info(f"Coalesced scrape of {key[0]} with the one in flight")
+            if on_page:
+                replay_pages(result, on_page)
+        
+        # Callers add their own context to the result, so each gets a copy
+        return dict(result, coalesced=shared)
+    
+    def _scrape_city_ajax(self, city_url, replay=False, on_page=None, refresh=False, timeout=None):
+        """
+        Scrape every page of a city using the AJAX endpoint (or the response
+        archive when replaying). Page 1 reports how many pages exist; the rest
+        are fetched in parallel within the per-host budget and merged in page
+        order, dropping venues already seen on an earlier page. Pages scraped
+        within the cache TTL are reused unless refresh is set.
+        on_page(page_number, restaurants) is called with each page's new venues.
+        After `timeout` seconds, pages not yet fetched are given up on and the
+        result is marked 'truncated'.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            ajax_path = city_ajax_path(city_url)
+            city = CityResult(self.build_ajax_url(ajax_path), on_page)
+            
+            page_restaurants, paginated, timing = self.scrape_page(ajax_path, 1, city_url, replay, refresh)
+            city.add_page(1, page_restaurants, timing)
+            
+            final_page = pagination.last_page(paginated)
+            if final_page:
+                # Known page count: fetch ahead, consume in page order
+                final_page = min(final_page, self.max_pages)
+                executor = ThreadPoolExecutor(max_workers=self.host_concurrency)
+                try:
+                    futures = {page: executor.submit(self.scrape_page, ajax_path, page, city_url,
+                                                     replay, refresh, deadline)
+                               for page in range(2, final_page + 1)}
+                    for page, future in futures.items():
+                        try:
+                            wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+                            page_restaurants, _, timing = future.result(wait)
+                            city.add_page(page, page_restaurants, timing)
+                        except FutureTimeoutError:
+                            city.fail_page(page, DeadlineExceeded(f"Scrape deadline passed before page {page} arrived"))
+                        except Exception as e:
+                            city.fail_page(page, e)
+                finally:
+                    # Past the deadline: don't wait for pages still queued on the rate limit
+                    executor.shutdown(wait=deadline is None, cancel_futures=True)
+            else:
+                # No page count: follow 'next' links one page at a time
+                page = 1
+                while pagination.has_next(paginated) and page < self.max_pages and page_restaurants:
+                    page += 1
+                    try:
+                        page_restaurants, paginated, timing = self.scrape_page(ajax_path, page, city_url,
+                                                                               replay, refresh, deadline)
+                        city.add_page(page, page_restaurants, timing)
+                    except Exception as e:
+                        city.fail_page(page, e)
+                        break
+            
+            return city.to_dict(final_page)
+            
+        except Exception as e:
+            logger.error(f"Error scraping city via AJAX: {e}")
+            return failed_scrape(e)
+    
+    def parse_restaurants_from_html(self, html_content, city_path, page_number=1, timing=None):
+        """Parse restaurant data from HTML content (parse/extract seconds go into `timing`)"""
+        restaurants = []
+        start = time.perf_counter()
+        extract_seconds = 0.0
+        
+        # Find all venue items
+        if self.stream_parse:
+            venue_items = iter_venue_items(html_content, self.parser_backend)
+        else:
+            venue_items = find_venue_items(parse_html(html_content, self.parser_backend))
+            logger.info(f"Found {len(venue_items)} venue items")
+        
+        for item in venue_items:
+            item_start = time.perf_counter()
+            try:
+                restaurant = self.extract_restaurant_data(item, city_path, page_number)
+                if restaurant:
+                    restaurants.append(restaurant)
+            except Exception as e:
+                logger.warning(f"Error parsing restaurant: {e}")
+                continue
+            finally:
+                elapsed = time.perf_counter() - item_start
+                EXTRACT_SECONDS.observe(elapsed)
+                extract_seconds += elapsed
+        
+        # Streaming parses interleave with extraction, so parse time is what's left over
+        parse_seconds = time.perf_counter() - start - extract_seconds
+        PARSE_SECONDS.observe(parse_seconds)
+        if timing is not None:
+            timing['html_parse_seconds'] = round(parse_seconds, 4)
+            timing['extract_seconds'] = round(extract_seconds, 4)
+        
+        return restaurants
+    
+    def extract_restaurant_data(self, item, city_path, page_number=1):
+        """Extract data from a single restaurant item"""
+        try:
+            restaurant = core_record(extract_venue(item))
+            
+            # Extract city and state from path
+            path_parts = city_path.replace('|', '/').split('/')
+            city_name = path_parts[-1].replace('_', ' ').title() if path_parts else 'Unknown'
+            state_name = path_parts[-2].replace('_', ' ').title() if len(path_parts) > 1 else 'Unknown'
+            
+            restaurant.update({
+                'city_path': city_path.replace('|', '/'),
+                'city_name': city_name,
+                'state_name': state_name,
+                'country_code': 'US',
+                'scraped_at': datetime.utcnow().isoformat(),
+                'page_number': page_number
+            })
+            
+            return restaurant
+            
+        except Exception as e:
+            logger.error(f"Error extracting restaurant data: {e}")
+            return None
+
+def build_scraper(pool_size=BATCH_CONCURRENCY):
+    """HappyCowScraper configured from the SCRAPER_* environment settings"""
+    if CACHE_TTL <= 0:
+        page_cache = None
+    elif CACHE_DB:
+        page_cache = SqlitePageCache(CACHE_DB, CACHE_TTL, CACHE_SIZE)
+    else:
+        page_cache = PageCache(CACHE_TTL, CACHE_SIZE)
+    
+    return HappyCowScraper(ResponseArchive(ARCHIVE_DIR) if ARCHIVE_DIR else None, PARSER_BACKEND, STREAM_PARSE,
+                           REQUESTS_PER_SECOND, pool_size, cache=page_cache)
+
+def check_scrape_request(data):
+    """Reject scrape parameters that are missing or malformed"""
+    if not data:
+        raise InvalidScrapeRequest('No JSON data provided')
+    
+    if not data.get('url'):
+        raise InvalidScrapeRequest('Missing required parameter: url')
+
+def batch_concurrency(data):
+    """Parallelism for a batch: the caller's 'concurrency', capped at BATCH_CONCURRENCY"""
+    value = data.get('concurrency') if isinstance(data, dict) else None
+    if value is None:
+        return BATCH_CONCURRENCY
+    
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise InvalidScrapeRequest(f"concurrency must be a positive integer, got {value!r}")
+    
+    # Callers may ask for less parallelism than the service allows, never more
+    return min(value, BATCH_CONCURRENCY)
+
+def log_scrape_start(data):
+    logger.info(f"Starting scrape for {data.get('city', 'Unknown')}, {data.get('state', 'Unknown')}")
+    logger.info(f"URL: {data['url']}")
+    logger.info(f"Path: {data['full_path']}")
+
+def add_scrape_context(result, data, start_time):
+    """Add timing and request context to a scrape result"""
+    # Per-phase timings are opt-in with "timings": true
+    if not data.get('timings'):
+        result.pop('timings', None)
+    
+    duration = int(time.time() - start_time)
+    result['duration_seconds'] = duration
+    result['city_name'] = data.get('city', 'Unknown')
+    result['state_name'] = data.get('state', 'Unknown')
+    result['city_path'] = data['full_path']
+    result['timestamp'] = datetime.utcnow().isoformat()
+    
+    logger.info(f"Scraping completed: {result['total_restaurants']} restaurants found in {duration}s")
+    
+    return result
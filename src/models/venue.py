@@ -0,0 +1,135 @@
+"""
+Compact venue record for the scraping hot path.
+
+A scrape holds every venue of a city until it is written out, so the
+per-venue cost adds up. VenueRecord keeps the production record's fields
+in __slots__ instead of a 16-key dict, interns the enum-like strings
+(type, price_range, tag values), stores tags as tuples that share one
+empty tuple, and takes its scraped_at string from the page it was found
+on. to_dict() gives back the dict shape the JSON output and n8n expect.
+"""
+
+import sys
+from typing import Dict, Iterable, Tuple
+
+from ..core.extractor import CORE_FIELDS
+
+# Production record fields, in output order
+FIELDS = CORE_FIELDS + ('city_path', 'scraped_at', 'page_number')
+
+# Column types for tabular output (see src.utils.sinks.ParquetSink)
+COLUMN_TYPES = {
+    'venue_id': 'string',
+    'name': 'string',
+    'type': 'string',
+    'rating': 'float64',
+    'review_count': 'int64',
+    'address': 'string',
+    'latitude': 'float64',
+    'longitude': 'float64',
+    'phone': 'string',
+    'website': 'string',
+    'cuisine_tags': 'list<string>',
+    'price_range': 'string',
+    'features': 'list<string>',
+    'city_path': 'string',
+    'scraped_at': 'string',
+    'page_number': 'int64',
+}
+
+# The same with the enum-like columns dictionary-encoded (see src.utils.dataset)
+DATASET_COLUMN_TYPES = {
+    **COLUMN_TYPES,
+    'type': 'dictionary<string>',
+    'price_range': 'dictionary<string>',
+    'cuisine_tags': 'list<dictionary<string>>',
+    'features': 'list<dictionary<string>>',
+}
+
+_FIELD_SET = frozenset(FIELDS)
+_NO_TAGS: Tuple[str, ...] = ()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _tags(values: Iterable[str]) -> Tuple[str, ...]:
+    if not values:
+        return _NO_TAGS
+    return tuple(sys.intern(value) for value in values)
+
+
+class VenueRecord:
+    """
+    One scraped venue. Supports record['field'] and record.get('field')
+    so code written against the dict form keeps working.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, venue: Dict, city_path: str, scraped_at: str, page_number: int):
+        # venue is an extract_venue() result or a to_dict() of another record
+        self.venue_id = venue['venue_id']
+        self.name = venue['name']
+        self.type = _intern(venue['type'])
+        self.rating = venue['rating']
+        self.review_count = venue['review_count']
+        self.address = venue['address']
+        self.latitude = venue['latitude']
+        self.longitude = venue['longitude']
+        self.phone = venue['phone']
+        self.website = venue['website']
+        self.cuisine_tags = _tags(venue['cuisine_tags'])
+        self.price_range = _intern(venue['price_range'])
+        self.features = _tags(venue['features'])
+        self.city_path = city_path
+        self.scraped_at = scraped_at
+        self.page_number = page_number
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'VenueRecord':
+        """Rebuild a record from its to_dict() form (e.g. a checkpoint)"""
+        return cls(data, data['city_path'], data['scraped_at'], data['page_number'])
+
+    def to_dict(self) -> Dict:
+        return {
+            'venue_id': self.venue_id,
+            'name': self.name,
+            'type': self.type,
+            'rating': self.rating,
+            'review_count': self.review_count,
+            'address': self.address,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'phone': self.phone,
+            'website': self.website,
+            'cuisine_tags': list(self.cuisine_tags),
+            'price_range': self.price_range,
+            'features': list(self.features),
+            'city_path': self.city_path,
+            'scraped_at': self.scraped_at,
+            'page_number': self.page_number,
+        }
+
+    def keys(self) -> Tuple[str, ...]:
+        return FIELDS
+
+    def items(self):
+        return self.to_dict().items()
+
+    def get(self, field: str, default=None):
+        return getattr(self, field) if field in _FIELD_SET else default
+
+    def __getitem__(self, field: str):
+        if field not in _FIELD_SET:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __eq__(self, other):
+        if not isinstance(other, VenueRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in FIELDS)
+
+    def __repr__(self):
+        return f"VenueRecord(venue_id={self.venue_id!r}, name={self.name!r}, page_number={self.page_number!r})"
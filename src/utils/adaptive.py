@@ -0,0 +1,140 @@
+"""
+Adaptive request rate driven by upstream responses.
+
+AdaptiveRateController applies AIMD to a RateLimiter's per-host rate:
+while responses come back healthy (2xx/3xx/4xx other than 429, latency
+near its best level) the rate climbs additively toward max_rate; a 429
+or 5xx cuts it multiplicatively toward min_rate, and a Retry-After header
+pauses the host for the time the server asked for.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from .rate_limiter import RateLimiter
+
+# Status codes that mean "slow down" rather than "this request is wrong"
+THROTTLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class _HostState:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.healthy = 0
+        self.latency = None         # EWMA of response latency
+        self.best_latency = None    # lowest EWMA seen, the uncongested baseline
+        self.last_decrease = 0.0
+        self.decreases = 0
+
+
+class AdaptiveRateController:
+    """AIMD control of a RateLimiter's rate per host"""
+
+    def __init__(self, limiter: RateLimiter, max_rate: Optional[float] = None,
+                 min_rate: Optional[float] = None, increase: Optional[float] = None,
+                 decrease: float = 0.5, window: int = 10, latency_factor: float = 2.0,
+                 max_retry_after: float = 300.0):
+        self.limiter = limiter
+        self.start_rate = 1.0 / limiter.interval if limiter.interval else 0.0
+        self.max_rate = max(max_rate or self.start_rate, self.start_rate)
+        self.min_rate = min_rate if min_rate is not None else self.start_rate / 10
+        # Rate added after every `window` healthy responses
+        self.increase = increase if increase is not None else self.max_rate / 10
+        self.decrease = decrease
+        self.window = max(1, window)
+        self.latency_factor = latency_factor
+        self.max_retry_after = max_retry_after
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        # An unlimited limiter has no rate to adapt
+        return self.start_rate > 0
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.start_rate)
+        return state
+
+    def record(self, host: str, status: Optional[int], latency: float, sent_at: float,
+               retry_after: Optional[str] = None):
+        """
+        Feed one upstream response (status None for a connection error or timeout)
+        sent_at is the time.monotonic() at which the request was sent
+        """
+        if not self.enabled:
+            return
+
+        throttled = status is None or status in THROTTLE_STATUSES
+        pause = retry_after_seconds(retry_after) if status in (429, 503) else None
+
+        with self._lock:
+            state = self._state(host)
+
+            if throttled:
+                state.healthy = 0
+                # Requests already in flight when we last backed off saw the old
+                # rate; count one decrease per round trip, not one per failure
+                if sent_at >= state.last_decrease:
+                    # Scale the limiter's current rate, which other processes
+                    # sharing a SharedRateLimiter may have moved since
+                    state.rate = self.limiter.adjust_rate(
+                        host, lambda rate: max(self.min_rate, rate * self.decrease))
+                    state.last_decrease = time.monotonic()
+                    state.decreases += 1
+            else:
+                state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+                if state.best_latency is None or state.latency < state.best_latency:
+                    state.best_latency = state.latency
+
+                # Latency well above its best means the host is queueing our requests: hold
+                if state.latency <= self.latency_factor * state.best_latency:
+                    state.healthy += 1
+                    if state.healthy >= self.window and state.rate < self.max_rate:
+                        state.healthy = 0
+                        state.rate = self.limiter.adjust_rate(
+                            host, lambda rate: min(self.max_rate, rate + self.increase))
+
+        if pause:
+            self.limiter.pause(host, min(pause, self.max_retry_after))
+
+    def rate(self, host: str) -> float:
+        with self._lock:
+            return self._state(host).rate
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'min_rate': round(self.min_rate, 4),
+                'max_rate': round(self.max_rate, 4),
+                'hosts': {
+                    host: {
+                        'rate': round(state.rate, 4),
+                        'latency_seconds': round(state.latency, 4) if state.latency is not None else None,
+                        'decreases': state.decreases,
+                    }
+                    for host, state in self._hosts.items()
+                },
+            }
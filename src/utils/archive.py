@@ -0,0 +1,134 @@
+"""
+Content-addressed archive of raw AJAX responses.
+
+Every fetched page body is gzip-compressed and stored once under its
+SHA-256 hash. An append-only index records which city path and page each
+fetch belonged to and when it was made, so parser changes can be replayed
+over the archive without touching the network.
+
+Layout:
+    <root>/objects/ab/abcdef....json.gz
+    <root>/index.jsonl
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+HAPPYCOW_BASE_URL = 'https://www.happycow.net/'
+
+
+def normalize_city_path(city_path: str) -> str:
+    """Normalize a city URL, pipe path or slash path to 'a/b/c' form"""
+    path = city_path.replace(HAPPYCOW_BASE_URL, '')
+    path = path.replace('%7C', '/').replace('%7c', '/').replace('|', '/')
+    return path.strip('/')
+
+
+class ResponseArchive:
+    """On-disk store of raw responses keyed by city path, page and fetch time"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.index_path = self.root / 'index.jsonl'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Latest entry per (city_path, page) as of _index_offset bytes into the index
+        self._latest: Dict[Tuple[str, int], Dict] = {}
+        self._index_offset = 0
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.json.gz"
+
+    def put(self, city_path: str, page: int, body: bytes,
+            fetched_at: Optional[str] = None) -> str:
+        """Archive a raw response body. Returns its content hash."""
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+
+        # Identical bodies are stored once
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=object_path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(gzip.compress(body))
+            os.replace(tmp_path, object_path)
+
+        entry = {
+            'city_path': normalize_city_path(city_path),
+            'page': page,
+            'fetched_at': fetched_at or datetime.utcnow().isoformat(),
+            'sha256': digest,
+            'bytes': len(body),
+        }
+
+        # Single-line appends keep the index safe across processes
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Return the raw body stored under a content hash"""
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read()
+
+    def entries(self, city_path: Optional[str] = None) -> Iterator[Dict]:
+        """Iterate index entries in fetch order, optionally for one city"""
+        if not self.index_path.exists():
+            return
+        wanted = normalize_city_path(city_path) if city_path else None
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if wanted is None or entry['city_path'] == wanted:
+                    yield entry
+
+    def _load_latest(self) -> Dict[Tuple[str, int], Dict]:
+        # Caller holds self._lock. Lines appended since the last call, by this
+        # archive or any other process sharing the directory, are read in.
+        try:
+            size = self.index_path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size < self._index_offset:
+            # The index was replaced or truncated; start over
+            self._latest, self._index_offset = {}, 0
+        if size == self._index_offset:
+            return self._latest
+
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Another process is mid-append; pick the line up next time
+                    break
+                self._index_offset += len(line)
+                if line.strip():
+                    entry = json.loads(line)
+                    self._latest[(entry['city_path'], entry['page'])] = entry
+        return self._latest
+
+    def latest_entries(self) -> Dict[Tuple[str, int], Dict]:
+        """Snapshot of the most recent index entry for every (city_path, page)"""
+        with self._lock:
+            return dict(self._load_latest())
+
+    def latest(self, city_path: str, page: int) -> Optional[bytes]:
+        """Most recently archived body for a city page, or None"""
+        with self._lock:
+            entry = self._load_latest().get((normalize_city_path(city_path), page))
+        if entry is None:
+            return None
+        return self.get(entry['sha256'])
@@ -0,0 +1,141 @@
+"""
+Short-lived caches for scraped listing pages.
+
+Entries expire after a TTL and the least recently used entries are evicted
+once the cache is full. PageCache lives in process memory; SqlitePageCache
+keeps entries in a SQLite file so every worker on the box shares them.
+Keys come from page_key(), so a city URL, pipe path and slash path all hit
+the same entry.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from .archive import normalize_city_path
+
+
+def page_key(city_path: str, page: int) -> str:
+    """Cache key for one page of a city"""
+    return f"{normalize_city_path(city_path)}#{page}"
+
+
+class PageCache:
+    """Thread-safe in-memory TTL cache with LRU eviction"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1000):
+        self.ttl = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': 'memory',
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class SqlitePageCache(PageCache):
+    """
+    TTL/LRU cache stored in SQLite and shared by every process using the
+    same file. Values must be JSON-serializable. Hit/miss counters are per
+    process; entries and evictions are shared.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float, max_entries: int = 1000):
+        super().__init__(ttl_seconds, max_entries)
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("CREATE TABLE IF NOT EXISTS page_cache ("
+                         "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                         "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS page_cache_accessed ON page_cache (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM page_cache WHERE key = ? AND stored_at > ?",
+                               (key, now - self.ttl)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE page_cache SET accessed_at = ? WHERE key = ?", (now, key))
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO page_cache (key, value, stored_at, accessed_at) "
+                         "VALUES (?, ?, ?, ?)", (key, json.dumps(value, default=str), now, now))
+            # Expired entries go first, then the least recently used beyond the limit
+            expired = conn.execute("DELETE FROM page_cache WHERE stored_at <= ?",
+                                   (now - self.ttl,)).rowcount
+            overflow = conn.execute("DELETE FROM page_cache WHERE key IN (SELECT key FROM page_cache "
+                                    "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                                    (self.max_entries,)).rowcount
+        with self._lock:
+            self.evictions += expired + overflow
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM page_cache").fetchone()[0]
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats['backend'] = 'sqlite'
+        return stats
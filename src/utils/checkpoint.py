@@ -0,0 +1,120 @@
+"""
+Per-page checkpoints for long city scrapes.
+
+Each page's venues and fetch metadata are written to SQLite as soon as the
+page is consumed, so a crashed or killed run can be resumed from what it
+already has instead of re-crawling the city. One row per city holds the
+run's cursor: the reported last page and, once the run has ended, whether
+it was complete and which pages it missed.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from .archive import normalize_city_path
+
+DEFAULT_CHECKPOINT_DB = os.environ.get('SCRAPER_CHECKPOINT_DB',
+                                       os.path.join(tempfile.gettempdir(), 'happycow_checkpoints.sqlite3'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    city_path TEXT PRIMARY KEY,
+    last_page INTEGER,
+    finished INTEGER NOT NULL DEFAULT 0,
+    resume_pages TEXT,
+    started_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoint_pages (
+    city_path TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    restaurants TEXT NOT NULL,
+    timing TEXT,
+    saved_at TEXT NOT NULL,
+    PRIMARY KEY (city_path, page)
+);
+"""
+
+
+class CheckpointStore:
+    """SQLite store of completed pages and the resume cursor per city"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def start(self, city_path: str):
+        """Begin a fresh run for the city, dropping any earlier checkpoint"""
+        key = normalize_city_path(city_path)
+        now = datetime.utcnow().isoformat()
+        with self._connect() as conn:
+            conn.execute('DELETE FROM checkpoint_pages WHERE city_path = ?', (key,))
+            conn.execute('INSERT OR REPLACE INTO checkpoints (city_path, started_at, updated_at) VALUES (?, ?, ?)',
+                         (key, now, now))
+
+    def save_page(self, city_path: str, page: int, restaurants: List[Dict],
+                  timing: Optional[Dict] = None, last_page: Optional[int] = None):
+        """Record a consumed page and the city's page count as known so far"""
+        key = normalize_city_path(city_path)
+        now = datetime.utcnow().isoformat()
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO checkpoint_pages (city_path, page, restaurants, timing, saved_at) '
+                         'VALUES (?, ?, ?, ?, ?)',
+                         (key, page, json.dumps(restaurants, default=str),
+                          json.dumps(timing) if timing is not None else None, now))
+            conn.execute('INSERT INTO checkpoints (city_path, last_page, started_at, updated_at) VALUES (?, ?, ?, ?) '
+                         'ON CONFLICT(city_path) DO UPDATE SET '
+                         'last_page = COALESCE(excluded.last_page, last_page), finished = 0, '
+                         'updated_at = excluded.updated_at',
+                         (key, last_page, now, now))
+
+    def finish(self, city_path: str, resume_pages: Optional[str]):
+        """Mark the run ended; resume_pages is None when the city is complete"""
+        with self._connect() as conn:
+            conn.execute('UPDATE checkpoints SET finished = 1, resume_pages = ?, updated_at = ? '
+                         'WHERE city_path = ?',
+                         (resume_pages, datetime.utcnow().isoformat(), normalize_city_path(city_path)))
+
+    def load(self, city_path: str) -> Optional[Dict]:
+        """
+        The city's checkpoint, or None if there is none
+        Returns: {'last_page', 'finished', 'resume_pages', 'started_at', 'updated_at',
+                  'pages': {page: {'restaurants': [...], 'timing': {...}}}}
+        """
+        key = normalize_city_path(city_path)
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM checkpoints WHERE city_path = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            pages = conn.execute('SELECT page, restaurants, timing FROM checkpoint_pages '
+                                 'WHERE city_path = ? ORDER BY page', (key,)).fetchall()
+
+        state = dict(row)
+        state['finished'] = bool(state['finished'])
+        state['pages'] = {
+            page['page']: {
+                'restaurants': json.loads(page['restaurants']),
+                'timing': json.loads(page['timing']) if page['timing'] else None,
+            }
+            for page in pages
+        }
+        return state
@@ -0,0 +1,209 @@
+"""
+Hive-partitioned Parquet dataset of scraped venues.
+
+Venues are written under root/state=<state>/city=<city>/scrape_date=<date>/,
+the state and city coming from each venue's city_path (.../<state>/<city>),
+so a query filtered on state, city or date opens only those partitions.
+A partition's files are written under hidden temporary names and renamed
+into place when the writer closes, replacing whatever an earlier run wrote
+for the same city and date. root/_catalog.json lists every partition with
+its files and row count. Requires pyarrow (pip install pyarrow).
+"""
+
+import fcntl
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from .sinks import ParquetSink, _as_dict
+
+CATALOG_FILE = '_catalog.json'
+PARTITION_KEYS = ('state', 'city', 'scrape_date')
+
+# Hive's name for a missing partition value
+DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+
+def partition_of(city_path: Optional[str]) -> Tuple[str, str]:
+    """(state, city) for a city path like north_america/usa/texas/dallas"""
+    parts = [part for part in (city_path or '').split('/') if part]
+    if len(parts) >= 2:
+        return parts[-2], parts[-1]
+    return DEFAULT_PARTITION, parts[0] if parts else DEFAULT_PARTITION
+
+
+def partition_path(state: str, city: str, scrape_date: str) -> str:
+    """Partition directory relative to the dataset root"""
+    values = (state, city, scrape_date)
+    return '/'.join(f"{key}={quote(value, safe='')}" for key, value in zip(PARTITION_KEYS, values))
+
+
+class ParquetDataset:
+    """
+    Sink that adds venues to the dataset under root. Each write() becomes a
+    row group in its partition's file. Nothing is visible to readers until
+    close(); abort() throws the run's files away instead.
+    """
+
+    def __init__(self, root: str, column_types: Optional[Dict[str, str]] = None,
+                 scrape_date: Optional[str] = None, max_open_files: int = 64):
+        self.root = Path(root)
+        self.column_types = column_types
+        self.scrape_date = scrape_date or date.today().isoformat()
+        self.max_open_files = max(1, max_open_files)
+        self.rows_written = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        # (state, city) -> (sink, final path), least recently written first
+        self._open: Dict[Tuple[str, str], Tuple[ParquetSink, Path]] = {}
+        # (state, city) -> [(sink, final path)] for files written out under their
+        # temporary names, waiting for close() to put them in place
+        self._finished: Dict[Tuple[str, str], List[Tuple[ParquetSink, Path]]] = {}
+        self._closed = False
+
+    def write(self, records: List[Dict]):
+        partitions: Dict[Tuple[str, str], List[Dict]] = {}
+        for record in records:
+            record = _as_dict(record)
+            partitions.setdefault(partition_of(record.get('city_path')), []).append(record)
+
+        for partition, rows in partitions.items():
+            self._sink(partition).write(rows)
+        self.rows_written += len(records)
+
+    def _sink(self, partition: Tuple[str, str]) -> ParquetSink:
+        entry = self._open.pop(partition, None)
+        if entry is None:
+            if len(self._open) >= self.max_open_files:
+                # A closed Parquet file cannot be appended to; the partition
+                # gets another file if more of its venues arrive later
+                oldest = next(iter(self._open))
+                self._finish(oldest, *self._open.pop(oldest))
+
+            directory = self.root / partition_path(*partition, self.scrape_date)
+            directory.mkdir(parents=True, exist_ok=True)
+            name = f"part-{len(self._finished.get(partition, ()))}.parquet"
+            entry = ParquetSink(str(directory / f".{name}.tmp"), self.column_types), directory / name
+
+        self._open[partition] = entry
+        return entry[0]
+
+    def _finish(self, partition: Tuple[str, str], sink: ParquetSink, path: Path):
+        """Complete a file under its temporary name; it stays invisible until close()"""
+        sink.close()
+        self._finished.setdefault(partition, []).append((sink, path))
+
+    def _commit(self, partition: Tuple[str, str]) -> Dict[str, int]:
+        """Put the partition's files in place and drop earlier runs' files; returns {file name: rows}"""
+        files = {}
+        for sink, path in self._finished[partition]:
+            os.replace(sink.path, path)
+            files[path.name] = sink.rows_written
+        for old in path.parent.glob('*.parquet'):
+            if old.name not in files:
+                old.unlink()
+        return files
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for partition, (sink, path) in list(self._open.items()):
+            self._finish(partition, sink, path)
+        self._open.clear()
+
+        written_at = datetime.utcnow().isoformat()
+        entries = []
+        for (state, city) in self._finished:
+            files = self._commit((state, city))
+            entries.append({
+                'state': state,
+                'city': city,
+                'scrape_date': self.scrape_date,
+                'path': partition_path(state, city, self.scrape_date),
+                'files': sorted(files),
+                'rows': sum(files.values()),
+                'written_at': written_at,
+            })
+        update_catalog(self.root, entries)
+
+    def abort(self):
+        """Discard everything this run wrote; earlier runs' files stay in place"""
+        if self._closed:
+            return
+        self._closed = True
+        for partition, (sink, path) in list(self._open.items()):
+            self._finish(partition, sink, path)
+        self._open.clear()
+        for entries in self._finished.values():
+            for sink, _ in entries:
+                if sink.path.exists():
+                    sink.path.unlink()
+        self._finished.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def load_catalog(root: str) -> Dict:
+    """The dataset's catalog; empty if nothing has been written yet"""
+    path = Path(root) / CATALOG_FILE
+    if not path.exists():
+        return {'partitioning': list(PARTITION_KEYS), 'total_rows': 0, 'partitions': []}
+    return json.loads(path.read_text())
+
+
+def update_catalog(root: str, partitions: List[Dict]):
+    """Add or replace catalog entries (keyed by path); safe across processes"""
+    if not partitions:
+        return
+    root = Path(root)
+    with open(root / '_catalog.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        entries = {entry['path']: entry for entry in load_catalog(root)['partitions']}
+        entries.update({entry['path']: entry for entry in partitions})
+        catalog = {
+            'partitioning': list(PARTITION_KEYS),
+            'updated_at': datetime.utcnow().isoformat(),
+            'total_rows': sum(entry['rows'] for entry in entries.values()),
+            'partitions': [entries[path] for path in sorted(entries)],
+        }
+        temporary = root / f".{CATALOG_FILE}.tmp"
+        temporary.write_text(json.dumps(catalog, indent=2))
+        os.replace(temporary, root / CATALOG_FILE)
+
+
+def read_dataset(root: str, columns: Optional[List[str]] = None, **partitions):
+    """
+    Read venues from the dataset as a pyarrow Table, opening only the files
+    of matching partitions, e.g. read_dataset(root, state='texas',
+    columns=['name', 'type']). A filter value may be a list of values.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    unknown = set(partitions) - set(PARTITION_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown partition keys: {', '.join(sorted(unknown))}")
+
+    wanted = {key: set(value) if isinstance(value, (list, tuple, set)) else {value}
+              for key, value in partitions.items()}
+    files = [
+        str(Path(root) / entry['path'] / name)
+        for entry in load_catalog(root)['partitions']
+        if all(entry[key] in values for key, values in wanted.items())
+        for name in entry['files']
+    ]
+
+    partitioning = ds.partitioning(pa.schema([(key, pa.string()) for key in PARTITION_KEYS]), flavor='hive')
+    dataset = ds.dataset(files, format='parquet', partitioning=partitioning, partition_base_dir=str(root))
+    return dataset.to_table(columns=columns)
@@ -0,0 +1,206 @@
+"""
+Request rate limiting for polite scraping.
+Replaces fixed sleeps between requests with a shared limiter.
+
+Both limiters are token buckets kept per host: each host earns
+requests_per_second tokens and holds at most `burst` of them.
+RateLimiter shares its buckets between the threads and asyncio tasks of
+one process; SharedRateLimiter keeps them in a SQLite file so every
+process on the box that opens the same file (gunicorn workers, parallel
+CLI runs) draws from one budget per host. adjust_rate() and pause() let
+AdaptiveRateController (adaptive.py) steer a host's rate from upstream
+responses; SharedRateLimiter stores the adjusted rate in the same row, so
+a slow-down seen by one process applies to all of them.
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict
+
+# Default bucket file shared by the CLI scrapers and the services
+DEFAULT_RATE_DB = os.environ.get('SCRAPER_RATE_DB',
+                                 os.path.join(tempfile.gettempdir(), 'happycow_rate.sqlite3'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    host TEXT PRIMARY KEY,
+    next_slot REAL NOT NULL,
+    interval REAL
+)
+"""
+
+
+class RateLimiter:
+    """Thread-safe per-host token bucket for the current process"""
+
+    def __init__(self, requests_per_second: float, burst: int = 1):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        # host -> time the bucket is next empty-and-refilling from (GCRA arrival time)
+        self._next_slot: Dict[str, float] = {}
+        # host -> interval set by set_rate(), overriding self.interval
+        self._intervals: Dict[str, float] = {}
+
+    def _interval(self, host: str) -> float:
+        return self._intervals.get(host, self.interval)
+
+    def _claim(self, next_slot: float, now: float, interval: float):
+        """Take one token from a bucket. Returns (new next_slot, seconds to wait)."""
+        slot = max(now, next_slot) + interval
+        # Up to `burst` tokens may be spent ahead of the steady rate
+        wait = slot - self.burst * interval - now
+        return slot, max(0.0, wait)
+
+    def _paused_slot(self, now: float, seconds: float, interval: float) -> float:
+        # A next_slot this far ahead makes the next claim wait `seconds`
+        return now + seconds + (self.burst - 1) * interval
+
+    def _adjusted_interval(self, interval: float, update) -> float:
+        rate = update(1.0 / interval)
+        return 1.0 / rate if rate > 0 else interval
+
+    def adjust_rate(self, host: str, update) -> float:
+        """
+        Apply update(current rate) -> new rate to host and return the new rate
+        (an unlimited limiter stays unlimited and returns 0)
+        """
+        if self.interval == 0:
+            return 0.0
+        with self._lock:
+            interval = self._intervals[host] = self._adjusted_interval(self._interval(host), update)
+        return 1.0 / interval
+
+    def set_rate(self, requests_per_second: float, host: str = ''):
+        """Change host's rate from now on (an unlimited limiter stays unlimited)"""
+        self.adjust_rate(host, lambda rate: requests_per_second)
+
+    def pause(self, host: str, seconds: float):
+        """Send nothing to host for `seconds` (e.g. a Retry-After)"""
+        if self.interval == 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            paused = self._paused_slot(now, seconds, self._interval(host))
+            self._next_slot[host] = max(self._next_slot.get(host, now), paused)
+
+    def reserve(self, host: str = '') -> float:
+        """Claim the next request slot for host. Returns seconds until it arrives."""
+        if self.interval == 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._next_slot[host], wait = self._claim(self._next_slot.get(host, now), now, self._interval(host))
+        return wait
+
+    def acquire(self, host: str = '') -> float:
+        """Block until the caller may send a request to host. Returns seconds waited."""
+        # Sleep outside the lock so other threads can reserve later slots
+        wait = self.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, host: str = '') -> float:
+        """acquire() for coroutines: waits without blocking the event loop"""
+        wait = self.reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class SharedRateLimiter(RateLimiter):
+    """Per-host token bucket stored in SQLite and shared by every process using db_path"""
+
+    def __init__(self, requests_per_second: float, db_path: str = DEFAULT_RATE_DB, burst: int = 1):
+        super().__init__(requests_per_second, burst)
+        self.db_path = db_path
+
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(SCHEMA)
+            # Bucket files written before rates were shared have no interval column
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(rate_buckets)')}
+            if 'interval' not in columns:
+                conn.execute('ALTER TABLE rate_buckets ADD COLUMN interval REAL')
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode so _update() controls the transaction itself
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _update(self, host: str, update):
+        """
+        Apply update(next_slot, interval, now) -> (new next_slot, new interval, result)
+        to host's bucket atomically
+        """
+        conn = self._connect()
+        try:
+            # Take the write lock before reading so no other process claims the same slot
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT next_slot, interval FROM rate_buckets WHERE host = ?',
+                               (host,)).fetchone()
+            # Wall-clock time so every process measures slots on the same clock
+            now = time.time()
+            next_slot, interval = row if row else (now, None)
+            next_slot, interval, result = update(next_slot, interval or self.interval, now)
+            conn.execute('INSERT OR REPLACE INTO rate_buckets (host, next_slot, interval) VALUES (?, ?, ?)',
+                         (host, next_slot, interval))
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        return result
+
+    def reserve(self, host: str = '') -> float:
+        if self.interval == 0:
+            return 0.0
+
+        def claim(next_slot, interval, now):
+            next_slot, wait = self._claim(next_slot, now, interval)
+            return next_slot, interval, wait
+
+        return self._update(host, claim)
+
+    def adjust_rate(self, host: str, update) -> float:
+        # Read and written under the bucket's lock, so every process adapts one shared rate
+        if self.interval == 0:
+            return 0.0
+
+        def adjust(next_slot, interval, now):
+            interval = self._adjusted_interval(interval, update)
+            return next_slot, interval, 1.0 / interval
+
+        return self._update(host, adjust)
+
+    def pause(self, host: str, seconds: float):
+        # Stored with the bucket, so every process sharing db_path holds off
+        if self.interval == 0:
+            return
+
+        def hold(next_slot, interval, now):
+            return max(next_slot, self._paused_slot(now, seconds, interval)), interval, None
+
+        self._update(host, hold)
+
+    async def acquire_async(self, host: str = '') -> float:
+        # The SQLite transaction may wait on another process's lock; keep it off the event loop
+        wait = await asyncio.to_thread(self.reserve, host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+def make_rate_limiter(requests_per_second: float, db_path: str = DEFAULT_RATE_DB,
+                      burst: int = 1) -> RateLimiter:
+    """SharedRateLimiter on db_path, or a process-local RateLimiter when db_path is empty or there is no limit"""
+    if db_path and requests_per_second > 0:
+        return SharedRateLimiter(requests_per_second, db_path, burst)
+    return RateLimiter(requests_per_second, burst)
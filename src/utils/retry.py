@@ -0,0 +1,61 @@
+"""
+Retries for transient upstream failures.
+
+RetryPolicy retries timeouts, dropped connections, 429s and 5xx responses
+with exponential backoff and full jitter; anything else (4xx, bad JSON,
+a page missing from the archive) fails on the first attempt.
+"""
+
+import logging
+import random
+import time
+from typing import Callable, Optional, TypeVar
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed request is worth sending again"""
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is not None and response.status_code in RETRYABLE_STATUSES
+    # Timeouts, refused/reset connections and bodies cut off mid-download
+    return isinstance(error, (requests.Timeout, requests.ConnectionError,
+                              requests.exceptions.ChunkedEncodingError))
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for retryable errors"""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                 retryable: Callable[[BaseException], bool] = is_retryable):
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+
+    def delay(self, retry: int) -> float:
+        """Seconds to wait before retry number `retry` (1-based)"""
+        # Full jitter keeps clients that failed together from retrying together
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def call(self, fn: Callable[[], T], description: Optional[str] = None) -> T:
+        """Call fn(), retrying retryable errors. Raises the last error once retries run out."""
+        retry = 0
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                if retry >= self.max_retries or not self.retryable(e):
+                    raise
+                retry += 1
+                wait = self.delay(retry)
+                logger.warning(f"{description or 'Request'} failed ({e}); "
+                               f"retry {retry}/{self.max_retries} in {wait:.1f}s")
+                time.sleep(wait)
@@ -0,0 +1,127 @@
+"""
+Single-flight call coalescing.
+
+While a call for a key is running, further calls for the same key wait
+for it and share its result instead of starting their own, so overlapping
+requests for one city cost one scrape. SingleFlight coalesces threads,
+AsyncSingleFlight coalesces coroutines on one event loop.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-safe coalescing of concurrent calls that share a key"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn() unless a call for key is already in flight
+        Returns: (result, shared) where shared is True if another call's result was reused
+        """
+        with self._lock:
+            self.requests += 1
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._flights),
+                'waiting': sum(flight.waiters for flight in self._flights.values()),
+            }
+
+
+class AsyncSingleFlight:
+    """Coalescing of concurrent coroutine calls that share a key"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await fn() unless a call for key is already in flight
+        Returns: (result, shared) where shared is True if another call's result was reused
+        """
+        self.requests += 1
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            self._waiters[key] += 1
+            # Shield so a cancelled waiter does not cancel the shared call
+            return await asyncio.shield(flight), True
+
+        self.executions += 1
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        self._waiters[key] = 0
+        try:
+            result = await fn()
+            flight.set_result(result)
+            return result, False
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Nobody else may be waiting; don't warn about an unretrieved exception
+            flight.exception()
+            raise
+        finally:
+            del self._flights[key]
+            del self._waiters[key]
+
+    def stats(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._flights),
+            'waiting': sum(self._waiters.values()),
+        }
@@ -0,0 +1,220 @@
+"""
+Record sinks that write venue records incrementally.
+
+Each sink accepts batches of records (dicts, or objects with a to_dict()
+such as src.models.venue.VenueRecord) via write() and flushes them to
+disk straight away, so callers never need to hold a full city (or a full
+corpus) in memory. The JSON and JSONL sinks can also write to an open
+stream such as stdout. Parquet output needs pyarrow (pip install pyarrow).
+"""
+
+import csv
+import json
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Tuple, Union
+
+Target = Union[str, Path, IO[str]]
+
+
+def _open_target(target: Target, newline: Optional[str] = None) -> Tuple[IO[str], bool]:
+    """(file, owned): paths are opened for writing, open streams are used as they are"""
+    if hasattr(target, 'write'):
+        return target, False
+    return open(target, 'w', newline=newline, encoding='utf-8'), True
+
+
+def _as_dict(record) -> Dict:
+    to_dict = getattr(record, 'to_dict', None)
+    return to_dict() if to_dict is not None else record
+
+
+def _csv_value(value):
+    """Format a value the way pandas.DataFrame.to_csv would"""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple, dict)):
+        return str(value)
+    return value
+
+
+class CsvSink:
+    """CSV writer; the header is taken from the first record written"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.rows_written = 0
+        self._file = open(self.path, 'w', newline='', encoding='utf-8')
+        self._writer = None
+
+    def write(self, records: List[Dict]):
+        if not records:
+            return
+        records = [_as_dict(record) for record in records]
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(records[0].keys()),
+                                          extrasaction='ignore')
+            self._writer.writeheader()
+        for record in records:
+            self._writer.writerow({key: _csv_value(value) for key, value in record.items()})
+        self._file.flush()
+        self.rows_written += len(records)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonlSink:
+    """
+    Newline-delimited JSON writer, one record per line. Fields in `tag`
+    (e.g. {'record': 'restaurant'}) are put in front of every record.
+    """
+
+    def __init__(self, target: Target, tag: Optional[Dict] = None):
+        self.rows_written = 0
+        self._tag = tag or {}
+        self._file, self._owned = _open_target(target)
+
+    def write(self, records: List[Dict]):
+        for record in records:
+            self._file.write(json.dumps({**self._tag, **_as_dict(record)}, default=str))
+            self._file.write('\n')
+        self._file.flush()
+        self.rows_written += len(records)
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonSink:
+    """
+    A single JSON object whose `key` array is written record by record.
+    finish() closes the array and appends the remaining fields (e.g. the
+    summary), so they come after the records instead of needing them all.
+    """
+
+    def __init__(self, target: Target, key: str = 'restaurants'):
+        self.rows_written = 0
+        self._file, self._owned = _open_target(target)
+        self._file.write(f"{{{json.dumps(key)}: [")
+        self._finished = False
+
+    def write(self, records: List[Dict]):
+        for record in records:
+            self._file.write(',\n' if self.rows_written else '\n')
+            self._file.write(json.dumps(_as_dict(record), default=str))
+            self.rows_written += 1
+        self._file.flush()
+
+    def finish(self, fields: Optional[Dict] = None):
+        if self._finished:
+            return
+        self._finished = True
+        self._file.write('\n]')
+        for key, value in (fields or {}).items():
+            self._file.write(f",\n{json.dumps(key)}: {json.dumps(value, default=str)}")
+        self._file.write('}\n')
+        self._file.flush()
+
+    def close(self):
+        self.finish()
+        if self._owned:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _arrow_type(pa, name: str):
+    """pyarrow type for an alias like 'string', 'list<string>' or 'dictionary<string>'"""
+    if name.startswith('list<') and name.endswith('>'):
+        return pa.list_(_arrow_type(pa, name[5:-1]))
+    if name.startswith('dictionary<') and name.endswith('>'):
+        # Dictionary-encoded (categorical) values
+        return pa.dictionary(pa.int32(), _arrow_type(pa, name[11:-1]))
+    return pa.type_for_alias(name)
+
+
+class ParquetSink:
+    """
+    Parquet writer; each write() becomes one row group. Without
+    column_types ({column: 'string' | 'float64' | 'list<string>' ...}) the
+    schema is inferred from the first write, which fails later writes if a
+    column was all None in it.
+    """
+
+    def __init__(self, path: str, column_types: Optional[Dict[str, str]] = None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+
+        self._pa = pa
+        self._pq = pq
+        self.path = Path(path)
+        self.rows_written = 0
+        self._writer = None
+        self._schema = None
+        if column_types:
+            self._schema = pa.schema([(column, _arrow_type(pa, name)) for column, name in column_types.items()])
+
+    def write(self, records: List[Dict]):
+        if not records:
+            return
+        records = [_as_dict(record) for record in records]
+        if self._schema is None:
+            self._schema = self._pa.Table.from_pylist(records).schema
+        table = self._pa.Table.from_pylist(records, schema=self._schema)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(str(self.path), self._schema)
+        self._writer.write_table(table)
+        self.rows_written += len(records)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+SINKS = {
+    'csv': CsvSink,
+    'json': JsonSink,
+    'jsonl': JsonlSink,
+    'parquet': ParquetSink,
+}
+
+
+def open_sink(path: str, fmt: Optional[str] = None, column_types: Optional[Dict[str, str]] = None):
+    """
+    Open a sink for path, choosing the format from its extension if not given
+    column_types fixes the Parquet schema (other formats do not need one)
+    """
+    if fmt is None:
+        suffix = Path(path).suffix.lower().lstrip('.')
+        fmt = {'ndjson': 'jsonl', 'pq': 'parquet'}.get(suffix, suffix)
+    if fmt not in SINKS:
+        raise ValueError(f"Unsupported output format '{fmt}' (choose from {', '.join(SINKS)})")
+    if fmt == 'parquet':
+        return ParquetSink(path, column_types)
+    return SINKS[fmt](path)
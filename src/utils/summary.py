@@ -0,0 +1,45 @@
+"""
+Running summary statistics for scraped venues.
+
+VenueStats is updated as each page of venues is stored, so a city's
+summary costs the same however many venues it has and never needs the
+records themselves (or a DataFrame built from them).
+"""
+
+from collections import Counter
+from typing import Dict, Iterable
+
+
+class VenueStats:
+    """Counts by type, rating total, coordinate coverage and highest page seen"""
+
+    def __init__(self):
+        self.total = 0
+        self.types = Counter()
+        self.rating_sum = 0.0
+        self.rating_count = 0
+        self.with_coordinates = 0
+        self.max_page = 0
+
+    def add(self, restaurants: Iterable[Dict]):
+        for restaurant in restaurants:
+            self.total += 1
+            venue_type = restaurant.get('type')
+            if venue_type is not None:
+                self.types[venue_type] += 1
+            rating = restaurant.get('rating')
+            if rating is not None:
+                self.rating_sum += rating
+                self.rating_count += 1
+            if restaurant.get('latitude') is not None and restaurant.get('longitude') is not None:
+                self.with_coordinates += 1
+            self.max_page = max(self.max_page, restaurant.get('page_number') or 0)
+
+    def to_dict(self) -> Dict:
+        return {
+            'total_restaurants': self.total,
+            'pages_scraped': self.max_page,
+            'types': dict(self.types.most_common()),
+            'avg_rating': self.rating_sum / self.rating_count if self.rating_count else 0,
+            'restaurants_with_coordinates': self.with_coordinates,
+        }
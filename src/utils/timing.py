@@ -0,0 +1,105 @@
+"""
+Per-page phase timings for scrapes.
+
+TimedHTTPAdapter mounts urllib3 connections that time connect() (DNS
+lookup, TCP connect and TLS handshake) for the calling thread, and
+timed_get() splits the rest of a GET into time to first byte and body
+download. Parse-side phases are added by the scrapers; summarize_timings()
+builds the opt-in 'timings' block reported with results.
+"""
+
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Phases in the order they happen for one page
+PHASES = (
+    'wait_seconds',           # rate limiter and per-host slot
+    'dns_connect_seconds',    # DNS, TCP and TLS; 0 on a kept-alive connection
+    'ttfb_seconds',           # request sent until response headers
+    'download_seconds',       # response body
+    'decode_seconds',         # JSON decode
+    'html_parse_seconds',     # building the document or card trees
+    'extract_seconds',        # venue field extraction
+)
+
+_local = threading.local()
+
+
+class _TimedConnectMixin:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            timing = getattr(_local, 'timing', None)
+            if timing is not None:
+                timing['dns_connect_seconds'] += time.perf_counter() - start
+
+
+class TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report connect time to timed_get()"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+def timed_get(session: requests.Session, url: str, **kwargs) -> Tuple[requests.Response, Dict]:
+    """
+    GET url and read the body, timing each network phase
+    Returns: (response, timing) with dns_connect/ttfb/download seconds and bytes
+    """
+    timing = {'dns_connect_seconds': 0.0}
+    _local.timing = timing
+    start = time.perf_counter()
+    try:
+        response = session.get(url, stream=True, **kwargs)
+        headers_at = time.perf_counter()
+        body = response.content
+    finally:
+        _local.timing = None
+    finished_at = time.perf_counter()
+
+    connect = timing['dns_connect_seconds']
+    timing.update({
+        'dns_connect_seconds': round(connect, 4),
+        'ttfb_seconds': round(max(headers_at - start - connect, 0.0), 4),
+        'download_seconds': round(finished_at - headers_at, 4),
+        'bytes': len(body),
+    })
+    return response, timing
+
+
+def summarize_timings(pages: List[Dict]) -> Dict:
+    """The 'timings' block: every page's phases plus totals across pages"""
+    totals = {phase: round(sum(page.get(phase, 0.0) for page in pages), 4) for phase in PHASES}
+    totals['bytes'] = sum(page.get('bytes', 0) for page in pages)
+    totals['venues'] = sum(page.get('venues', 0) for page in pages)
+    totals['pages'] = len(pages)
+    totals['cached_pages'] = sum(1 for page in pages if page.get('cache_hit'))
+    return {'pages': pages, 'totals': totals}
@@ -0,0 +1,47 @@
+"""
+Shared fixtures; the fake listing pages themselves are in fakes.py
+"""
+
+import os
+import re
+import tempfile
+
+import pytest
+
+from fakes import FakeResponse, listing_html
+
+# The services read their settings at import: no rate limit, cache or shared
+# SQLite files outside a scratch directory
+_SCRATCH = tempfile.mkdtemp(prefix='hc-scraper-tests-')
+os.environ.update({
+    'SCRAPER_RATE': '0',
+    'SCRAPER_RATE_DB': '',
+    'SCRAPER_CACHE_TTL': '0',
+    'SCRAPER_JOB_DB': os.path.join(_SCRATCH, 'jobs.sqlite3'),
+    'SCRAPER_CHECKPOINT_DB': os.path.join(_SCRATCH, 'checkpoints.sqlite3'),
+})
+
+
+@pytest.fixture
+def fake_listing():
+    """
+    fake_listing(pages, per_page, fail=()) -> (get, calls): a session.get
+    replacement serving a city of `pages` pages, answering 500 for pages in
+    `fail`, and recording every page requested in `calls`
+    """
+    def make(pages: int = 4, per_page: int = 5, fail=()):
+        calls = []
+
+        def get(url, timeout=None, **kwargs):
+            match = re.search(r'page=(\d+)', url)
+            page = int(match.group(1)) if match else 1
+            calls.append(page)
+            if page in fail:
+                return FakeResponse({}, 500)
+            html = listing_html(page, per_page) if page <= pages else ''
+            paginated = {'current_page': page, 'last_page': pages}
+            return FakeResponse({'success': True, 'data': {'data': html, 'paginated': paginated}})
+
+        return get, calls
+
+    return make
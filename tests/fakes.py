@@ -0,0 +1,46 @@
+"""
+Offline stand-ins for the HappyCow AJAX listing endpoint
+"""
+
+import json
+
+import requests
+
+VENUE_TYPES = ('vegan', 'vegetarian', 'veg-options')
+
+
+def venue_card(page: int, index: int) -> str:
+    """A listing card in the markup the AJAX endpoint returns"""
+    return (
+        f'<div class="venue-list-item card-listing" data-id="{page}{index:03d}" '
+        f'data-type="{VENUE_TYPES[index % 3]}">'
+        f'<h3 class="venue-name"><a data-analytics="listing-card-title" href="/reviews/v-{page}-{index}">'
+        f'Place {page}-{index}</a></h3>'
+        f'<div class="venue-rating">{index % 5}.5 stars</div>'
+        f'<span class="review-count">({index * 3} reviews)</span>'
+        f'<div class="venue-address">{index} Main St, Dallas</div>'
+        f'<a href="https://www.google.com/maps?q=32.{index},-96.{page}">map</a>'
+        f'<span class="cuisine-tag">Thai</span><span class="price-range">$$</span>'
+        f'</div>'
+    )
+
+
+def listing_html(page: int, venues: int) -> str:
+    return '<div class="filters">f</div>' + ''.join(venue_card(page, i) for i in range(venues))
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code: int = 200):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+        self.text = self.content.decode()
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code), response=self)
+
+
@@ -0,0 +1,137 @@
+import sqlite3
+import time
+
+import pytest
+
+from src.utils.adaptive import AdaptiveRateController, retry_after_seconds
+from src.utils.rate_limiter import RateLimiter, SharedRateLimiter
+
+HOST = 'www.happycow.net'
+
+
+@pytest.fixture
+def rate_db(tmp_path):
+    return str(tmp_path / 'rate.sqlite3')
+
+
+def interval(limiter, host=HOST):
+    """Interval the limiter will space host's next claims by"""
+    if isinstance(limiter, SharedRateLimiter):
+        return limiter._update(host, lambda next_slot, interval, now: (next_slot, interval, interval))
+    return limiter._interval(host)
+
+
+def test_throttled_responses_cut_the_rate_once_per_round_trip():
+    limiter = RateLimiter(4)
+    controller = AdaptiveRateController(limiter, min_rate=1)
+
+    sent_at = time.monotonic()
+    controller.record(HOST, 429, 0.1, sent_at)
+    # Sent before the first cut took effect: no second cut
+    controller.record(HOST, 503, 0.1, sent_at)
+    assert controller.rate(HOST) == 2
+    assert interval(limiter) == pytest.approx(0.5)
+
+    for _ in range(3):
+        controller.record(HOST, None, 0.1, time.monotonic())
+    # Never below min_rate
+    assert controller.rate(HOST) == 1
+    assert controller.stats()['hosts'][HOST]['decreases'] == 4
+
+
+def test_healthy_windows_raise_the_rate_up_to_max_rate():
+    limiter = RateLimiter(1)
+    controller = AdaptiveRateController(limiter, max_rate=1.5, increase=0.25, window=2)
+
+    for _ in range(2):
+        controller.record(HOST, 200, 0.1, time.monotonic())
+    assert controller.rate(HOST) == 1.25
+    assert interval(limiter) == pytest.approx(0.8)
+
+    for _ in range(10):
+        controller.record(HOST, 404, 0.1, time.monotonic())
+    assert controller.rate(HOST) == 1.5
+
+
+def test_slow_responses_hold_the_rate():
+    controller = AdaptiveRateController(RateLimiter(1), max_rate=2, window=1)
+    controller.record(HOST, 200, 0.1, time.monotonic())
+    rate = controller.rate(HOST)
+
+    controller.record(HOST, 200, 5.0, time.monotonic())
+    assert controller.rate(HOST) == rate
+
+
+def test_unlimited_limiter_is_left_alone():
+    limiter = RateLimiter(0)
+    controller = AdaptiveRateController(limiter)
+    controller.record(HOST, 429, 0.1, time.monotonic(), retry_after='30')
+
+    assert not controller.enabled
+    assert limiter.reserve(HOST) == 0
+
+
+def test_decrease_is_shared_through_the_rate_db(rate_db):
+    first, second = SharedRateLimiter(4, rate_db), SharedRateLimiter(4, rate_db)
+    first_controller = AdaptiveRateController(first, min_rate=0.5)
+    second_controller = AdaptiveRateController(second, min_rate=0.5)
+
+    first_controller.record(HOST, 429, 0.1, time.monotonic())
+    assert interval(second) == pytest.approx(0.5)
+
+    # The second process cuts the rate it shares, not the 4/s it started with
+    second_controller.record(HOST, 503, 0.1, time.monotonic())
+    assert second_controller.rate(HOST) == 1
+    assert interval(first) == pytest.approx(1.0)
+
+
+def test_increase_is_shared_through_the_rate_db(rate_db):
+    first, second = SharedRateLimiter(1, rate_db), SharedRateLimiter(1, rate_db)
+    controller = AdaptiveRateController(first, max_rate=2, increase=0.5, window=1)
+
+    controller.record(HOST, 200, 0.1, time.monotonic())
+    assert controller.rate(HOST) == 1.5
+    assert interval(second) == pytest.approx(1 / 1.5)
+    # Other hosts keep the configured rate
+    assert interval(second, 'other.example') == 1.0
+
+
+def test_rate_db_without_an_interval_column_is_migrated(rate_db):
+    with sqlite3.connect(rate_db) as conn:
+        conn.execute('CREATE TABLE rate_buckets (host TEXT PRIMARY KEY, next_slot REAL NOT NULL)')
+        conn.execute('INSERT INTO rate_buckets VALUES (?, ?)', (HOST, 0.0))
+
+    limiter = SharedRateLimiter(2, rate_db)
+    assert interval(limiter) == 0.5
+    limiter.set_rate(1, HOST)
+    assert interval(SharedRateLimiter(2, rate_db)) == 1.0
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('120', 120.0),
+    (' 5 ', 5.0),
+    ('Wed, 21 Oct 2015 07:28:00 GMT', 0.0),
+    ('soon', None),
+    (None, None),
+])
+def test_retry_after_seconds(value, expected):
+    assert retry_after_seconds(value) == expected
+
+
+def test_retry_after_pauses_every_process_sharing_the_host(rate_db):
+    first, second = SharedRateLimiter(10, rate_db), SharedRateLimiter(10, rate_db)
+    controller = AdaptiveRateController(first, max_retry_after=60)
+
+    controller.record(HOST, 429, 0.1, time.monotonic(), retry_after='30')
+    assert second.reserve(HOST) == pytest.approx(30, abs=1)
+
+
+def test_retry_after_is_capped_and_ignored_on_other_statuses():
+    limiter = RateLimiter(10)
+    controller = AdaptiveRateController(limiter, max_retry_after=5)
+
+    controller.record(HOST, 500, 0.1, time.monotonic(), retry_after='30')
+    assert limiter.reserve(HOST) == 0
+
+    controller.record(HOST, 503, 0.1, time.monotonic(), retry_after='3600')
+    assert limiter.reserve(HOST) == pytest.approx(5, abs=0.5)
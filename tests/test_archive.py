@@ -0,0 +1,45 @@
+from src.utils.archive import ResponseArchive
+
+DALLAS = 'north_america/usa/texas/dallas'
+AUSTIN = 'north_america/usa/texas/austin'
+
+
+def test_latest_returns_the_newest_body_for_a_page(tmp_path):
+    archive = ResponseArchive(str(tmp_path))
+    archive.put(DALLAS, 1, b'first')
+    archive.put(f"https://www.happycow.net/{DALLAS}/", 1, b'second')
+    archive.put(DALLAS, 2, b'first')
+
+    assert archive.latest(DALLAS.replace('/', '|'), 1) == b'second'
+    assert archive.latest(DALLAS, 2) == b'first'
+    assert archive.latest(DALLAS, 3) is None
+    assert len(list(archive.entries(DALLAS))) == 3
+
+
+def test_archives_sharing_a_directory_see_each_others_puts(tmp_path):
+    writer = ResponseArchive(str(tmp_path))
+    reader = ResponseArchive(str(tmp_path))
+    writer.put(DALLAS, 1, b'old')
+    assert reader.latest(DALLAS, 1) == b'old'
+
+    writer.put(DALLAS, 1, b'new')
+    writer.put(AUSTIN, 1, b'austin')
+
+    assert reader.latest(DALLAS, 1) == b'new'
+    assert reader.latest(AUSTIN, 1) == b'austin'
+    assert set(reader.latest_entries()) == {(DALLAS, 1), (AUSTIN, 1)}
+
+
+def test_partially_appended_index_line_is_read_once_complete(tmp_path):
+    archive = ResponseArchive(str(tmp_path))
+    archive.put(DALLAS, 1, b'body')
+    line = archive.index_path.read_text().splitlines()[0].replace('"page": 1', '"page": 2')
+
+    # Another process caught mid-append
+    with open(archive.index_path, 'a') as f:
+        f.write(line[:20])
+    assert archive.latest(DALLAS, 2) is None
+
+    with open(archive.index_path, 'a') as f:
+        f.write(line[20:] + '\n')
+    assert archive.latest(DALLAS, 2) == b'body'
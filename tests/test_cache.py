@@ -0,0 +1,106 @@
+import pytest
+
+from src.utils import cache
+from src.utils.cache import PageCache, SqlitePageCache, page_key
+
+DALLAS = 'north_america/usa/texas/dallas'
+
+
+class FakeClock:
+    """Stands in for the time module"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_cache(request, tmp_path):
+    def make(ttl_seconds, max_entries=1000):
+        if request.param == 'memory':
+            return PageCache(ttl_seconds, max_entries)
+        return SqlitePageCache(str(tmp_path / 'cache.sqlite3'), ttl_seconds, max_entries)
+
+    return make
+
+
+def test_entries_expire_after_the_ttl(make_cache, clock):
+    pages = make_cache(60)
+    pages.put('a', {'restaurants': [1]})
+
+    clock.now += 59
+    assert pages.get('a') == {'restaurants': [1]}
+    clock.now += 1
+    assert pages.get('a') is None
+    assert (pages.hits, pages.misses) == (1, 1)
+
+
+def test_put_restarts_the_ttl(make_cache, clock):
+    pages = make_cache(60)
+    pages.put('a', 'old')
+    clock.now += 50
+    pages.put('a', 'new')
+
+    clock.now += 50
+    assert pages.get('a') == 'new'
+
+
+def test_least_recently_used_entry_is_evicted(make_cache, clock):
+    pages = make_cache(60, max_entries=2)
+    pages.put('a', 1)
+    clock.now += 1
+    pages.put('b', 2)
+    clock.now += 1
+    # Reading 'a' makes 'b' the least recently used
+    assert pages.get('a') == 1
+    clock.now += 1
+    pages.put('c', 3)
+
+    assert pages.get('b') is None
+    assert (pages.get('a'), pages.get('c')) == (1, 3)
+    assert len(pages) == 2
+    assert pages.stats()['evictions'] == 1
+
+
+def test_stats(make_cache, clock):
+    pages = make_cache(60, max_entries=10)
+    pages.put('a', 1)
+    pages.get('a')
+    pages.get('b')
+
+    stats = pages.stats()
+    assert stats['backend'] in ('memory', 'sqlite')
+    assert (stats['entries'], stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 1, 0.5)
+
+
+def test_sqlite_caches_sharing_a_file_share_entries(tmp_path, clock):
+    db_path = str(tmp_path / 'cache.sqlite3')
+    first, second = SqlitePageCache(db_path, 60, 2), SqlitePageCache(db_path, 60, 2)
+    first.put('a', {'venues': ['x']})
+    assert second.get('a') == {'venues': ['x']}
+
+    clock.now += 1
+    second.put('b', 2)
+    clock.now += 1
+    second.put('c', 3)
+    # The limit is shared, so first's entry 'a' was the one evicted
+    assert first.get('a') is None
+    assert len(first) == 2
+
+
+def test_page_key_matches_every_spelling_of_a_city():
+    assert page_key(DALLAS, 2) == page_key(f"https://www.happycow.net/{DALLAS}/", 2) \
+        == page_key(DALLAS.replace('/', '|'), 2)
+    assert page_key(DALLAS, 1) != page_key(DALLAS, 2)
@@ -0,0 +1,133 @@
+import pytest
+
+from production_city_scraper import HappyCowScraper
+from src.utils.checkpoint import CheckpointStore
+from src.utils.retry import RetryPolicy
+
+CITY = 'north_america/usa/texas/dallas'
+
+
+class Crash(BaseException):
+    """A kill mid-run: not an Exception, so nothing in the scraper catches it"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / 'checkpoints.sqlite3'))
+
+
+@pytest.fixture
+def make_scraper(store, fake_listing):
+    def make(pages=4, fail=(), crash_at=None, concurrency=1):
+        scraper = HappyCowScraper(CITY, f"https://www.happycow.net/{CITY}/", max_pages=20,
+                                  concurrency=concurrency, requests_per_second=0, rate_db='',
+                                  retry_policy=RetryPolicy(max_retries=0), checkpoint=store)
+        get, calls = fake_listing(pages=pages, fail=fail)
+
+        def session_get(url, *args, **kwargs):
+            if crash_at is not None and f"page={crash_at}" in url:
+                raise Crash()
+            return get(url, *args, **kwargs)
+
+        scraper.session.get = session_get
+        return scraper, calls
+
+    return make
+
+
+def venue_ids(restaurants):
+    return [restaurant['venue_id'] for restaurant in restaurants]
+
+
+def saved_page(restaurants, page):
+    """One page of a scrape's results as the checkpoint stores it"""
+    return [restaurant.to_dict() for restaurant in restaurants if restaurant['page_number'] == page]
+
+
+def test_store_cursor_lifecycle(store):
+    assert store.load(CITY) is None
+
+    store.start(CITY)
+    store.save_page(CITY, 1, [{'venue_id': '1'}], last_page=5)
+    store.save_page(CITY, 2, [{'venue_id': '2'}], timing={'fetch_seconds': 0.1})
+    state = store.load(f"https://www.happycow.net/{CITY}/")
+    assert state['last_page'] == 5
+    assert not state['finished']
+    assert sorted(state['pages']) == [1, 2]
+    assert state['pages'][2]['timing'] == {'fetch_seconds': 0.1}
+
+    store.finish(CITY, '3,5-')
+    state = store.load(CITY)
+    assert state['finished'] and state['resume_pages'] == '3,5-'
+
+    store.start(CITY)
+    state = store.load(CITY)
+    assert state['pages'] == {} and state['last_page'] is None
+
+
+def test_resume_after_crash_fetches_only_missing_pages(make_scraper, store):
+    reference, _ = make_scraper()
+    expected = venue_ids(reference.scrape_all_pages())
+
+    crashed, _ = make_scraper(crash_at=3)
+    with pytest.raises(Crash):
+        crashed.scrape_all_pages()
+    state = store.load(CITY)
+    assert sorted(state['pages']) == [1, 2]
+    assert not state['finished']
+
+    resumed, calls = make_scraper(concurrency=2)
+    assert venue_ids(resumed.scrape_all_pages(resume=True)) == expected
+    assert sorted(calls) == [3, 4]
+
+
+def test_resume_after_failed_pages_fetches_only_those(make_scraper, store):
+    partial, _ = make_scraper(fail={2})
+    partial.scrape_all_pages()
+    assert partial.get_resume_pages() == '2'
+    assert store.load(CITY)['resume_pages'] == '2'
+
+    resumed, calls = make_scraper()
+    restaurants = resumed.scrape_all_pages(resume=True)
+    assert calls == [2]
+    assert len(restaurants) == 4 * 5
+    assert resumed.get_resume_pages() is None
+    assert store.load(CITY)['finished']
+
+
+def test_resume_of_a_complete_run_fetches_nothing(make_scraper):
+    complete, _ = make_scraper()
+    expected = venue_ids(complete.scrape_all_pages())
+
+    resumed, calls = make_scraper()
+    assert venue_ids(resumed.scrape_all_pages(resume=True)) == expected
+    assert calls == []
+
+
+@pytest.mark.parametrize('last_page', [None, 4])
+def test_resume_refetches_a_saved_page_that_came_back_empty(make_scraper, store, last_page):
+    reference, _ = make_scraper()
+    restaurants = reference.scrape_all_pages()
+    expected = venue_ids(restaurants)
+
+    # Interrupted after page 2 answered with no venues
+    store.start(CITY)
+    store.save_page(CITY, 1, saved_page(restaurants, 1), last_page=last_page)
+    store.save_page(CITY, 2, [], last_page=last_page)
+
+    resumed, calls = make_scraper()
+    assert venue_ids(resumed.scrape_all_pages(resume=True)) == expected
+    assert sorted(calls) == [2, 3, 4]
+
+
+def test_resume_keeps_an_empty_last_page(make_scraper, store):
+    reference, _ = make_scraper(pages=2)
+    restaurants = reference.scrape_all_pages()
+
+    store.start(CITY)
+    store.save_page(CITY, 1, saved_page(restaurants, 1), last_page=2)
+    store.save_page(CITY, 2, [], last_page=2)
+
+    resumed, calls = make_scraper(pages=2)
+    resumed.scrape_all_pages(resume=True)
+    assert calls == []
@@ -0,0 +1,129 @@
+import json
+import re
+import time
+
+import pytest
+
+import cloud_scraper_service as service
+from fakes import FakeResponse, venue_card
+from production_city_scraper import HappyCowScraper
+
+DALLAS = {'url': 'https://www.happycow.net/north_america/usa/texas/dallas/',
+          'full_path': 'north_america/usa/texas/dallas'}
+AUSTIN = {'url': 'https://www.happycow.net/north_america/usa/texas/austin/',
+          'full_path': 'north_america/usa/texas/austin'}
+
+
+@pytest.fixture
+def client(monkeypatch, fake_listing):
+    """Test client whose upstream serves 3 pages of 5 venues per city, and 500s for austin"""
+    get, _ = fake_listing(pages=3)
+
+    def session_get(url, *args, **kwargs):
+        if 'austin' in url:
+            return FakeResponse({}, 500)
+        return get(url, *args, **kwargs)
+
+    monkeypatch.setattr(service.scraper.session, 'get', session_get)
+    return service.app.test_client()
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_batch_streams_restaurants_then_city_then_totals(client):
+    response = client.post('/scrape/batch', json={'cities': [DALLAS], 'concurrency': 2})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = ndjson(response)
+    assert [line['record'] for line in lines] == ['restaurant'] * 15 + ['city', 'batch']
+    assert all(line['batch_index'] == 0 for line in lines[:-1])
+    assert [line['page_number'] for line in lines[:15]] == [1] * 5 + [2] * 5 + [3] * 5
+
+    city, batch = lines[-2], lines[-1]
+    assert city['success'] and city['total_restaurants'] == 15
+    assert 'restaurants' not in city
+    assert (batch['cities'], batch['succeeded'], batch['failed'], batch['total_restaurants']) == (1, 1, 0, 15)
+
+
+def test_batch_reports_failed_cities_and_keeps_going(client):
+    response = client.post('/scrape/batch', json=[DALLAS, AUSTIN, {'city': 'no url'}])
+    assert response.status_code == 200
+
+    lines = ndjson(response)
+    cities = {line['batch_index']: line for line in lines if line['record'] == 'city'}
+    assert cities[0]['success'] and cities[0]['total_restaurants'] == 15
+    assert not cities[1]['success'] and cities[1]['total_restaurants'] == 0
+    assert not cities[2]['success'] and 'url' in cities[2]['error']
+    assert sum(1 for line in lines if line['record'] == 'restaurant') == 15
+
+    batch = lines[-1]
+    assert batch['record'] == 'batch'
+    assert (batch['cities'], batch['succeeded'], batch['failed'], batch['total_restaurants']) == (3, 1, 2, 15)
+
+
+@pytest.mark.parametrize('body, error', [
+    ({'cities': []}, 'non-empty list'),
+    ({'cities': [DALLAS], 'concurrency': 'many'}, 'concurrency'),
+    ({'cities': [DALLAS], 'concurrency': 0}, 'concurrency'),
+])
+def test_batch_rejects_bad_requests(client, body, error):
+    response = client.post('/scrape/batch', json=body)
+    assert response.status_code == 400
+    assert error in response.get_json()['error']
+
+
+def test_batch_over_the_size_limit_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(service, 'MAX_BATCH_SIZE', 2)
+    response = client.post('/scrape/batch', json=[DALLAS] * 3)
+    assert response.status_code == 400
+    assert 'too large' in response.get_json()['error']
+
+
+def overlapping_listing(pages=4, per_page=5, delays=None):
+    """session.get for a city whose every page repeats two venues of the page before"""
+    def get(url, *args, **kwargs):
+        match = re.search(r'page=(\d+)', url)
+        page = int(match.group(1)) if match else 1
+        time.sleep((delays or {}).get(page, 0))
+        cards = [venue_card(page, i) for i in range(per_page)]
+        if page > 1:
+            cards += [venue_card(page - 1, 0), venue_card(page - 1, 1)]
+        paginated = {'current_page': page, 'last_page': pages}
+        return FakeResponse({'success': True, 'data': {'data': ''.join(cards), 'paginated': paginated}})
+
+    return get
+
+
+def test_scrape_merges_pages_like_the_sequential_cli(client, monkeypatch):
+    # Later pages answer first, so the merge cannot rely on arrival order
+    get = overlapping_listing(delays={2: 0.15, 3: 0.05})
+    monkeypatch.setattr(service.scraper.session, 'get', get)
+    result = client.post('/scrape', json=DALLAS).get_json()
+
+    cli = HappyCowScraper(DALLAS['full_path'], DALLAS['url'], requests_per_second=0, rate_db='',
+                          checkpoint=None)
+    cli.session.get = get
+    cli_ids = [restaurant['venue_id'] for restaurant in cli.scrape_all_pages()]
+    # The CLI keeps repeats; the service keeps each venue where it first appeared
+    first_seen = list(dict.fromkeys(cli_ids))
+
+    assert [restaurant['venue_id'] for restaurant in result['restaurants']] == first_seen
+    assert result['duplicates_removed'] == len(cli_ids) - len(first_seen) == 6
+    assert result['pages_scraped'] == 4 and not result['truncated']
+
+
+def test_scrape_returns_what_it_has_at_the_deadline(client, monkeypatch):
+    monkeypatch.setattr(service.scraper.session, 'get', overlapping_listing(delays={3: 2, 4: 2}))
+    monkeypatch.setattr(service, 'SCRAPE_DEADLINE', 0.3)
+
+    start = time.monotonic()
+    result = client.post('/scrape', json=DALLAS).get_json()
+    assert time.monotonic() - start < 1.5
+
+    assert result['success'] and result['truncated']
+    assert result['pages_scraped'] == 2
+    assert [failed['page'] for failed in result['failed_pages']] == [3, 4]
+    assert {restaurant['page_number'] for restaurant in result['restaurants']} == {1, 2}
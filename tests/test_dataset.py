@@ -0,0 +1,107 @@
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from production_city_scraper import finish_dataset
+from src.models.venue import DATASET_COLUMN_TYPES, FIELDS
+from src.utils.dataset import ParquetDataset, load_catalog, read_dataset
+
+DALLAS = 'north_america/usa/texas/dallas'
+AUSTIN = 'north_america/usa/texas/austin'
+
+
+def venues(city_path, count, name='Venue'):
+    rows = []
+    for i in range(count):
+        row = dict.fromkeys(FIELDS)
+        row.update(venue_id=str(i), name=f"{name} {i}", type='vegan', rating=4.5, review_count=i,
+                   cuisine_tags=['Thai'], price_range='$', features=[], city_path=city_path,
+                   scraped_at='2026-01-01T00:00:00', page_number=1)
+        rows.append(row)
+    return rows
+
+
+def write(root, rows, scrape_date='2026-01-01', **kwargs):
+    with ParquetDataset(str(root), DATASET_COLUMN_TYPES, scrape_date, **kwargs) as dataset:
+        dataset.write(rows)
+    return dataset
+
+
+def names(root, **partitions):
+    return sorted(read_dataset(str(root), ['name'], **partitions).column('name').to_pylist())
+
+
+def test_rows_land_in_their_partitions(tmp_path):
+    write(tmp_path, venues(DALLAS, 3) + venues(AUSTIN, 2))
+
+    catalog = load_catalog(str(tmp_path))
+    assert catalog['total_rows'] == 5
+    assert [entry['path'] for entry in catalog['partitions']] == [
+        'state=texas/city=austin/scrape_date=2026-01-01',
+        'state=texas/city=dallas/scrape_date=2026-01-01',
+    ]
+    assert len(names(tmp_path, city='dallas')) == 3
+
+
+def test_rerun_replaces_the_partition(tmp_path):
+    write(tmp_path, venues(DALLAS, 3, 'Old'))
+    write(tmp_path, venues(DALLAS, 2, 'New'))
+
+    assert names(tmp_path, city='dallas') == ['New 0', 'New 1']
+    assert load_catalog(str(tmp_path))['total_rows'] == 2
+    directory = tmp_path / 'state=texas/city=dallas/scrape_date=2026-01-01'
+    assert sorted(path.name for path in directory.iterdir()) == ['part-0.parquet']
+
+
+def test_partition_evicted_from_the_writer_cache_keeps_all_its_files(tmp_path):
+    write(tmp_path, venues(DALLAS, 3, 'Old'))
+
+    dataset = ParquetDataset(str(tmp_path), DATASET_COLUMN_TYPES, '2026-01-01', max_open_files=1)
+    dataset.write(venues(DALLAS, 2, 'First'))
+    dataset.write(venues(AUSTIN, 1))
+    dataset.write(venues(DALLAS, 1, 'Second'))
+    dataset.close()
+
+    assert names(tmp_path, city='dallas') == ['First 0', 'First 1', 'Second 0']
+
+
+def test_abort_keeps_the_previous_partition(tmp_path):
+    write(tmp_path, venues(DALLAS, 3, 'Old'))
+
+    with pytest.raises(RuntimeError):
+        with ParquetDataset(str(tmp_path), DATASET_COLUMN_TYPES, '2026-01-01') as dataset:
+            dataset.write(venues(DALLAS, 1, 'New'))
+            raise RuntimeError('scrape failed')
+
+    assert names(tmp_path, city='dallas') == ['Old 0', 'Old 1', 'Old 2']
+    assert not list(tmp_path.rglob('.*.tmp'))
+
+
+def test_abort_after_an_eviction_keeps_the_previous_partition(tmp_path):
+    write(tmp_path, venues(DALLAS, 3, 'Old'))
+
+    with pytest.raises(RuntimeError):
+        with ParquetDataset(str(tmp_path), DATASET_COLUMN_TYPES, '2026-01-01', max_open_files=1) as dataset:
+            dataset.write(venues(DALLAS, 1, 'New'))
+            # Evicts dallas's open file
+            dataset.write(venues(AUSTIN, 1))
+            raise RuntimeError('scrape failed')
+
+    assert names(tmp_path, city='dallas') == ['Old 0', 'Old 1', 'Old 2']
+    assert load_catalog(str(tmp_path))['total_rows'] == 3
+    assert not list(tmp_path.rglob('.*.tmp'))
+    assert not list(tmp_path.glob('state=texas/city=austin/*/*.parquet'))
+
+
+def test_incomplete_scrape_is_not_committed(tmp_path):
+    write(tmp_path, venues(DALLAS, 3, 'Old'))
+
+    dataset = ParquetDataset(str(tmp_path), DATASET_COLUMN_TYPES, '2026-01-01')
+    dataset.write(venues(DALLAS, 1, 'Partial'))
+    finish_dataset(dataset, {'resume_pages': '2-'})
+    assert names(tmp_path, city='dallas') == ['Old 0', 'Old 1', 'Old 2']
+
+    dataset = ParquetDataset(str(tmp_path), DATASET_COLUMN_TYPES, '2026-01-01')
+    dataset.write(venues(DALLAS, 1, 'Complete'))
+    finish_dataset(dataset, {'resume_pages': None})
+    assert names(tmp_path, city='dallas') == ['Complete 0']
@@ -0,0 +1,27 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from scripts.bench_import_time import HEAVY, MODULES
+
+ROOT = Path(__file__).parent.parent
+
+
+def modules_loaded_by(module, workdir):
+    """Top-level packages in sys.modules after importing module in a fresh interpreter"""
+    code = f"import json, sys, {module}; print(json.dumps(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    # Run outside the repo so start-up side effects (log files) land in a scratch dir
+    completed = subprocess.run([sys.executable, '-c', code], cwd=workdir, env=dict(os.environ, PYTHONPATH=str(ROOT)),
+                               capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    return set(json.loads(completed.stdout.splitlines()[-1]))
+
+
+@pytest.mark.parametrize('module', sorted(MODULES))
+def test_cli_starts_without_heavy_imports(module, tmp_path):
+    assert {'pandas', 'crawl4ai', 'lxml'} <= set(HEAVY)
+    assert modules_loaded_by(module, tmp_path) & set(MODULES[module]) == set()
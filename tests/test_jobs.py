@@ -0,0 +1,140 @@
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from src.core.jobs import JobQueue, QueueFullError
+
+
+@pytest.fixture
+def job_db(tmp_path):
+    return str(tmp_path / 'jobs.sqlite3')
+
+
+def wait_for_status(queue, job_id, *statuses, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = queue.get(job_id)
+        if job['status'] in statuses:
+            return job
+        assert time.monotonic() < deadline, f"job stuck in {job['status']}"
+        time.sleep(0.01)
+
+
+def blocking_runner(release):
+    """Runner that reports one page of progress, then waits for `release` before finishing"""
+    def run(params, report_progress):
+        report_progress({'pages_scraped': 1})
+        assert release.wait(5)
+        if params.get('raise'):
+            raise RuntimeError('scrape crashed')
+        return {'success': params.get('success', True), 'error': params.get('error'), 'city': params['city']}
+
+    return run
+
+
+def test_submitted_job_runs_to_completion(job_db):
+    release = threading.Event()
+    queue = JobQueue(blocking_runner(release), job_db, max_workers=1)
+
+    job = queue.submit({'city': 'Dallas'})
+    assert job['status'] in ('queued', 'running')
+    assert job['params'] == {'city': 'Dallas'}
+    assert job['result'] is None and job['finished_at'] is None
+    assert job['worker'] == f"{socket.gethostname()}:{os.getpid()}"
+
+    running = wait_for_status(queue, job['job_id'], 'running')
+    deadline = time.monotonic() + 5
+    while queue.get(job['job_id'])['progress'] != {'pages_scraped': 1}:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert running['started_at'] is not None
+
+    release.set()
+    done = wait_for_status(queue, job['job_id'], 'completed', 'failed')
+    assert done['status'] == 'completed'
+    assert done['result'] == {'success': True, 'error': None, 'city': 'Dallas'}
+    assert done['finished_at'] is not None
+
+
+@pytest.mark.parametrize('params, error', [
+    ({'city': 'Austin', 'success': False, 'error': 'No HTML content'}, 'No HTML content'),
+    ({'city': 'Austin', 'raise': True}, 'scrape crashed'),
+])
+def test_failed_scrapes_fail_the_job(job_db, params, error):
+    release = threading.Event()
+    release.set()
+    queue = JobQueue(blocking_runner(release), job_db)
+
+    job = wait_for_status(queue, queue.submit(params)['job_id'], 'completed', 'failed')
+    assert (job['status'], job['error']) == ('failed', error)
+
+
+def test_unknown_job_is_none(job_db):
+    assert JobQueue(blocking_runner(threading.Event()), job_db).get('nope') is None
+
+
+def test_queue_refuses_jobs_beyond_max_pending(job_db):
+    release = threading.Event()
+    queue = JobQueue(blocking_runner(release), job_db, max_workers=1, max_pending=1)
+
+    running = queue.submit({'city': 'Dallas'})
+    # A job stops counting as pending once a worker picks it up
+    wait_for_status(queue, running['job_id'], 'running')
+    waiting = queue.submit({'city': 'Austin'})
+
+    with pytest.raises(QueueFullError):
+        queue.submit({'city': 'Houston'})
+
+    release.set()
+    for job in (running, waiting):
+        assert wait_for_status(queue, job['job_id'], 'completed')['status'] == 'completed'
+    # Room again once the backlog drains
+    assert queue.submit({'city': 'Houston'})['status'] in ('queued', 'running', 'completed')
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_starting_queue_fails_jobs_orphaned_by_dead_workers(job_db):
+    JobQueue(blocking_runner(threading.Event()), job_db)
+    host = socket.gethostname()
+    jobs = {
+        'dead_worker': ('running', f"{host}:{dead_pid()}"),
+        'live_worker': ('running', f"{host}:{os.getppid()}"),
+        'other_host': ('queued', 'some-other-host:1'),
+        'no_worker': ('queued', None),
+        'finished': ('completed', f"{host}:{dead_pid()}"),
+    }
+    with sqlite3.connect(job_db) as conn:
+        for job_id, (status, worker) in jobs.items():
+            conn.execute("INSERT INTO jobs (job_id, status, params, created_at, worker) VALUES (?, ?, '{}', ?, ?)",
+                         (job_id, status, '2026-01-01T00:00:00', worker))
+
+    queue = JobQueue(blocking_runner(threading.Event()), job_db)
+
+    statuses = {job_id: queue.get(job_id)['status'] for job_id in jobs}
+    assert statuses == {'dead_worker': 'failed', 'live_worker': 'running', 'other_host': 'queued',
+                        'no_worker': 'failed', 'finished': 'completed'}
+    assert queue.get('dead_worker')['error'] == 'Worker exited before the job finished'
+
+
+def test_finished_jobs_past_retention_are_dropped_on_submit(job_db):
+    release = threading.Event()
+    release.set()
+    queue = JobQueue(blocking_runner(release), job_db, retention_hours=1)
+    with sqlite3.connect(job_db) as conn:
+        conn.execute("INSERT INTO jobs (job_id, status, params, created_at, finished_at) "
+                     "VALUES ('old', 'completed', '{}', '2026-01-01T00:00:00', '2026-01-01T00:00:00')")
+
+    job = queue.submit({'city': 'Dallas'})
+    assert queue.get('old') is None
+    assert wait_for_status(queue, job['job_id'], 'completed')['status'] == 'completed'
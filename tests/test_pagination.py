@@ -0,0 +1,35 @@
+import pytest
+
+from src.core.pagination import format_page_spec, parse_page_spec
+
+
+@pytest.mark.parametrize('spec, pages, open_from', [
+    ('3', [3], None),
+    ('3,7,12-', [3, 7], 12),
+    ('2-4,9', [2, 3, 4, 9], None),
+    ('5-', [], 5),
+    ('', [], None),
+])
+def test_parse_page_spec(spec, pages, open_from):
+    assert parse_page_spec(spec) == (pages, open_from)
+
+
+@pytest.mark.parametrize('spec', ['3', '3,7,12-', '1,2,3,4', '5-', ''])
+def test_format_parse_round_trip(spec):
+    assert format_page_spec(*parse_page_spec(spec)) == spec
+
+
+def test_parse_normalizes_unordered_and_overlapping_specs():
+    pages, open_from = parse_page_spec(' 9, 2-3 ,3, 8-, 12-')
+    assert (pages, open_from) == ([2, 3], 8)
+    assert parse_page_spec(format_page_spec(pages, open_from)) == (pages, open_from)
+
+
+def test_format_drops_pages_covered_by_the_open_range():
+    assert format_page_spec([1, 6, 4], open_from=5) == '1,4,5-'
+
+
+@pytest.mark.parametrize('spec', ['0', '0-', '2,-1', 'x', '3-y'])
+def test_parse_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_page_spec(spec)
@@ -0,0 +1,43 @@
+import json
+
+import parse_existing_html
+from fakes import listing_html
+from src.utils.archive import ResponseArchive
+from src.utils.rate_limiter import SharedRateLimiter
+
+DALLAS = 'north_america/usa/texas/dallas'
+AUSTIN = 'north_america/usa/texas/austin'
+
+
+def archive_pages(root):
+    archive = ResponseArchive(str(root))
+    for city in (DALLAS, AUSTIN):
+        for page in (1, 2):
+            payload = {'success': True, 'data': {'data': listing_html(page, 3), 'paginated': {'last_page': 2}}}
+            archive.put(city, page, json.dumps(payload).encode())
+
+
+def test_archive_documents_parse_per_city(tmp_path):
+    archive_pages(tmp_path)
+    parse_existing_html.configure_parser()
+
+    documents = list(parse_existing_html.discover_documents([str(tmp_path)]))
+    assert [(city, page) for _, _, city, page in documents] == [(AUSTIN, 1), (AUSTIN, 2), (DALLAS, 1), (DALLAS, 2)]
+
+    for document in documents:
+        restaurants, n_bytes, error = parse_existing_html.parse_document(document)
+        assert error is None and n_bytes > 0
+        assert len(restaurants) == 3
+        assert {(r['city_path'], r['page_number']) for r in restaurants} == {(document[2], document[3])}
+
+
+def test_scrapers_are_parse_only_and_share_one_session():
+    parse_existing_html.configure_parser()
+    dallas = parse_existing_html._get_scraper(DALLAS)
+    austin = parse_existing_html._get_scraper(AUSTIN)
+
+    assert parse_existing_html._get_scraper(DALLAS) is dallas
+    assert dallas.session is austin.session
+    assert not isinstance(dallas.rate_limiter, SharedRateLimiter)
+    assert dallas.rate_limiter.interval == 0
+    assert dallas.checkpoint is None
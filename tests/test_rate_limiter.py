@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+
+from src.utils import rate_limiter
+from src.utils.rate_limiter import RateLimiter, SharedRateLimiter, make_rate_limiter
+
+HOST = 'www.happycow.net'
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances the clock instead of blocking"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['local', 'shared'])
+def make_limiter(request, tmp_path):
+    def make(requests_per_second, burst=1):
+        if request.param == 'local':
+            return RateLimiter(requests_per_second, burst)
+        return SharedRateLimiter(requests_per_second, str(tmp_path / 'rate.sqlite3'), burst)
+
+    return make
+
+
+def send_times(limiter, clock, count, host=HOST):
+    """Clock readings at which `count` back-to-back acquire() calls are let through"""
+    times = []
+    for _ in range(count):
+        limiter.acquire(host)
+        times.append(clock.now)
+    return times
+
+
+def test_requests_are_spaced_by_the_interval(make_limiter, clock):
+    limiter = make_limiter(4)
+    start = clock.now
+    assert [t - start for t in send_times(limiter, clock, 5)] == pytest.approx([0, 0.25, 0.5, 0.75, 1.0])
+
+
+def test_idle_time_does_not_bank_extra_requests(make_limiter, clock):
+    limiter = make_limiter(2)
+    send_times(limiter, clock, 2)
+    clock.sleep(10)
+
+    start = clock.now
+    assert [t - start for t in send_times(limiter, clock, 3)] == pytest.approx([0, 0.5, 1.0])
+
+
+def test_burst_goes_out_at_once_then_settles_to_the_rate(make_limiter, clock):
+    limiter = make_limiter(2, burst=3)
+    start = clock.now
+    assert [t - start for t in send_times(limiter, clock, 5)] == pytest.approx([0, 0, 0, 0.5, 1.0])
+
+    # An idle second refills two tokens
+    clock.sleep(1)
+    start = clock.now
+    assert [t - start for t in send_times(limiter, clock, 3)] == pytest.approx([0, 0, 0.5])
+
+
+def test_hosts_have_separate_buckets(make_limiter, clock):
+    limiter = make_limiter(1)
+    assert limiter.reserve('a.example') == 0
+    assert limiter.reserve('b.example') == 0
+    assert limiter.reserve('a.example') == pytest.approx(1)
+
+
+def test_pause_holds_the_next_request(make_limiter, clock):
+    limiter = make_limiter(10, burst=2)
+    limiter.pause(HOST, 3)
+    # Requests resume at the steady rate, without a burst
+    assert [limiter.reserve(HOST) for _ in range(3)] == pytest.approx([3, 3.1, 3.2])
+
+
+def test_unlimited_limiter_never_waits(make_limiter, clock):
+    limiter = make_limiter(0)
+    limiter.pause(HOST, 60)
+    assert [limiter.reserve(HOST) for _ in range(3)] == [0, 0, 0]
+
+
+def test_two_shared_limiters_split_one_budget(tmp_path, clock):
+    db_path = str(tmp_path / 'rate.sqlite3')
+    first, second = SharedRateLimiter(2, db_path), SharedRateLimiter(2, db_path)
+
+    waits = [limiter.reserve(HOST) for limiter in (first, second) * 3]
+    assert waits == pytest.approx([0, 0.5, 1.0, 1.5, 2.0, 2.5])
+
+
+def test_shared_limiters_hand_out_distinct_slots_under_contention(tmp_path):
+    db_path = str(tmp_path / 'rate.sqlite3')
+    limiters = [SharedRateLimiter(1000, db_path) for _ in range(4)]
+    slots = []
+
+    def claim(limiter):
+        for _ in range(25):
+            slots.append(limiter._update(HOST, lambda next_slot, interval, now:
+                                         (max(now, next_slot) + interval, interval, max(now, next_slot))))
+
+    threads = [threading.Thread(target=claim, args=(limiter,)) for limiter in limiters]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every claim started from a different slot, so no two requests shared one
+    assert len(set(slots)) == 100
+
+
+def test_make_rate_limiter_picks_the_shared_limiter_only_when_it_can_be_used(tmp_path):
+    db_path = str(tmp_path / 'rate.sqlite3')
+    assert type(make_rate_limiter(1, db_path)) is SharedRateLimiter
+    assert type(make_rate_limiter(1, '')) is RateLimiter
+    assert type(make_rate_limiter(0, db_path)) is RateLimiter
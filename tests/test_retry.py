@@ -0,0 +1,90 @@
+import pytest
+import requests
+
+from src.utils import retry
+from src.utils.retry import RetryPolicy, is_retryable
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def http_error(status_code):
+    return requests.HTTPError(str(status_code), response=Response(status_code))
+
+
+@pytest.mark.parametrize('error', [
+    http_error(429),
+    http_error(500),
+    http_error(502),
+    http_error(503),
+    http_error(504),
+    requests.Timeout('read timed out'),
+    requests.ConnectionError('connection reset'),
+    requests.exceptions.ChunkedEncodingError('body cut off'),
+])
+def test_transient_failures_are_retryable(error):
+    assert is_retryable(error)
+
+
+@pytest.mark.parametrize('error', [
+    http_error(400),
+    http_error(403),
+    http_error(404),
+    requests.HTTPError('no response'),
+    ValueError('bad JSON'),
+    KeyError('page missing from the archive'),
+])
+def test_permanent_failures_are_not_retryable(error):
+    assert not is_retryable(error)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waits = []
+    monkeypatch.setattr(retry.time, 'sleep', waits.append)
+    return waits
+
+
+def failing(errors, result='ok'):
+    """A callable raising each of `errors` in turn, then returning `result`"""
+    errors = list(errors)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return fn, calls
+
+
+def test_call_retries_transient_errors_until_success(sleeps):
+    fn, calls = failing([http_error(503), requests.Timeout()])
+    assert RetryPolicy(max_retries=3, base_delay=1.0).call(fn) == 'ok'
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_call_raises_the_last_error_once_retries_run_out(sleeps):
+    fn, calls = failing([http_error(500), http_error(502), http_error(503)])
+    with pytest.raises(requests.HTTPError) as raised:
+        RetryPolicy(max_retries=2).call(fn)
+    assert raised.value.response.status_code == 503
+    assert len(calls) == 3
+
+
+def test_call_does_not_retry_permanent_errors(sleeps):
+    fn, calls = failing([http_error(404)])
+    with pytest.raises(requests.HTTPError):
+        RetryPolicy(max_retries=5).call(fn)
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_delay_is_jittered_below_the_capped_backoff():
+    policy = RetryPolicy(base_delay=2.0, max_delay=5.0)
+    for retry_number, ceiling in ((1, 2.0), (2, 4.0), (3, 5.0), (10, 5.0)):
+        assert all(0 <= policy.delay(retry_number) <= ceiling for _ in range(50))
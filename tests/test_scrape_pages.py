@@ -0,0 +1,72 @@
+import re
+import time
+
+import pytest
+
+from production_city_scraper import MAX_CONSECUTIVE_FAILURES, HappyCowScraper
+from src.core.pagination import format_page_spec
+from src.utils.retry import RetryPolicy
+
+CITY = 'north_america/usa/texas/dallas'
+
+
+@pytest.fixture
+def make_scraper(fake_listing):
+    def make(pages=6, fail=(), concurrency=1, delays=None):
+        """Scraper over a fake city; pages in `delays` answer that many seconds late"""
+        scraper = HappyCowScraper(CITY, f"https://www.happycow.net/{CITY}/", max_pages=20,
+                                  concurrency=concurrency, requests_per_second=0, rate_db='',
+                                  retry_policy=RetryPolicy(max_retries=0), checkpoint=None)
+        get, calls = fake_listing(pages=pages, fail=fail)
+
+        def session_get(url, *args, **kwargs):
+            match = re.search(r'page=(\d+)', url)
+            time.sleep((delays or {}).get(int(match.group(1)) if match else 1, 0))
+            return get(url, *args, **kwargs)
+
+        scraper.session.get = session_get
+        return scraper, calls
+
+    return make
+
+
+def venue_ids(restaurants):
+    return [restaurant['venue_id'] for restaurant in restaurants]
+
+
+@pytest.mark.parametrize('concurrency', [2, 4])
+def test_concurrent_window_matches_the_sequential_scrape(make_scraper, concurrency):
+    sequential, _ = make_scraper()
+    expected = venue_ids(sequential.scrape_all_pages())
+
+    # Early pages answer last, so pages finish out of order
+    concurrent, calls = make_scraper(concurrency=concurrency, delays={2: 0.1, 3: 0.05})
+    restaurants = concurrent.scrape_all_pages()
+
+    assert venue_ids(restaurants) == expected
+    assert [restaurant['page_number'] for restaurant in restaurants] == sorted(
+        restaurant['page_number'] for restaurant in restaurants)
+    assert sorted(calls) == [1, 2, 3, 4, 5, 6]
+    assert concurrent.get_resume_pages() is None
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_scrape_stops_after_consecutive_failures(make_scraper, concurrency):
+    failing = set(range(3, 3 + MAX_CONSECUTIVE_FAILURES))
+    scraper, _ = make_scraper(pages=10, fail=failing, concurrency=concurrency)
+    restaurants = scraper.scrape_all_pages()
+
+    # Pages fetched ahead of the stop are discarded
+    assert {restaurant['page_number'] for restaurant in restaurants} == {1, 2}
+    assert sorted(scraper.failed_pages) == sorted(failing)
+    assert scraper.resume_from == 3 + MAX_CONSECUTIVE_FAILURES
+    assert scraper.get_resume_pages() == format_page_spec(sorted(failing), 3 + MAX_CONSECUTIVE_FAILURES)
+
+
+@pytest.mark.parametrize('concurrency', [1, 3])
+def test_scattered_failures_do_not_stop_the_scrape(make_scraper, concurrency):
+    scraper, _ = make_scraper(pages=6, fail={2, 4}, concurrency=concurrency)
+    restaurants = scraper.scrape_all_pages()
+
+    assert sorted({restaurant['page_number'] for restaurant in restaurants}) == [1, 3, 5, 6]
+    assert scraper.get_resume_pages() == '2,4'
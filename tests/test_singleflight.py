@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.utils.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def run_in_threads(flights, key, fn, count):
+    """Start count threads calling flights.do(key, fn); returns (threads, outcomes)"""
+    outcomes = []
+
+    def call():
+        try:
+            outcomes.append(flights.do(key, fn))
+        except Exception as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_followers_share_the_leaders_result():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def scrape():
+        calls.append(1)
+        release.wait(5)
+        return {'restaurants': 12}
+
+    threads, outcomes = run_in_threads(flights, 'dallas', scrape, 4)
+    wait_for(lambda: flights.stats()['waiting'] == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in outcomes) == [False, True, True, True]
+    assert all(result == {'restaurants': 12} for result, _ in outcomes)
+    assert flights.stats() == {'requests': 4, 'executions': 1, 'coalesced': 3, 'in_flight': 0, 'waiting': 0}
+
+
+def test_followers_receive_the_leaders_exception():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def scrape():
+        release.wait(5)
+        raise RuntimeError('upstream down')
+
+    threads, outcomes = run_in_threads(flights, 'dallas', scrape, 3)
+    wait_for(lambda: flights.stats()['waiting'] == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(outcomes) == 3
+    assert all(isinstance(outcome, RuntimeError) and str(outcome) == 'upstream down' for outcome in outcomes)
+    # A failed flight is not remembered: the next call runs again
+    assert flights.do('dallas', lambda: 'ok') == ('ok', False)
+
+
+def test_different_keys_and_later_calls_run_separately():
+    flights = SingleFlight()
+    assert flights.do('dallas', lambda: 1) == (1, False)
+    assert flights.do('dallas', lambda: 2) == (2, False)
+    assert flights.do('austin', lambda: 3) == (3, False)
+    assert flights.stats()['executions'] == 3
+
+
+def test_async_followers_share_the_leaders_result():
+    async def main():
+        flights = AsyncSingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def scrape():
+            calls.append(1)
+            await release.wait()
+            return 'dallas result'
+
+        tasks = [asyncio.create_task(flights.do('dallas', scrape)) for _ in range(4)]
+        await asyncio.sleep(0)
+        assert flights.stats()['waiting'] == 3
+        release.set()
+        return await asyncio.gather(*tasks), calls, flights.stats()
+
+    outcomes, calls, stats = asyncio.run(main())
+    assert len(calls) == 1
+    assert outcomes == [('dallas result', False)] + [('dallas result', True)] * 3
+    assert stats == {'requests': 4, 'executions': 1, 'coalesced': 3, 'in_flight': 0, 'waiting': 0}
+
+
+def test_async_followers_receive_the_leaders_exception():
+    async def main():
+        flights = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def scrape():
+            await release.wait()
+            raise RuntimeError('upstream down')
+
+        tasks = [asyncio.create_task(flights.do('dallas', scrape)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        return outcomes, await flights.do('dallas', lambda: asyncio.sleep(0, 'ok'))
+
+    outcomes, retry = asyncio.run(main())
+    assert all(isinstance(outcome, RuntimeError) and str(outcome) == 'upstream down' for outcome in outcomes)
+    assert retry == ('ok', False)
+
+
+def test_cancelled_async_follower_does_not_cancel_the_leader():
+    async def main():
+        flights = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def scrape():
+            await release.wait()
+            return 'done'
+
+        leader = asyncio.create_task(flights.do('dallas', scrape))
+        follower = asyncio.create_task(flights.do('dallas', scrape))
+        await asyncio.sleep(0)
+        follower.cancel()
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == ('done', False)
@@ -0,0 +1,42 @@
+import pytest
+
+from src.core.extractor import extract_venue, find_venue_items, iter_venue_items
+from src.core.html_backends import available_backends, parse_html
+
+from fakes import listing_html, venue_card
+
+NESTED = (
+    '<div class="venue-list-item" data-id="outer"><span class="venue-name">Outer</span>'
+    '<div class="venue-list-item" data-id="inner"><span class="venue-name">Inner</span></div>'
+    '<span class="venue-address">1 Outer St</span></div>'
+)
+
+DOCUMENTS = {
+    'page': listing_html(1, 12),
+    'nested card': listing_html(1, 2) + NESTED + venue_card(1, 5),
+    # The last card is never closed, so only the parser's EOF handling ends it
+    'unclosed trailing card': listing_html(1, 3) + venue_card(1, 9)[:-len('</div>')],
+    'empty': '<div class="filters">no venues</div>',
+}
+
+
+@pytest.mark.parametrize('backend', available_backends())
+@pytest.mark.parametrize('name', sorted(DOCUMENTS))
+def test_streaming_matches_full_parse(backend, name):
+    html = DOCUMENTS[name]
+    full = [extract_venue(item) for item in find_venue_items(parse_html(html, backend))]
+    # Streamed nodes are only valid until the next one is requested
+    streamed = [extract_venue(item) for item in iter_venue_items(html, backend)]
+    assert streamed == full
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_nested_cards_are_each_yielded(backend):
+    ids = [item.get('data-id') for item in iter_venue_items(NESTED, backend)]
+    assert ids == ['outer', 'inner']
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_unclosed_trailing_card_is_yielded(backend):
+    ids = [item.get('data-id') for item in iter_venue_items(DOCUMENTS['unclosed trailing card'], backend)]
+    assert ids == ['1000', '1001', '1002', '1009']